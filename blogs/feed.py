@@ -0,0 +1,175 @@
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from requests.adapters import HTTPAdapter
+
+from core.metrics import CACHE_REQUESTS
+
+
+DEFAULT_BLOG_FEED = {
+    "BASE_URL": "https://kunalkejriwal.com/wp-json/wp/v2",
+    "PER_PAGE": 10,
+    "TIMEOUT": 3,              # seconds per upstream request
+    "FRESH_FOR": 300,          # seconds a cached feed is served without a refresh
+    "STALE_FOR": 86400,        # seconds a cached feed may still be served while refreshing / on errors
+    "RETRY_AFTER": 30,         # seconds an empty feed is served after a cold-cache upstream error
+    "POOL_SIZE": 4,
+    "CACHE_ALIAS": "default",
+    "CACHE_KEY": "blogs:feed",
+}
+
+
+def featured_image(post):
+    try:
+        return post["_embedded"]["wp:featuredmedia"][0]["source_url"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def compact_post(post):
+    """The fields blog_list.html renders, with the featured image resolved."""
+    return {
+        "id": post.get("id"),
+        "slug": post.get("slug"),
+        "link": post.get("link"),
+        "date": post.get("date"),
+        "title": {"rendered": (post.get("title") or {}).get("rendered", "")},
+        "excerpt": {"rendered": (post.get("excerpt") or {}).get("rendered", "")},
+        "featured_image": featured_image(post),
+    }
+
+
+class BlogFeed:
+    """
+    WordPress posts behind a stale-while-revalidate cache.
+
+    A fresh entry is served as is. Past FRESH_FOR the stale entry is still
+    served and one background thread (per cache, guarded by cache.add)
+    refetches it. An upstream error keeps the old entry; only a cold cache
+    waits for the upstream, and then an error yields an empty feed instead
+    of a 500. That empty feed is cached and goes stale after RETRY_AFTER,
+    so while the upstream is down requests stop waiting on it. Upstream
+    calls share one pooled requests.Session.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        per_page=10,
+        timeout=3,
+        fresh_for=300,
+        stale_for=86400,
+        retry_after=30,
+        pool_size=4,
+        cache_alias="default",
+        cache_key="blogs:feed",
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.per_page = per_page
+        self.timeout = timeout
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self.retry_after = retry_after
+        self.cache_alias = cache_alias
+        self.cache_key = cache_key
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.refreshes = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls):
+        config = {**DEFAULT_BLOG_FEED, **getattr(settings, "BLOG_FEED", {})}
+        return cls(
+            base_url=config["BASE_URL"],
+            per_page=config["PER_PAGE"],
+            timeout=config["TIMEOUT"],
+            fresh_for=config["FRESH_FOR"],
+            stale_for=config["STALE_FOR"],
+            retry_after=config["RETRY_AFTER"],
+            pool_size=config["POOL_SIZE"],
+            cache_alias=config["CACHE_ALIAS"],
+            cache_key=config["CACHE_KEY"],
+        )
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def fetch(self):
+        """Compact posts straight from the upstream, raises on any failure."""
+        response = self.session.get(
+            f"{self.base_url}/posts",
+            params={"per_page": self.per_page, "_embed": "true"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return [compact_post(post) for post in response.json()]
+
+    def refresh(self):
+        """Fetches and caches the feed. Returns the posts, None on error."""
+        try:
+            posts = self.fetch()
+        except (requests.RequestException, ValueError) as e:
+            self.errors += 1
+            print(f"[blogs-feed] refresh failed: {e}")
+            return None
+
+        self.refreshes += 1
+        self.cache.set(
+            self.cache_key,
+            {"posts": posts, "fetched_at": time.time()},
+            self.fresh_for + self.stale_for,
+        )
+        return posts
+
+    def get_posts(self):
+        entry = self.cache.get(self.cache_key)
+
+        if entry is None:
+            CACHE_REQUESTS.inc(cache="blog_feed", result="miss")
+            posts = self.refresh()
+            if posts is None:
+                # add(): a feed another request just fetched is not replaced
+                self.cache.add(
+                    self.cache_key,
+                    {"posts": [], "fetched_at": time.time() - self.fresh_for + self.retry_after},
+                    self.fresh_for + self.stale_for,
+                )
+                return []
+            return posts
+
+        if time.time() - entry["fetched_at"] >= self.fresh_for:
+            CACHE_REQUESTS.inc(cache="blog_feed", result="stale")
+            self.refresh_in_background()
+        else:
+            CACHE_REQUESTS.inc(cache="blog_feed", result="hit")
+
+        return entry["posts"]
+
+    def refresh_in_background(self):
+        lock_key = f"{self.cache_key}:refreshing"
+
+        # one refresh at a time; the lock expires with the request timeout
+        if not self.cache.add(lock_key, 1, self.timeout * 2):
+            return None
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self.cache.delete(lock_key)
+
+        thread = threading.Thread(target=run, name="blogs-feed-refresh", daemon=True)
+        thread.start()
+        return thread
+
+
+blog_feed = BlogFeed.from_settings()
@@ -1,3 +1,113 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from blogs.feed import BlogFeed
+
+
+POSTS = [
+    {
+        "id": 1,
+        "slug": "hello",
+        "title": {"rendered": "Hello"},
+        "excerpt": {"rendered": "<p>First</p>"},
+        "_embedded": {"wp:featuredmedia": [{"source_url": "https://img.example/1.png"}]},
+    },
+    {"id": 2, "slug": "no-image", "title": {"rendered": "Plain"}, "excerpt": {"rendered": ""}},
+]
+
+
+class StubWordPress(BaseHTTPRequestHandler):
+    status = 200
+    requests = 0
+
+    def do_GET(self):
+        StubWordPress.requests += 1
+        body = json.dumps(POSTS).encode()
+
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class BlogFeedTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubWordPress)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        StubWordPress.status = 200
+        StubWordPress.requests = 0
+        host, port = self.server.server_address
+        self.feed = BlogFeed(f"http://{host}:{port}/wp-json/wp/v2", timeout=1, fresh_for=60)
+
+    def join_refresh(self):
+        for thread in threading.enumerate():
+            if thread.name == "blogs-feed-refresh":
+                thread.join(5)
+
+    def test_featured_image_is_precomputed_and_cached(self):
+        posts = self.feed.get_posts()
+
+        self.assertEqual([post["featured_image"] for post in posts], ["https://img.example/1.png", None])
+        self.assertNotIn("_embedded", posts[0])
+
+        self.feed.get_posts()
+        self.assertEqual(StubWordPress.requests, 1)
+
+    def test_stale_feed_is_served_while_refreshing(self):
+        self.feed.get_posts()
+        self.feed.fresh_for = 0
+
+        posts = self.feed.get_posts()
+        self.assertEqual(len(posts), 2)
+
+        self.join_refresh()
+        self.assertEqual(StubWordPress.requests, 2)
+
+    def test_upstream_error_keeps_stale_feed(self):
+        self.feed.get_posts()
+        StubWordPress.status = 503
+
+        self.assertIsNone(self.feed.refresh())
+        self.assertEqual(len(self.feed.get_posts()), 2)
+
+    def test_cold_cache_with_upstream_down_is_empty(self):
+        StubWordPress.status = 500
+        self.assertEqual(self.feed.get_posts(), [])
+
+    def test_upstream_down_is_not_asked_on_every_request(self):
+        StubWordPress.status = 500
+        self.feed.retry_after = 60
+
+        for _ in range(3):
+            self.assertEqual(self.feed.get_posts(), [])
+        self.assertEqual(StubWordPress.requests, 1)
+
+        # past RETRY_AFTER the empty feed is refreshed in the background
+        StubWordPress.status = 200
+        later = time.time() + 61
+        with mock.patch("blogs.feed.time.time", return_value=later):
+            self.assertEqual(self.feed.get_posts(), [])
+            self.join_refresh()
+            self.assertEqual(len(self.feed.get_posts()), 2)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CustomerProfile, ProductCatalog, OrderTransaction, SystemLog, FeatureUsageAnalytics, UserProfile, CustomObject, CustomField, CustomFieldValue, CustomObjectRecord, EmailVerificationToken, PasswordResetToken
+from .models import CustomerProfile, ProductCatalog, OrderTransaction, SystemLog, FeatureUsageAnalytics, UserProfile, CustomObject, CustomField, CustomFieldValue, CustomObjectRecord, EmailVerificationToken, PasswordResetToken, SystemLogRollup
 from .plans import Plan
 
 # Register your models here.
@@ -30,6 +30,19 @@ class SystemLogAdmin(admin.ModelAdmin):
     )
     search_fields = ("log_id", "request_path", "message")
 
+
+@admin.register(SystemLogRollup)
+class SystemLogRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "hour",
+        "tenant",
+        "request_path",
+        "http_status",
+        "requests",
+        "max_response_ms",
+    )
+    list_filter = ("http_status",)
+
 @admin.register(ProductCatalog)
 class ProductCatalogAdmin(admin.ModelAdmin):
     list_display = (
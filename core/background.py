@@ -0,0 +1,86 @@
+import atexit
+import os
+import threading
+
+
+class BackgroundFlusher:
+    """
+    Runs `flush_func` on a daemon thread every `interval` seconds, or sooner
+    when `wake()` is called. The thread is started lazily and restarted after
+    a fork, so it is safe to create at import time under gunicorn --preload.
+    Once started, a final flush runs at interpreter exit; flushers that
+    never started (throwaway instances, tests) register none.
+
+    With `autostart` off (the test runner) no thread is started and
+    pending work is only written by explicit flush() calls.
+    """
+
+    autostart = True
+
+    def __init__(self, flush_func, interval, name="core-flusher"):
+        self.flush_func = flush_func
+        self.interval = interval
+        self.name = name
+
+        self._event = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._exit_registered = False
+
+    def ensure_started(self):
+        if not self.autostart:
+            return
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+
+            self._stopped = False
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+            if not self._exit_registered:
+                # inherited by forked workers, so registered once
+                atexit.register(self.stop)
+                self._exit_registered = True
+
+    def wake(self):
+        self._event.set()
+
+    def stop(self, timeout=5):
+        self._stopped = True
+        self._event.set()
+
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            thread.join(timeout)
+
+        # Whatever is still pending gets written by the exiting thread
+        self._safe_flush()
+
+    def _run(self):
+        while not self._stopped:
+            self._event.wait(self.interval)
+            self._event.clear()
+            if self._stopped:
+                break
+            self._safe_flush()
+
+    def _safe_flush(self):
+        try:
+            self.flush_func()
+        except Exception as e:
+            # a failing flush must never kill the worker thread
+            print(f"[{self.name}] flush failed: {e}")
+        finally:
+            # background threads open their own DB connection
+            if threading.current_thread() is self._thread:
+                from django.db import connection
+                connection.close_if_unusable_or_obsolete()
@@ -0,0 +1,207 @@
+import math
+
+from django.db import transaction
+
+from core.plan_limits import BULK_CHUNK_SIZE, PLAN_BULK_LIMITS
+from core.validators import enforce_record_quota
+
+
+class BulkResource:
+    """
+    What the bulk endpoints need to know about one model: its row
+    serializer and the natural key rows are addressed by (`key`). With
+    `global_key` the key is unique across every row of the table (a plain
+    unique column), otherwise among the alive rows of one owner.
+    """
+
+    def __init__(self, model, serializer_class, key, global_key=False):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.key = key
+        self.global_key = global_key
+
+    def owned(self, user):
+        return self.model.objects.filter(created_by=user)
+
+    def taken_keys(self, user, keys):
+        """Keys among `keys` that already exist, one query."""
+        queryset = self.model.all_objects.all() if self.global_key else self.owned(user)
+        return set(
+            queryset.filter(**{f"{self.key}__in": keys}).values_list(self.key, flat=True)
+        )
+
+
+def get_bulk_limits(plan):
+    return PLAN_BULK_LIMITS.get(plan.name.upper() if plan else "FREE", PLAN_BULK_LIMITS["FREE"])
+
+
+def api_calls_for(limits, rows):
+    """API calls a bulk request of `rows` rows counts as."""
+    if limits["charge"] == "request":
+        return 1
+    return max(1, math.ceil(rows / limits["rows_per_call"]))
+
+
+def row_error(index, errors):
+    return {"index": index, "errors": errors}
+
+
+def is_key(value):
+    """Keys are JSON scalars; lists and objects cannot address a row."""
+    return isinstance(value, (str, int, float))
+
+
+def key_error(resource, index, row):
+    """Per-row error for a missing or non-scalar key, None if `row` has a usable one."""
+    if not isinstance(row, dict) or resource.key not in row:
+        return row_error(index, {resource.key: ["This field is required."]})
+    if not is_key(row[resource.key]):
+        return row_error(index, {resource.key: ["Expected a string or a number."]})
+    return None
+
+
+def validate_create_rows(resource, user, rows):
+    """
+    Validates every row in one pass, then checks the natural key against
+    the batch itself and the table with a single query. Returns
+    (validated_data_list, errors), errors as [{"index": i, "errors": {...}}].
+    """
+    validated = []
+    errors = []
+    seen = {}
+
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append(row_error(index, {"non_field_errors": ["Expected an object."]}))
+            validated.append(None)
+            continue
+
+        serializer = resource.serializer_class(data=row)
+        if not serializer.is_valid():
+            errors.append(row_error(index, serializer.errors))
+            validated.append(None)
+            continue
+
+        validated.append(serializer.validated_data)
+        seen.setdefault(serializer.validated_data[resource.key], []).append(index)
+
+    taken = resource.taken_keys(user, list(seen)) if seen else set()
+
+    for key, indexes in seen.items():
+        if key not in taken and len(indexes) == 1:
+            continue
+        for index in indexes:
+            errors.append(row_error(index, {resource.key: [f"A row with this {resource.key} already exists."]}))
+
+    errors.sort(key=lambda error: error["index"])
+    return validated, errors
+
+
+def bulk_create_rows(resource, user, validated, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Inserts validated rows in chunks inside one transaction. The record
+    quota is reserved once for the whole batch while the owner's profile
+    row is locked, so concurrent batches cannot both slip under the limit.
+    """
+    objs = [resource.model(created_by=user, **data) for data in validated]
+
+    with transaction.atomic():
+        enforce_record_quota(user, incoming_count=len(objs), for_update=True)
+
+        for start in range(0, len(objs), chunk_size):
+            # public ids and records_used are handled by SoftDeleteQuerySet
+            resource.model.objects.bulk_create(objs[start:start + chunk_size])
+
+    return objs
+
+
+def bulk_update_rows(resource, user, rows, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Partial updates addressed by the natural key: one query loads the
+    targets, every row is validated, and changed columns are written with
+    bulk_update. Nothing is written if any row fails. Returns
+    (updated_objects, errors).
+    """
+    errors = []
+    keys = [row[resource.key] for index, row in enumerate(rows) if key_error(resource, index, row) is None]
+    instances = {
+        getattr(obj, resource.key): obj
+        for obj in resource.owned(user).filter(**{f"{resource.key}__in": keys})
+    }
+
+    changed = []
+    fields = set()
+    seen = set()
+
+    for index, row in enumerate(rows):
+        error = key_error(resource, index, row)
+        if error is not None:
+            errors.append(error)
+            continue
+
+        key = row[resource.key]
+        instance = instances.get(key)
+
+        if instance is None:
+            errors.append(row_error(index, {resource.key: ["Not found."]}))
+            continue
+
+        if key in seen:
+            errors.append(row_error(index, {resource.key: ["Row updated twice in one request."]}))
+            continue
+        seen.add(key)
+
+        data = {name: value for name, value in row.items() if name != resource.key}
+        serializer = resource.serializer_class(instance, data=data, partial=True)
+
+        if not serializer.is_valid():
+            errors.append(row_error(index, serializer.errors))
+            continue
+
+        for name, value in serializer.validated_data.items():
+            setattr(instance, name, value)
+            fields.add(name)
+
+        changed.append(instance)
+
+    if errors or not fields:
+        return changed, errors
+
+    with transaction.atomic():
+        resource.model.objects.bulk_update(changed, sorted(fields), batch_size=chunk_size)
+
+    return changed, errors
+
+
+def validate_delete_keys(resource, rows):
+    """
+    Delete rows are bare keys or objects carrying the key. Returns
+    (keys, errors), errors in the shape of validate_create_rows.
+    """
+    keys = []
+    errors = []
+
+    for index, row in enumerate(rows):
+        if isinstance(row, dict):
+            error = key_error(resource, index, row)
+            row = row.get(resource.key)
+        else:
+            error = None if is_key(row) else row_error(index, {resource.key: ["Expected a string or a number."]})
+
+        if error is not None:
+            errors.append(error)
+            continue
+        keys.append(row)
+
+    return keys, errors
+
+
+def bulk_delete_rows(resource, user, keys):
+    """Soft-deletes alive rows by natural key. Returns (deleted_count, missing_keys)."""
+    queryset = resource.owned(user).filter(**{f"{resource.key}__in": keys})
+    found = set(queryset.values_list(resource.key, flat=True))
+
+    deleted = queryset.delete() if found else 0
+    missing = [key for key in keys if key not in found]
+
+    return deleted, missing
@@ -0,0 +1,280 @@
+import re
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import BigIntegerField, DecimalField, Exists, ExpressionWrapper, F, OuterRef, Q, Subquery, TextField
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+from django.db.models.functions import Cast
+from rest_framework.exceptions import ValidationError
+
+from .custom_records import VALUE_COLUMNS, to_document
+from .models import CustomFieldValue, CustomObject
+
+
+# ?filter[<field>]=<value> or ?filter[<field>][<op>]=<value>
+FILTER_PARAM = re.compile(r"^filter\[(?P<field>[\w-]+)\](?:\[(?P<op>\w+)\])?$")
+SORT_PARAM = "sort"
+
+# DSL operator -> Django lookup
+OPERATORS = {
+    "eq": "exact",
+    "ne": "exact",
+    "gt": "gt",
+    "gte": "gte",
+    "lt": "lt",
+    "lte": "lte",
+    "in": "in",
+    "contains": "contains",
+    "icontains": "icontains",
+    "startswith": "startswith",
+    "isnull": "isnull",
+}
+
+RANGE_OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "in", "isnull")
+TEXT_OPERATORS = ("eq", "ne", "in", "contains", "icontains", "startswith", "isnull")
+
+TYPE_OPERATORS = {
+    "STRING": TEXT_OPERATORS,
+    "EMAIL": TEXT_OPERATORS,
+    "NUMBER": RANGE_OPERATORS,
+    "DECIMAL": RANGE_OPERATORS,
+    "DATE": RANGE_OPERATORS,
+    "DATETIME": RANGE_OPERATORS,
+    "BOOLEAN": ("eq", "ne", "isnull"),
+    "JSON": ("isnull",),
+}
+
+# record columns that can be sorted / filtered on like fields
+SYSTEM_FIELDS = ("created_at", "updated_at")
+
+# covered by record_object_created_idx
+INDEXED_SYSTEM_FIELDS = ("created_at",)
+
+MAX_IN_VALUES = 100
+
+
+class RecordQuery:
+    """
+    Parsed `filter[...]` / `sort` parameters of the records API for one
+    custom object, compiled against the object's storage engine:
+
+    EAV       one EXISTS / correlated subquery per field over the typed
+              CustomFieldValue.value_* column
+    DOCUMENT  lookups on `data ->> field`, cast like the expression indexes
+              created by core.custom_records.sync_field_indexes
+    """
+
+    def __init__(self, custom_object, schema, filters, sorts):
+        self.custom_object = custom_object
+        self.schema = schema
+        self.filters = filters
+        self.sorts = sorts
+
+    @classmethod
+    def from_params(cls, custom_object, schema, params):
+        errors = {}
+        filters = []
+
+        for key in params:
+            match = FILTER_PARAM.match(key)
+            if match is None:
+                continue
+
+            api_name = match.group("field")
+            op = match.group("op") or "eq"
+
+            try:
+                filters.append(parse_filter(schema, api_name, op, params.get(key)))
+            except DjangoValidationError as e:
+                errors[key] = e.messages
+
+        try:
+            sorts = parse_sort(schema, params.get(SORT_PARAM, ""))
+        except DjangoValidationError as e:
+            errors[SORT_PARAM] = e.messages
+            sorts = []
+
+        if errors:
+            raise ValidationError(errors)
+
+        return cls(custom_object, schema, filters, sorts)
+
+    def __bool__(self):
+        return bool(self.filters or self.sorts)
+
+    @property
+    def unindexed_sorts(self):
+        return [
+            api_name for api_name, _ in self.sorts
+            if api_name not in INDEXED_SYSTEM_FIELDS and api_name not in self.schema.indexed
+        ]
+
+    def apply(self, queryset):
+        document = self.custom_object.storage_mode == CustomObject.StorageMode.DOCUMENT
+
+        for position, (api_name, op, value) in enumerate(self.filters):
+            if api_name in SYSTEM_FIELDS:
+                condition = {f"{api_name}__{OPERATORS[op]}": value}
+                queryset = queryset.exclude(**condition) if op == "ne" else queryset.filter(**condition)
+            elif document:
+                # aliases are numbered: an api name may itself contain "__"
+                field = self.schema.by_name[api_name]
+                queryset = self._document_filter(queryset, field, op, value, f"_filter_{position}")
+            else:
+                queryset = self._eav_filter(queryset, self.schema.by_name[api_name], op, value)
+
+        if not self.sorts:
+            return queryset.order_by("created_at", "id")
+
+        ordering = []
+        for position, (api_name, descending) in enumerate(self.sorts):
+            if api_name in SYSTEM_FIELDS:
+                expression = F(api_name)
+            else:
+                alias = f"_sort_{position}"
+                field = self.schema.by_name[api_name]
+                queryset = queryset.alias(**{alias: self._sort_expression(field, document)})
+                expression = F(alias)
+
+            ordering.append(expression.desc(nulls_last=True) if descending else expression.asc(nulls_last=True))
+
+        # stable pages: the primary key breaks ties
+        ordering.append(F("id").desc() if self.sorts[-1][1] else F("id").asc())
+        return queryset.order_by(*ordering)
+
+    #------------------------------------------ EAV Starts ------------------------------------------
+
+    def _eav_values(self, field):
+        return CustomFieldValue.objects.filter(
+            record_id=OuterRef("pk"),
+            field_api_name=field.api_name,
+        )
+
+    def _eav_filter(self, queryset, field, op, value):
+        column = VALUE_COLUMNS[field.data_type]
+        values = self._eav_values(field)
+
+        if op == "isnull":
+            present = Exists(values.filter(**{f"{column}__isnull": False}))
+            return queryset.filter(~present if value else present)
+
+        matching = Exists(values.filter(**{f"{column}__{OPERATORS[op]}": value}))
+        return queryset.filter(~matching if op == "ne" else matching)
+
+    #------------------------------------------ EAV Ends ------------------------------------------
+
+    #------------------------------------------ Document Starts ------------------------------------------
+
+    def _document_expression(self, field):
+        value = KeyTextTransform(field.api_name, "data")
+
+        if field.data_type == "NUMBER":
+            return Cast(value, BigIntegerField())
+        if field.data_type == "DECIMAL":
+            return Cast(value, DecimalField(max_digits=18, decimal_places=6))
+
+        # strings and ISO dates compare as text; the wrapper swaps the JSON
+        # key lookups for plain text ones without changing the SQL
+        return ExpressionWrapper(value, output_field=TextField())
+
+    def _document_filter(self, queryset, field, op, value, alias):
+        if field.data_type == "BOOLEAN":
+            # JSON true/false, compared as jsonb on Postgres
+            queryset = queryset.alias(**{alias: KeyTransform(field.api_name, "data")})
+            if op == "isnull":
+                return queryset.filter(**{f"{alias}__isnull": value})
+            if op == "ne":
+                # like EAV: records without the value are "not equal" as well
+                return queryset.filter(Q(**{f"{alias}__isnull": True}) | ~Q(**{alias: value}))
+            return queryset.filter(**{alias: value})
+
+        queryset = queryset.alias(**{alias: self._document_expression(field)})
+
+        if op != "isnull" and field.data_type not in ("NUMBER", "DECIMAL"):
+            value = [document_text(v) for v in value] if op == "in" else document_text(value)
+
+        condition = {f"{alias}__{OPERATORS[op]}": value}
+        return queryset.exclude(**condition) if op == "ne" else queryset.filter(**condition)
+
+    #------------------------------------------ Document Ends ------------------------------------------
+
+    def _sort_expression(self, field, document):
+        if document:
+            return self._document_expression(field)
+
+        column = VALUE_COLUMNS[field.data_type]
+        return Subquery(self._eav_values(field).values(column)[:1])
+
+
+def document_text(value):
+    # what `data ->> field` returns for a value written by DocumentStorage
+    return str(to_document(value))
+
+
+def parse_filter(schema, api_name, op, raw):
+    """Returns (api_name, op, value) with `raw` coerced to the field's type."""
+    if api_name in SYSTEM_FIELDS:
+        data_type = "DATETIME"
+        field = None
+    elif api_name in schema.by_name:
+        field = schema.by_name[api_name]
+        data_type = field.data_type
+    else:
+        raise DjangoValidationError(f"Unknown field '{api_name}'.")
+
+    if op not in OPERATORS:
+        raise DjangoValidationError(f"Unknown operator '{op}'.")
+
+    if op not in TYPE_OPERATORS[data_type]:
+        raise DjangoValidationError(
+            f"Operator '{op}' is not supported for {data_type.lower()} fields."
+        )
+
+    if op == "isnull":
+        return api_name, op, raw in ("1", "true", "True", "yes")
+
+    if op in ("contains", "icontains", "startswith"):
+        return api_name, op, str(raw)
+
+    raws = raw.split(",") if op == "in" else [raw]
+    if len(raws) > MAX_IN_VALUES:
+        raise DjangoValidationError(f"At most {MAX_IN_VALUES} values are allowed.")
+
+    if field is None:
+        from .custom_schema import to_datetime
+        try:
+            values = [to_datetime(value) for value in raws]
+        except ValueError:
+            raise DjangoValidationError("Invalid datetime value.")
+    else:
+        values = [coerce(field, value) for value in raws]
+
+    return api_name, op, values if op == "in" else values[0]
+
+
+def coerce(field, raw):
+    # type conversion only: min/max and regex apply to stored values,
+    # not to the bounds of a query
+    try:
+        return field.convert(raw)
+    except Exception:
+        raise DjangoValidationError(f"Invalid {field.data_type.lower()} value.")
+
+
+def parse_sort(schema, raw):
+    """`-price,name` -> [("price", True), ("name", False)]"""
+    sorts = []
+
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        descending = item.startswith("-")
+        api_name = item.lstrip("-")
+
+        if api_name not in SYSTEM_FIELDS and api_name not in schema.by_name:
+            raise DjangoValidationError(f"Unknown field '{api_name}'.")
+
+        if api_name in schema.by_name and schema.by_name[api_name].data_type == "JSON":
+            raise DjangoValidationError(f"JSON field '{api_name}' cannot be sorted.")
+
+        sorts.append((api_name, descending))
+
+    return sorts
+
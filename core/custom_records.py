@@ -0,0 +1,431 @@
+import hashlib
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models.fields.json import KeyTransform
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .custom_schema import get_schema
+from .models import CustomFieldValue, CustomObject, CustomObjectRecord
+
+
+# CustomFieldValue column holding each data type in EAV storage
+VALUE_COLUMNS = {
+    "STRING": "value_string",
+    "EMAIL": "value_string",
+    "NUMBER": "value_number",
+    "DECIMAL": "value_decimal",
+    "BOOLEAN": "value_boolean",
+    "DATE": "value_date",
+    "DATETIME": "value_datetime",
+    "JSON": "value_json",
+}
+
+#------------------------------------------ Storage Engines Start ------------------------------------------
+
+class EAVStorage:
+    """One CustomFieldValue row per field value."""
+
+    mode = CustomObject.StorageMode.EAV
+
+    def prepare(self, record, fields, values):
+        """Returns the CustomFieldValue rows to insert once `record` exists."""
+        types = {field.api_name: field.data_type for field in fields}
+
+        return [
+            CustomFieldValue(
+                record=record,
+                field_api_name=api_name,
+                **{VALUE_COLUMNS[types[api_name]]: value},
+            )
+            for api_name, value in values.items()
+        ]
+
+    def load(self, records, fields):
+        """Pivots the values of `records` into {record_id: {api_name: value}} with one query."""
+        columns = {field.api_name: VALUE_COLUMNS[field.data_type] for field in fields}
+        data = {record.pk: {} for record in records}
+
+        rows = CustomFieldValue.objects.filter(
+            record_id__in=list(data),
+            field_api_name__in=list(columns),
+        ).values_list("record_id", "field_api_name", *sorted(set(columns.values())))
+
+        column_index = {column: i + 2 for i, column in enumerate(sorted(set(columns.values())))}
+
+        for row in rows:
+            api_name = row[1]
+            data[row[0]][api_name] = row[column_index[columns[api_name]]]
+
+        return data
+
+
+class DocumentStorage:
+    """All values of a record in CustomObjectRecord.data (JSONB on Postgres)."""
+
+    mode = CustomObject.StorageMode.DOCUMENT
+
+    def prepare(self, record, fields, values):
+        record.data = {api_name: to_document(value) for api_name, value in values.items()}
+        return []
+
+    def load(self, records, fields):
+        types = {field.api_name: field.data_type for field in fields}
+
+        return {
+            record.pk: {
+                api_name: from_document(types[api_name], value)
+                for api_name, value in (record.data or {}).items()
+                if api_name in types
+            }
+            for record in records
+        }
+
+
+STORAGE_ENGINES = {
+    CustomObject.StorageMode.EAV: EAVStorage(),
+    CustomObject.StorageMode.DOCUMENT: DocumentStorage(),
+}
+
+
+def get_storage(custom_object):
+    return STORAGE_ENGINES[custom_object.storage_mode]
+
+
+def to_document(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        # UTC so that ISO strings sort chronologically
+        return value.astimezone(dt_timezone.utc).isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def from_document(data_type, value):
+    if value is None:
+        return None
+    if data_type == "DECIMAL":
+        return Decimal(value)
+    if data_type == "DATE":
+        return parse_date(value)
+    if data_type == "DATETIME":
+        return parse_datetime(value)
+    return value
+
+#------------------------------------------ Storage Engines End ------------------------------------------
+
+
+def create_record(custom_object, fields, values, tenant):
+    """Inserts one already-validated record with the object's storage engine."""
+    storage = get_storage(custom_object)
+
+    with transaction.atomic():
+        record = CustomObjectRecord(
+            tenant=tenant,
+            object_api_name=custom_object.api_name,
+        )
+        rows = storage.prepare(record, fields, values)
+        record.save()
+
+        if rows:
+            CustomFieldValue.objects.bulk_create(rows)
+
+    return record
+
+
+def validate_records(custom_object, schema, payloads):
+    """
+    Validates a batch of submitted records in one pass with the compiled
+    schema, including is_unique fields against each other and against
+    stored records (one query per unique field). Returns
+    (values_list, errors) where errors is [{"index": i, "errors": {...}}, ...].
+    """
+    cleaned = []
+    errors = []
+
+    for index, payload in enumerate(payloads):
+        if not isinstance(payload, dict):
+            errors.append({"index": index, "errors": {"non_field_errors": ["Expected an object."]}})
+            cleaned.append({})
+            continue
+
+        values, record_errors = schema.clean(payload)
+        cleaned.append(values)
+        if record_errors:
+            errors.append({"index": index, "errors": record_errors})
+
+    for field in schema.unique:
+        seen = {}
+        for index, values in enumerate(cleaned):
+            if field.api_name in values:
+                seen.setdefault(to_document(values[field.api_name]), []).append(index)
+
+        if not seen:
+            continue
+
+        taken = find_existing_values(custom_object, field, list(seen))
+
+        for value, indexes in seen.items():
+            duplicate = value in taken or len(indexes) > 1
+            if not duplicate:
+                continue
+            for index in indexes:
+                errors.append({
+                    "index": index,
+                    "errors": {field.api_name: ["A record with this value already exists."]},
+                })
+
+    errors.sort(key=lambda error: error["index"])
+    return cleaned, errors
+
+
+def find_existing_values(custom_object, field, candidates):
+    """Stored values of `field` among `candidates` (document form)."""
+    if get_storage(custom_object).mode == CustomObject.StorageMode.DOCUMENT:
+        # a transform, not a "data__<api_name>" lookup: "__" in the api name
+        # would be read as a nested path
+        stored = (
+            CustomObjectRecord.objects.filter(
+                tenant_id=custom_object.tenant_id,
+                object_api_name=custom_object.api_name,
+            )
+            .annotate(_value=KeyTransform(field.api_name, "data"))
+            .filter(_value__in=candidates)
+            .values_list("_value", flat=True)
+        )
+        return set(stored)
+
+    column = VALUE_COLUMNS[field.data_type]
+    stored = CustomFieldValue.objects.filter(
+        record__tenant_id=custom_object.tenant_id,
+        record__object_api_name=custom_object.api_name,
+        field_api_name=field.api_name,
+        **{f"{column}__in": [from_document(field.data_type, value) for value in candidates]},
+    ).values_list(column, flat=True)
+    return {to_document(value) for value in stored}
+
+
+def bulk_create_records(custom_object, fields, values_list, tenant, batch_size=500):
+    """
+    Inserts validated records and their values with bulk_create in one
+    transaction. Record ids are generated client side, so value rows can
+    be built before the records hit the database.
+    """
+    storage = get_storage(custom_object)
+    records = []
+    rows = []
+
+    for values in values_list:
+        record = CustomObjectRecord(
+            tenant=tenant,
+            object_api_name=custom_object.api_name,
+        )
+        rows.extend(storage.prepare(record, fields, values))
+        records.append(record)
+
+    with transaction.atomic():
+        CustomObjectRecord.objects.bulk_create(records, batch_size=batch_size)
+        if rows:
+            CustomFieldValue.objects.bulk_create(rows, batch_size=batch_size)
+
+    return records
+
+
+def records_to_representation(custom_object, fields, records, values=None):
+    """
+    Flat JSON-ready dicts for `records`. Values are pivoted with a single
+    query unless already known (e.g. right after a bulk insert).
+    """
+    if values is None:
+        values = get_storage(custom_object).load(records, fields)
+
+    data = []
+    for record in records:
+        item = {
+            "id": str(record.pk),
+            "created_at": record.created_at,
+            "updated_at": record.updated_at,
+        }
+        for api_name, value in values.get(record.pk, {}).items():
+            item[api_name] = str(value) if isinstance(value, Decimal) else value
+        data.append(item)
+
+    return data
+
+
+def convert_storage(custom_object, mode, batch_size=500):
+    """
+    Moves every record of `custom_object` to another storage engine in one
+    transaction, then switches `storage_mode`. Returns the records moved.
+    """
+    source = get_storage(custom_object)
+    target = STORAGE_ENGINES[mode]
+
+    if source.mode == target.mode:
+        return 0
+
+    fields = get_schema(custom_object).fields
+    records = CustomObjectRecord.objects.filter(
+        tenant_id=custom_object.tenant_id,
+        object_api_name=custom_object.api_name,
+    ).order_by("pk")
+
+    moved = 0
+
+    with transaction.atomic():
+        batch = []
+        for record in records.iterator(chunk_size=batch_size):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                moved += _convert_batch(batch, fields, source, target)
+                batch = []
+
+        if batch:
+            moved += _convert_batch(batch, fields, source, target)
+
+        custom_object.storage_mode = mode
+        custom_object.save(update_fields=["storage_mode", "updated_at"])
+
+    sync_field_indexes(custom_object)
+
+    return moved
+
+
+def _convert_batch(records, fields, source, target):
+    loaded = source.load(records, fields)
+    rows = []
+
+    for record in records:
+        rows.extend(target.prepare(record, fields, loaded[record.pk]))
+
+    if target.mode == CustomObject.StorageMode.DOCUMENT:
+        CustomObjectRecord.objects.bulk_update(records, ["data"])
+        CustomFieldValue.objects.filter(record__in=records).delete()
+    else:
+        CustomFieldValue.objects.bulk_create(rows)
+        for record in records:
+            record.data = {}
+        CustomObjectRecord.objects.bulk_update(records, ["data"])
+
+    return len(records)
+
+
+#------------------------------------------ Field Indexes Start ------------------------------------------
+
+# DOCUMENT expression per data type. They match what core.custom_query
+# compiles (Cast to BigIntegerField / DecimalField(18, 6)) so the planner
+# can use them; ISO date strings already sort correctly as text.
+DOCUMENT_INDEX_EXPRESSIONS = {
+    "NUMBER": "((data ->> %s)::bigint)",
+    "DECIMAL": "((data ->> %s)::numeric(18, 6))",
+}
+
+
+def field_index_name(custom_object_id, api_name):
+    digest = hashlib.sha1(f"{custom_object_id}:{api_name}".encode()).hexdigest()[:16]
+    return f"cor_doc_{digest}"
+
+
+def value_index_name(api_name, column):
+    # EAV value rows carry no tenant, so the index is shared by every
+    # object that has an indexed field with this api_name and type
+    digest = hashlib.sha1(f"{api_name}:{column}".encode()).hexdigest()[:16]
+    return f"cfv_{digest}"
+
+
+def sync_field_indexes(custom_object):
+    """
+    Postgres only: partial indexes for the `is_indexed` fields of an object.
+
+    DOCUMENT objects get one expression index per field scoped to the
+    object's rows; EAV objects get a (value column, record_id) index on
+    CustomFieldValue restricted to the field's api_name. Indexes that no
+    field needs any more are dropped.
+
+    The tables are shared by every tenant, so indexes are built and dropped
+    CONCURRENTLY, which cannot run inside a transaction: call this from the
+    "core.sync_field_indexes" job (core.tasks), not from a request.
+    """
+    if connection.vendor != "postgresql":
+        return
+    if connection.in_atomic_block:
+        raise RuntimeError("sync_field_indexes() cannot run inside a transaction.")
+
+    document = custom_object.storage_mode == CustomObject.StorageMode.DOCUMENT
+
+    with connection.cursor() as cursor:
+        for field in custom_object.fields.all():
+            indexed = field.is_indexed and field.data_type != "JSON"
+            name = field_index_name(custom_object.pk, field.api_name)
+
+            if document and indexed:
+                expression = DOCUMENT_INDEX_EXPRESSIONS.get(field.data_type, "(data ->> %s)")
+                create_index(
+                    cursor, name,
+                    f"ON core_customobjectrecord ({expression}) WHERE tenant_id = %s AND object_api_name = %s",
+                    [field.api_name, custom_object.tenant_id, custom_object.api_name],
+                )
+            else:
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+            if not document and indexed:
+                column = VALUE_COLUMNS[field.data_type]
+                create_index(
+                    cursor, value_index_name(field.api_name, column),
+                    f"ON core_customfieldvalue ({column}, record_id) WHERE field_api_name = %s",
+                    [field.api_name],
+                )
+            elif not indexed:
+                drop_value_index(cursor, field.api_name, field.data_type)
+
+
+def create_index(cursor, name, definition, params):
+    """
+    CREATE INDEX CONCURRENTLY `name`. A build that failed half way leaves an
+    INVALID index behind, which IF NOT EXISTS would keep forever: it is
+    dropped and built again.
+    """
+    cursor.execute(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+        [name],
+    )
+    row = cursor.fetchone()
+    if row is not None and row[0]:
+        return
+    if row is not None:
+        cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+    cursor.execute(f'CREATE INDEX CONCURRENTLY "{name}" {definition}', params)
+
+
+def drop_field_index(custom_object_id, api_name, data_type=None):
+    """Drops the index of a removed or renamed field; same rules as sync_field_indexes()."""
+    if connection.vendor != "postgresql":
+        return
+    if connection.in_atomic_block:
+        raise RuntimeError("drop_field_index() cannot run inside a transaction.")
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{field_index_name(custom_object_id, api_name)}"')
+        if data_type:
+            drop_value_index(cursor, api_name, data_type)
+
+
+def drop_value_index(cursor, api_name, data_type):
+    from .models import CustomField
+
+    column = VALUE_COLUMNS[data_type]
+    still_used = CustomField.objects.filter(
+        api_name=api_name,
+        data_type__in=[t for t, c in VALUE_COLUMNS.items() if c == column],
+        is_indexed=True,
+        custom_object__storage_mode=CustomObject.StorageMode.EAV,
+    ).exists()
+
+    if not still_used:
+        cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{value_index_name(api_name, column)}"')
+
+#------------------------------------------ Field Indexes End ------------------------------------------
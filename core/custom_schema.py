@@ -0,0 +1,284 @@
+import re
+import threading
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import serializers
+
+
+TRUE_VALUES = (True, 1, "1", "on", "true", "True", "yes")
+FALSE_VALUES = (False, 0, "0", "off", "false", "False", "no")
+
+# BigIntegerField range of CustomFieldValue.value_number
+NUMBER_MIN = -2 ** 63
+NUMBER_MAX = 2 ** 63 - 1
+
+# CustomFieldValue.value_decimal is max_digits=18, decimal_places=6
+DECIMAL_QUANTUM = Decimal("0.000001")
+DECIMAL_INTEGER_DIGITS = 12
+
+# Compiled schemas kept per process before the cache is reset
+SCHEMA_CACHE_SIZE = 1024
+
+
+#------------------------------------------ Converters Start ------------------------------------------
+
+def to_string(raw):
+    return str(raw)
+
+
+def to_email(raw):
+    value = str(raw)
+    validate_email(value)
+    return value
+
+
+def to_number(raw):
+    if isinstance(raw, bool):
+        raise ValueError
+    if isinstance(raw, float):
+        if not raw.is_integer():
+            raise ValueError
+    elif not isinstance(raw, int):
+        # "3" and "3.0" are fine, "1.9" is not truncated to 1
+        value = Decimal(str(raw).strip())
+        if not value.is_finite() or value != value.to_integral_value():
+            raise ValueError
+        raw = value
+    value = int(raw)
+    # CustomFieldValue.value_number and the DOCUMENT ::bigint index are 64 bit
+    if not NUMBER_MIN <= value <= NUMBER_MAX:
+        raise ValueError
+    return value
+
+
+def to_decimal(raw):
+    if isinstance(raw, bool):
+        raise ValueError
+    value = Decimal(str(raw))
+    if not value.is_finite() or value.adjusted() >= DECIMAL_INTEGER_DIGITS:
+        raise ValueError
+    # same scale as CustomFieldValue.value_decimal in both storage engines
+    return value.quantize(DECIMAL_QUANTUM)
+
+
+def to_boolean(raw):
+    if raw in TRUE_VALUES:
+        return True
+    if raw in FALSE_VALUES:
+        return False
+    raise ValueError
+
+
+def to_date(raw):
+    value = raw if isinstance(raw, date) else parse_date(str(raw))
+    if value is None:
+        raise ValueError
+    return value
+
+
+def to_datetime(raw):
+    value = raw if isinstance(raw, datetime) else parse_datetime(str(raw))
+    if value is None:
+        raise ValueError
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def to_json(raw):
+    return raw
+
+
+CONVERTERS = {
+    "STRING": to_string,
+    "EMAIL": to_email,
+    "NUMBER": to_number,
+    "DECIMAL": to_decimal,
+    "BOOLEAN": to_boolean,
+    "DATE": to_date,
+    "DATETIME": to_datetime,
+    "JSON": to_json,
+}
+
+#------------------------------------------ Converters End ------------------------------------------
+
+
+class CompiledField:
+    """A CustomField reduced to what validation and storage need."""
+
+    __slots__ = (
+        "name", "api_name", "data_type", "is_required", "is_unique",
+        "is_indexed", "min_value", "max_value", "regex", "pattern", "convert",
+    )
+
+    def __init__(self, field):
+        self.name = field.name
+        self.api_name = field.api_name
+        self.data_type = field.data_type
+        self.is_required = field.is_required
+        self.is_unique = field.is_unique
+        self.is_indexed = field.is_indexed
+        self.convert = CONVERTERS[field.data_type]
+
+        numeric = field.data_type in ("NUMBER", "DECIMAL")
+        self.min_value = field.min_value if numeric else None
+        self.max_value = field.max_value if numeric else None
+
+        self.regex = field.regex if field.data_type in ("STRING", "EMAIL") else None
+        try:
+            self.pattern = re.compile(self.regex) if self.regex else None
+        except re.error:
+            self.pattern = False
+
+    def clean(self, raw):
+        """Submitted value -> Python value of data_type. Raises ValidationError."""
+        try:
+            value = self.convert(raw)
+        except (TypeError, ValueError, InvalidOperation, ValidationError):
+            raise ValidationError(f"Invalid {self.data_type.lower()} value.")
+
+        if self.min_value is not None and value < self.min_value:
+            raise ValidationError(f"Ensure this value is greater than or equal to {self.min_value}.")
+        if self.max_value is not None and value > self.max_value:
+            raise ValidationError(f"Ensure this value is less than or equal to {self.max_value}.")
+
+        if self.pattern is False:
+            raise ValidationError("Field has an invalid pattern configured.")
+        if self.pattern is not None and not self.pattern.fullmatch(value):
+            raise ValidationError("Value does not match the required pattern.")
+
+        return value
+
+
+class CompiledSchema:
+    """
+    Validator/coercer for one version of a custom object's field list.
+    """
+
+    def __init__(self, custom_object, fields):
+        self.tenant_id = custom_object.tenant_id
+        self.api_name = custom_object.api_name
+        self.object_id = custom_object.pk
+        self.version = custom_object.schema_version
+
+        self.fields = [CompiledField(field) for field in fields]
+        self.by_name = {field.api_name: field for field in self.fields}
+        self.required = frozenset(f.api_name for f in self.fields if f.is_required)
+        self.unique = [f for f in self.fields if f.is_unique]
+        self.indexed = frozenset(f.api_name for f in self.fields if f.is_indexed)
+
+        self._serializer_class = None
+
+    def clean(self, data):
+        """
+        Validates one submitted record. Returns (values, errors) keyed by
+        field api_name; blank values are skipped.
+        """
+        values = {}
+        errors = {}
+
+        for field in self.fields:
+            raw = data.get(field.api_name)
+
+            if raw in ("", None):
+                if field.is_required:
+                    errors[field.api_name] = ["This field is required."]
+                continue
+
+            try:
+                values[field.api_name] = field.clean(raw)
+            except ValidationError as e:
+                errors[field.api_name] = e.messages
+
+        return values, errors
+
+    @property
+    def serializer_class(self):
+        if self._serializer_class is None:
+            self._serializer_class = build_serializer_class(self)
+        return self._serializer_class
+
+
+def build_serializer_class(schema):
+    """Dynamic DRF serializer describing the object's records (OPTIONS, docs)."""
+    attrs = {
+        "id": serializers.UUIDField(read_only=True),
+        "created_at": serializers.DateTimeField(read_only=True),
+        "updated_at": serializers.DateTimeField(read_only=True),
+    }
+
+    for field in schema.fields:
+        kwargs = {"required": field.is_required, "allow_null": not field.is_required}
+
+        if field.data_type == "STRING":
+            drf_field = serializers.CharField(allow_blank=not field.is_required, **kwargs)
+        elif field.data_type == "EMAIL":
+            drf_field = serializers.EmailField(**kwargs)
+        elif field.data_type == "NUMBER":
+            drf_field = serializers.IntegerField(
+                min_value=field.min_value, max_value=field.max_value, **kwargs
+            )
+        elif field.data_type == "DECIMAL":
+            drf_field = serializers.DecimalField(
+                max_digits=18, decimal_places=6,
+                min_value=field.min_value, max_value=field.max_value, **kwargs
+            )
+        elif field.data_type == "BOOLEAN":
+            drf_field = serializers.BooleanField(**kwargs)
+        elif field.data_type == "DATE":
+            drf_field = serializers.DateField(**kwargs)
+        elif field.data_type == "DATETIME":
+            drf_field = serializers.DateTimeField(**kwargs)
+        else:
+            drf_field = serializers.JSONField(**kwargs)
+
+        attrs[field.api_name] = drf_field
+
+    name = f"{schema.api_name.title().replace('_', '').replace('-', '')}RecordSerializer"
+    return type(name, (serializers.Serializer,), attrs)
+
+
+#------------------------------------------ Schema Cache Starts ------------------------------------------
+
+_schemas = {}
+_schemas_lock = threading.Lock()
+
+
+def get_schema(custom_object):
+    """
+    Compiled schema for `custom_object`, keyed by (tenant, api_name) and
+    checked against the object's pk and schema_version. The CustomField
+    rows are only read when the version changed, i.e. after a field was
+    added, edited or removed, or when the object was deleted and created
+    again under the same api_name (its version starts over).
+    """
+    key = (custom_object.tenant_id, custom_object.api_name)
+    schema = _schemas.get(key)
+
+    if (
+        schema is not None
+        and schema.object_id == custom_object.pk
+        and schema.version == custom_object.schema_version
+    ):
+        return schema
+
+    schema = CompiledSchema(custom_object, custom_object.fields.all())
+
+    with _schemas_lock:
+        if len(_schemas) >= SCHEMA_CACHE_SIZE:
+            _schemas.clear()
+        _schemas[key] = schema
+
+    return schema
+
+
+def invalidate_schema(custom_object):
+    with _schemas_lock:
+        _schemas.pop((custom_object.tenant_id, custom_object.api_name), None)
+
+#------------------------------------------ Schema Cache Ends ------------------------------------------
@@ -0,0 +1,103 @@
+import hashlib
+
+from django.apps import apps
+from django.db import connections, router
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.timezone import now
+
+from core.response_cache import response_cache
+from core.tenancy import get_tenant
+
+
+def bump_data_versions(model, user_ids):
+    """
+    Increments the DataVersion of `model` for every owner in `user_ids`
+    with one upsert per owner. Callers run this inside the transaction of
+    the write, so readers never see new rows under an old version.
+    """
+    user_ids = sorted({user_id for user_id in user_ids if user_id is not None})
+    if not user_ids:
+        return
+
+    DataVersion = apps.get_model("core", "DataVersion")
+    connection = connections[router.db_for_write(DataVersion)]
+    table = connection.ops.quote_name(DataVersion._meta.db_table)
+    stamp = now()
+
+    # same syntax on Postgres and SQLite >= 3.24; sorted ids keep the row
+    # locks of concurrent writers in one order
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} (tenant_id, model, version, updated_at) "
+            f"VALUES (%s, %s, 1, %s) "
+            f"ON CONFLICT (tenant_id, model) DO UPDATE "
+            f"SET version = {table}.version + 1, updated_at = EXCLUDED.updated_at",
+            [(user_id, model._meta.label_lower, stamp) for user_id in user_ids],
+        )
+
+
+def get_data_version(user, model):
+    """(version, updated_at) of `model` for `user`, (0, None) before any write."""
+    DataVersion = apps.get_model("core", "DataVersion")
+
+    rows = DataVersion.objects.filter(
+        tenant_id=user.pk, model=model._meta.label_lower
+    ).values_list("version", "updated_at")[:1]
+    return rows[0] if rows else (0, None)
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def conditional_response(request, etag, last_modified=None):
+    """304 (or 412) for `request` when the client's copy is current, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified=None):
+    """ETag / Last-Modified on `response`; clients revalidate on every use."""
+    if response.status_code not in (200, 304):
+        return response
+
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalListMixin:
+    """
+    Conditional GET for a ListAPIView over a DataVersionedMixin model. The
+    ETag covers the tenant's data version, the plan and the query string,
+    so `If-None-Match` is answered with 304 before the data tables are read.
+    Other requests are served from core.response_cache under the same ETag.
+    """
+
+    def get_etag_parts(self, request):
+        return (
+            self.get_queryset().model._meta.label_lower,
+            request.user.pk,
+            get_tenant(request).plan_name,
+            getattr(request.accepted_renderer, "format", None),
+            sorted(request.query_params.lists()),
+        )
+
+    def list(self, request, *args, **kwargs):
+        # superusers list every tenant's rows, no single version covers them
+        if request.user.is_superuser:
+            return super().list(request, *args, **kwargs)
+
+        version, updated_at = get_data_version(request.user, self.get_queryset().model)
+        etag = make_etag(version, *self.get_etag_parts(request))
+
+        response = conditional_response(request, etag, updated_at)
+        if response is None:
+            response = response_cache.get_or_compute(
+                etag, lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs)
+            )
+
+        return set_validators(response, etag, updated_at)
@@ -2,13 +2,15 @@ from functools import wraps
 from django.http import HttpResponseForbidden
 from django.http import JsonResponse
 from django.shortcuts import redirect
+from core.tenancy import get_tenant
 
 def plan_required(*, can_create=False, can_update=False, can_delete=False):
     def decorator(view_func):
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
-            profile = request.user.profile
-            plan = profile.plan
+            tenant = get_tenant(request)
+            profile = tenant.profile
+            plan = tenant.plan
             
             if request.user.is_superuser:
                 return view_func(request, *args, **kwargs)
@@ -41,7 +43,7 @@ def plan_required(*, can_create=False, can_update=False, can_delete=False):
 def api_quota_required(view_func):
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
-        profile = request.user.profile
+        profile = get_tenant(request).profile
 
         from core.utils import check_and_consume_api_call
 
@@ -57,7 +59,7 @@ def api_quota_required(view_func):
 
 def verified_user_required(view_func):
     def wrapper(request, *args, **kwargs):
-        if not request.user.profile.is_email_verified:
+        if not get_tenant(request).profile.is_email_verified:
             return redirect("verify_email_notice")
         return view_func(request, *args, **kwargs)
     return wrapper
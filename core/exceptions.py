@@ -2,7 +2,8 @@ from rest_framework.views import exception_handler
 from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
 from rest_framework import status
-from core.models import SystemLog
+from core.log_buffer import log_buffer
+from core.tenancy import get_tenant
 from django.db import IntegrityError
 
 def custom_exception_handler(exc, context):
@@ -12,22 +13,24 @@ def custom_exception_handler(exc, context):
     
     if isinstance(exc, Throttled):
         # Log safely
-        SystemLog.objects.create(
+        log_buffer.record(
+            user_id=request.user.pk if request.user.is_authenticated else None,
             service_name="API",
             log_level="WARNING",
             message="API rate limit exceeded",
             request_path=request.path,
             http_status=429,
             response_time_ms=0,
-            created_by=request.user if request.user.is_authenticated else None,
         )
 
+        tenant = get_tenant(request)
+
         return Response(
             {
                 "detail": "API limit reached for your plan",
-                "current_plan": request.user.profile.plan.name,
-                "limit": request.user.profile.plan.monthly_api_limit,
-                "reset_at": request.user.profile.api_reset_at,
+                "current_plan": tenant.plan.name,
+                "limit": tenant.plan.monthly_api_limit,
+                "reset_at": tenant.profile.api_reset_at,
             },
             status=status.HTTP_429_TOO_MANY_REQUESTS
         )
@@ -45,8 +48,8 @@ def custom_exception_handler(exc, context):
         request = context.get("request")
         user = request.user if request and request.user.is_authenticated else None
 
-        SystemLog.objects.create(
-            created_by=user,
+        log_buffer.record(
+            user_id=user.pk if user else None,
             service_name="API",
             log_level="ERROR",
             message=f"API error: {exc.__class__.__name__}",
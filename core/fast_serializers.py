@@ -0,0 +1,224 @@
+import decimal
+
+from rest_framework import fields as drf_fields
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+# Field types whose to_representation() is the identity for the Python
+# value a database column already returns (str, int, float, bool).
+IDENTITY_FIELDS = (
+    drf_fields.CharField,
+    drf_fields.ChoiceField,
+    drf_fields.IntegerField,
+    drf_fields.FloatField,
+    drf_fields.BooleanField,
+)
+
+
+def decimal_converter(field):
+    coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+
+    # DecimalField.quantize builds the quantum and context on every call
+    quantum = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        return f"{value.quantize(quantum, rounding=rounding, context=context):f}"
+
+    return convert
+
+
+def date_converter(field):
+    output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+
+    if output_format is None or output_format.lower() != drf_fields.ISO_8601:
+        return field.to_representation
+
+    return lambda value: value.isoformat()
+
+
+def field_converter(field):
+    """Callable turning a column value into what `field` would output, or None for identity."""
+    if isinstance(field, drf_fields.MultipleChoiceField):
+        return field.to_representation
+    if isinstance(field, drf_fields.DecimalField):
+        return decimal_converter(field)
+    if isinstance(field, drf_fields.DateTimeField):
+        return field.to_representation
+    if isinstance(field, drf_fields.DateField):
+        return date_converter(field)
+    if isinstance(field, IDENTITY_FIELDS):
+        return None
+    return field.to_representation
+
+
+class FastRowSerializer:
+    """
+    Read-only stand-in for a flat ModelSerializer: builds the same dicts
+    from `.values()` / `.values_list()` rows, skipping model instances and
+    per-field attribute lookups. The output is identical to
+    `serializer_class(instances, many=True).data`, so the rendered JSON is
+    byte-for-byte the same.
+    """
+
+    def __init__(self, serializer_class, only=None):
+        self.serializer_class = serializer_class
+
+        readable = [
+            (name, field)
+            for name, field in serializer_class().fields.items()
+            if not field.write_only and (only is None or name in only)
+        ]
+        self.names = [name for name, _ in readable]
+        self.sources = [field.source for _, field in readable]
+        self.converters = [field_converter(field) for _, field in readable]
+
+    @classmethod
+    def supports(cls, serializer_class):
+        # plain model columns only: no nested serializers, method fields or dotted sources
+        for field in serializer_class().fields.values():
+            if field.write_only:
+                continue
+            if field.source == "*" or "." in field.source:
+                return False
+            if isinstance(field, (drf_fields.SerializerMethodField, drf_fields.HiddenField)):
+                return False
+            if hasattr(field, "child") or hasattr(field, "fields"):
+                return False
+        return True
+
+    def row(self, values):
+        """One values_list() tuple (in `sources` order) -> output dict."""
+        return {
+            name: value if value is None or convert is None else convert(value)
+            for name, convert, value in zip(self.names, self.converters, values)
+        }
+
+    def rows(self, rows):
+        """Rows from .values() (dicts) or .values_list(*sources) (tuples)."""
+        sources = self.sources
+        return [
+            self.row([row[source] for source in sources] if isinstance(row, dict) else row)
+            for row in rows
+        ]
+
+
+_fast_serializers = {}
+
+
+def get_fast_serializer(serializer_class, only=None):
+    """
+    Cached FastRowSerializer for `serializer_class`, restricted to the
+    field names in `only` (a frozenset) if given. None when the serializer
+    isn't flat.
+    """
+    key = (serializer_class, only)
+
+    if key not in _fast_serializers:
+        _fast_serializers[key] = (
+            FastRowSerializer(serializer_class, only)
+            if FastRowSerializer.supports(serializer_class)
+            else None
+        )
+    return _fast_serializers[key]
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=a,b` on a generic view: only these serializer fields are
+    selected from the database and rendered.
+    """
+
+    fields_query_param = "fields"
+
+    def get_sparse_fields(self):
+        """frozenset of requested field names, or None for all of them."""
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        raw = self.request.query_params.get(self.fields_query_param)
+        if not raw:
+            return None
+
+        requested = [name.strip() for name in raw.split(",") if name.strip()]
+        available = [
+            name for name, field in self.get_serializer_class()().fields.items()
+            if not field.write_only
+        ]
+        unknown = [name for name in requested if name not in available]
+
+        if unknown or not requested:
+            raise ValidationError({
+                self.fields_query_param: [
+                    f"Unknown field(s): {', '.join(unknown)}. "
+                    f"Available: {', '.join(available)}."
+                ]
+            })
+
+        return frozenset(requested)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        only = self.get_sparse_fields()
+
+        if only is None:
+            return queryset
+
+        # .only() for the instance path; .values() later replaces it
+        fields = self.get_serializer_class()().fields
+        columns = {
+            fields[name].source.split(".")[0]
+            for name in only
+            if fields[name].source != "*"
+        }
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        return queryset.only(*(columns & concrete))
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        only = self.get_sparse_fields()
+
+        if only is not None:
+            target = getattr(serializer, "child", serializer)
+            for name in list(target.fields):
+                if name not in only:
+                    target.fields.pop(name)
+
+        return serializer
+
+
+class FastListMixin(SparseFieldsMixin):
+    """
+    ListAPIView mixin: pages are fetched with `.values()` and serialized by
+    FastRowSerializer when the serializer is a flat ModelSerializer.
+    `?fields=` narrows both the SELECT and the output.
+    """
+
+    def list(self, request, *args, **kwargs):
+        only = self.get_sparse_fields()
+        fast = get_fast_serializer(self.get_serializer_class(), only)
+
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        # the paginator reads the cursor position from the row dicts
+        extra = getattr(self.paginator, "cursor_ordering", ()) if self.paginator else ()
+        queryset = queryset.values(*dict.fromkeys([*fast.sources, *extra]))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.rows(page))
+
+        return Response(fast.rows(queryset))
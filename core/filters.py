@@ -1,5 +1,6 @@
 from django_filters import rest_framework as filters
 from .models import CustomerProfile, ProductCatalog
+from .search import search_products
 
 class CustomerProfileFilter(filters.FilterSet):
     is_email_verified = filters.BooleanFilter()
@@ -14,6 +15,7 @@ class ProductCatalogFilter(filters.FilterSet):
         field_name="product_name",
         lookup_expr="icontains"   # or icontains
     )
+    search = filters.CharFilter(method="filter_search")
     
     class Meta:
         model = ProductCatalog
@@ -21,4 +23,8 @@ class ProductCatalogFilter(filters.FilterSet):
             'product_name',
             'category',
             'product_rating'
-        ]
\ No newline at end of file
+        ]
+        
+    def filter_search(self, queryset, name, value):
+        # ?search= ranked trigram search, see core.search
+        return search_products(queryset, value)
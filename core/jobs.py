@@ -0,0 +1,367 @@
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F
+from django.utils.module_loading import module_has_submodule
+from django.utils.timezone import now
+
+from core.metrics import CallbackMetric
+from core.models import Job
+
+
+DEFAULT_JOB_QUEUE = {
+    "CONCURRENCY": 4,              # jobs run at once by one worker process
+    "POLL_INTERVAL": 1,            # seconds between claims on an idle queue
+    "RETRY_BACKOFF_SECONDS": 10,   # doubled after every failed attempt
+    "MAX_BACKOFF_SECONDS": 3600,
+    "STALE_AFTER_SECONDS": 600,    # RUNNING jobs without a heartbeat this long are requeued
+    "HEARTBEAT_SECONDS": 60,       # how often a worker refreshes locked_at of its running jobs
+    "KEEP_FINISHED_DAYS": 7,
+    "PERIODIC": {},                # {key: {"job": name, "every": seconds, "payload": {}}}
+}
+
+
+def get_job_config():
+    return {**DEFAULT_JOB_QUEUE, **getattr(settings, "JOB_QUEUE", {})}
+
+
+#------------------------------------------ Registry Starts ------------------------------------------
+
+_registry = {}
+
+
+class JobSpec:
+    def __init__(self, name, func, max_attempts):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+
+
+def job(name, max_attempts=3):
+    """Registers `func(**payload)` under `name`; jobs live in `<app>/tasks.py`."""
+    def register(func):
+        _registry[name] = JobSpec(name, func, max_attempts)
+        return func
+    return register
+
+
+def get_job(name):
+    return _registry.get(name)
+
+
+def autodiscover_jobs():
+    for app_config in apps.get_app_configs():
+        if module_has_submodule(app_config.module, "tasks"):
+            import_module(f"{app_config.name}.tasks")
+
+#------------------------------------------ Registry Ends ------------------------------------------
+
+
+#------------------------------------------ Metrics Starts ------------------------------------------
+
+class JobMetrics:
+    """Per-process counters of the worker, by job name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+        self.seconds = {}
+
+    def record(self, name, outcome, seconds=0.0):
+        with self._lock:
+            key = (name, outcome)
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts), dict(self.seconds)
+
+
+job_metrics = JobMetrics()
+
+
+def job_run_samples():
+    counts, _ = job_metrics.snapshot()
+    return [({"job": name, "outcome": outcome}, count) for (name, outcome), count in counts.items()]
+
+
+def job_seconds_samples():
+    _, seconds = job_metrics.snapshot()
+    return [({"job": name}, total) for name, total in seconds.items()]
+
+
+CallbackMetric(
+    "job_runs_total",
+    "Jobs run by this worker, by job and outcome.",
+    job_run_samples,
+    kind="counter",
+    labelnames=["job", "outcome"],
+)
+CallbackMetric(
+    "job_run_seconds_total",
+    "Time spent running jobs, by job.",
+    job_seconds_samples,
+    kind="counter",
+    labelnames=["job"],
+)
+
+
+def queue_stats():
+    """{status: count} plus the age in seconds of the oldest due job."""
+    stats = dict(Job.objects.values_list("status").annotate(total=Count("pk")).order_by())
+
+    oldest = (
+        Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now())
+        .order_by("run_at")
+        .values_list("run_at", flat=True)
+        .first()
+    )
+    stats["oldest_due_seconds"] = (now() - oldest).total_seconds() if oldest else 0
+    return stats
+
+#------------------------------------------ Metrics Ends ------------------------------------------
+
+
+def enqueue(name, payload=None, run_at=None, delay=None, priority=0, dedupe_key=None):
+    """
+    Queues job `name`. Inside a transaction the job commits with it, so a
+    worker never sees a job for data that was rolled back.
+    """
+    spec = get_job(name)
+    if spec is None:
+        raise ValueError(f"Unknown job: {name}")
+
+    if run_at is None:
+        run_at = now() + timedelta(seconds=delay or 0)
+
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        run_at=run_at,
+        priority=priority,
+        max_attempts=spec.max_attempts,
+        dedupe_key=dedupe_key,
+    )
+
+
+def claim_jobs(worker_id, limit):
+    """
+    Marks up to `limit` due jobs RUNNING for `worker_id` and returns them.
+    On Postgres candidates are locked with FOR UPDATE SKIP LOCKED, so
+    workers never wait on each other. Where SKIP LOCKED is missing
+    (SQLite), the write lock of the UPDATE serializes claimers and its
+    status condition drops rows another worker took first.
+    """
+    with transaction.atomic():
+        candidates = Job.objects.filter(
+            status=Job.Status.QUEUED,
+            run_at__lte=now(),
+        ).order_by("-priority", "run_at", "id")
+
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+
+        ids = list(candidates.values_list("pk", flat=True)[:limit])
+        if not ids:
+            return []
+
+        Job.objects.filter(pk__in=ids, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING,
+            locked_by=worker_id,
+            locked_at=now(),
+            attempts=F("attempts") + 1,
+        )
+
+    return list(Job.objects.filter(pk__in=ids, status=Job.Status.RUNNING, locked_by=worker_id))
+
+
+def retry_delay(attempts, config):
+    return timedelta(
+        seconds=min(config["RETRY_BACKOFF_SECONDS"] * 2 ** (attempts - 1), config["MAX_BACKOFF_SECONDS"])
+    )
+
+
+def run_job(job_row, config=None):
+    """Runs one claimed job and records DONE, a retry or FAILED."""
+    config = config or get_job_config()
+    spec = get_job(job_row.name)
+    started = time.monotonic()
+
+    try:
+        if spec is None:
+            raise LookupError(f"Unknown job: {job_row.name}")
+        spec.func(**job_row.payload)
+    except Exception:
+        elapsed = time.monotonic() - started
+        error = traceback.format_exc()[-4000:]
+
+        if job_row.attempts < job_row.max_attempts and spec is not None:
+            outcome = "retried"
+            changes = {"status": Job.Status.QUEUED, "run_at": now() + retry_delay(job_row.attempts, config)}
+        else:
+            outcome = "failed"
+            changes = {"status": Job.Status.FAILED, "finished_at": now()}
+
+        Job.objects.filter(pk=job_row.pk).update(last_error=error, locked_by="", locked_at=None, **changes)
+        job_metrics.record(job_row.name, outcome, elapsed)
+        return False
+
+    Job.objects.filter(pk=job_row.pk).update(
+        status=Job.Status.DONE,
+        finished_at=now(),
+        locked_by="",
+        locked_at=None,
+    )
+    job_metrics.record(job_row.name, "succeeded", time.monotonic() - started)
+    return True
+
+
+def schedule_periodic_jobs(config=None):
+    """
+    Enqueues the PERIODIC jobs whose current slot has no row yet. Slots are
+    deduplicated by Job.dedupe_key, so every worker may call this.
+    """
+    config = config or get_job_config()
+    timestamp = time.time()
+    rows = []
+
+    for key, entry in config["PERIODIC"].items():
+        spec = get_job(entry["job"])
+        if spec is None:
+            continue
+
+        slot = int(timestamp // entry["every"])
+        rows.append(Job(
+            name=spec.name,
+            payload=entry.get("payload", {}),
+            max_attempts=spec.max_attempts,
+            dedupe_key=f"periodic:{key}:{slot}",
+        ))
+
+    if rows:
+        Job.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def heartbeat(worker_id, job_ids):
+    """Refreshes locked_at of the jobs `worker_id` is running, so they are not taken as stale."""
+    if not job_ids:
+        return 0
+    return Job.objects.filter(pk__in=job_ids, status=Job.Status.RUNNING, locked_by=worker_id).update(
+        locked_at=now(),
+    )
+
+
+def requeue_stale_jobs(config=None):
+    """
+    RUNNING jobs without a heartbeat for STALE_AFTER_SECONDS lost their
+    worker: they are handed out again, or FAILED once their attempts are
+    used up (the lost run counted as one). Returns (requeued, failed).
+    """
+    config = config or get_job_config()
+    cutoff = now() - timedelta(seconds=config["STALE_AFTER_SECONDS"])
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=cutoff)
+
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED,
+        finished_at=now(),
+        last_error="Worker lost while running the job.",
+        locked_by="",
+        locked_at=None,
+    )
+    requeued = stale.update(
+        status=Job.Status.QUEUED,
+        locked_by="",
+        locked_at=None,
+    )
+    return requeued, failed
+
+
+def work_once(worker_id="inline", limit=10):
+    """Claims and runs due jobs in this thread; returns how many ran."""
+    config = get_job_config()
+    claimed = claim_jobs(worker_id, limit)
+
+    for job_row in claimed:
+        run_job(job_row, config)
+
+    return len(claimed)
+
+
+class Worker:
+    """
+    Polls the queue and runs up to `concurrency` jobs at once on a thread
+    pool. Periodic jobs and stale-job recovery are handled on the same
+    loop, at most once per poll interval, and locked_at of the running
+    jobs is refreshed every HEARTBEAT_SECONDS.
+    """
+
+    def __init__(self, concurrency=None, poll_interval=None):
+        config = get_job_config()
+        self.config = config
+        self.concurrency = concurrency or config["CONCURRENCY"]
+        self.poll_interval = poll_interval or config["POLL_INTERVAL"]
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._busy = 0
+        self._running = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _execute(self, job_row):
+        try:
+            run_job(job_row, self.config)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._busy -= 1
+                self._running.discard(job_row.pk)
+
+    def _heartbeat(self):
+        with self._lock:
+            running = list(self._running)
+        heartbeat(self.worker_id, running)
+
+    def run(self, once=False):
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as pool:
+            last_tick = 0.0
+            last_heartbeat = time.monotonic()
+
+            while not self._stopped.is_set():
+                if time.monotonic() - last_tick >= self.poll_interval:
+                    schedule_periodic_jobs(self.config)
+                    requeue_stale_jobs(self.config)
+                    last_tick = time.monotonic()
+
+                if time.monotonic() - last_heartbeat >= self.config["HEARTBEAT_SECONDS"]:
+                    self._heartbeat()
+                    last_heartbeat = time.monotonic()
+
+                with self._lock:
+                    free = self.concurrency - self._busy
+
+                claimed = claim_jobs(self.worker_id, free) if free else []
+
+                with self._lock:
+                    self._busy += len(claimed)
+                    self._running.update(job_row.pk for job_row in claimed)
+                for job_row in claimed:
+                    pool.submit(self._execute, job_row)
+
+                if once and not claimed and not self._busy:
+                    break
+
+                if not claimed:
+                    self._stopped.wait(self.poll_interval)
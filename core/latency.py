@@ -0,0 +1,263 @@
+import bisect
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from itertools import accumulate
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+
+from core.background import BackgroundFlusher
+
+
+DEFAULT_LATENCY_HISTOGRAMS = {
+    "ENABLED": True,
+    "WINDOW_SECONDS": 300,         # one LatencyWindow row per route and window
+    "FLUSH_INTERVAL_MS": 10000,
+    "KEEP_DAYS": 14,
+}
+
+
+def get_latency_config():
+    return {**DEFAULT_LATENCY_HISTOGRAMS, **getattr(settings, "LATENCY_HISTOGRAMS", {})}
+
+
+#------------------------------------------ Histogram Starts ------------------------------------------
+# Log-linear buckets (as in HdrHistogram): values below 2 * SUB_BUCKETS ms
+# get a bucket each, every further power of two is split into SUB_BUCKETS
+# equal buckets, so a bucket is never wider than 1/SUB_BUCKETS (6.25%) of
+# its values. Every histogram shares the layout and merges by adding counts.
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_TRACKED_MS = (1 << 17) - 1      # ~131 s, slower requests land in the last bucket
+
+
+def bucket_index(ms):
+    ms = min(max(int(ms), 0), MAX_TRACKED_MS)
+    if ms < 2 * SUB_BUCKETS:
+        return ms
+    shift = ms.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKETS + (ms >> shift)
+
+
+BUCKET_COUNT = bucket_index(MAX_TRACKED_MS) + 1
+
+
+def bucket_bounds(index):
+    """[low, high) in ms of bucket `index`."""
+    if index < 2 * SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index - shift * SUB_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+# highest value of each bucket, what a percentile reports
+BUCKET_VALUES = tuple(bucket_bounds(index)[1] - 1 for index in range(BUCKET_COUNT))
+
+
+def new_counts():
+    return [0] * BUCKET_COUNT
+
+
+def to_sparse(counts):
+    """Stored form: {"bucket index": count} without the empty buckets."""
+    return {str(index): count for index, count in enumerate(counts) if count}
+
+
+def add_sparse(counts, sparse):
+    for index, count in (sparse or {}).items():
+        counts[int(index)] += count
+    return counts
+
+
+def merge_sparse(target, other):
+    merged = dict(target or {})
+    for index, count in (other or {}).items():
+        merged[index] = merged.get(index, 0) + count
+    return merged
+
+
+def percentiles(counts, quantiles=(0.5, 0.95, 0.99)):
+    """
+    Values (ms) at `quantiles` of dense bucket `counts`, None without
+    samples: one running sum over the buckets, then a binary search per
+    quantile.
+    """
+    cumulative = list(accumulate(counts))
+    total = cumulative[-1] if cumulative else 0
+    if not total:
+        return [None] * len(quantiles)
+
+    return [
+        BUCKET_VALUES[bisect.bisect_left(cumulative, max(math.ceil(q * total), 1))]
+        for q in quantiles
+    ]
+
+#------------------------------------------ Histogram Ends ------------------------------------------
+
+
+#------------------------------------------ Recorder Starts ------------------------------------------
+
+class LatencyRecorder:
+    """
+    Per-process latency histograms by route and time window. Requests only
+    bump a bucket; a background thread merges the histograms into
+    LatencyWindow every FLUSH_INTERVAL_MS, where every worker adds up.
+    """
+
+    def __init__(self, enabled=True, window_seconds=300, flush_interval_ms=10000):
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+
+        self._lock = threading.Lock()
+        self._pending = {}
+
+        self._flusher = BackgroundFlusher(
+            self.flush,
+            flush_interval_ms / 1000,
+            name="latency-histograms",
+        )
+
+    @classmethod
+    def from_settings(cls):
+        config = get_latency_config()
+        return cls(
+            enabled=config["ENABLED"],
+            window_seconds=config["WINDOW_SECONDS"],
+            flush_interval_ms=config["FLUSH_INTERVAL_MS"],
+        )
+
+    def record(self, route, ms):
+        if not self.enabled:
+            return
+
+        window = int(time.time()) // self.window_seconds * self.window_seconds
+        index = bucket_index(ms)
+
+        with self._lock:
+            key = (window, route)
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = [0, 0, new_counts()]
+            entry[0] += 1
+            entry[1] += int(ms)
+            entry[2][index] += 1
+
+        self._flusher.ensure_started()
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def flush(self):
+        pending = self.drain()
+        try:
+            return store_windows(pending)
+        except Exception:
+            # merge the windows back so the next flush retries them
+            self.restore(pending)
+            raise
+
+    def restore(self, pending):
+        with self._lock:
+            for key, (requests, total_ms, counts) in pending.items():
+                entry = self._pending.get(key)
+                if entry is None:
+                    self._pending[key] = [requests, total_ms, counts]
+                    continue
+                entry[0] += requests
+                entry[1] += total_ms
+                entry[2] = [a + b for a, b in zip(entry[2], counts)]
+
+    def stop(self):
+        self._flusher.stop()
+
+
+def store_windows(pending):
+    """
+    Adds {(window, route): [requests, total_ms, counts]} to LatencyWindow:
+    missing rows are inserted first, then all of them are locked in key
+    order and merged, so concurrent flushes add up.
+    """
+    if not pending:
+        return 0
+
+    LatencyWindow = apps.get_model("core", "LatencyWindow")
+    totals = {
+        (datetime.fromtimestamp(window, dt_timezone.utc), route): entry
+        for (window, route), entry in pending.items()
+    }
+
+    with transaction.atomic():
+        LatencyWindow.objects.bulk_create(
+            [LatencyWindow(window_start=start, route=route) for start, route in sorted(totals)],
+            ignore_conflicts=True,
+        )
+
+        rows = (
+            LatencyWindow.objects.select_for_update()
+            .filter(
+                window_start__in={key[0] for key in totals},
+                route__in={key[1] for key in totals},
+            )
+            .order_by("window_start", "route")
+        )
+
+        changed = []
+        for row in rows:
+            entry = totals.get((row.window_start.astimezone(dt_timezone.utc), row.route))
+            if entry is None:
+                continue
+            row.requests += entry[0]
+            row.total_response_ms += entry[1]
+            row.histogram = merge_sparse(row.histogram, to_sparse(entry[2]))
+            changed.append(row)
+
+        LatencyWindow.objects.bulk_update(changed, ["requests", "total_response_ms", "histogram"])
+
+    return len(changed)
+
+
+latency_recorder = LatencyRecorder.from_settings()
+
+#------------------------------------------ Recorder Ends ------------------------------------------
+
+
+def route_latency(start, end, route=None):
+    """p50/p95/p99 per route over the LatencyWindow rows in [start, end)."""
+    LatencyWindow = apps.get_model("core", "LatencyWindow")
+
+    windows = LatencyWindow.objects.filter(window_start__gte=start, window_start__lt=end)
+    if route:
+        windows = windows.filter(route=route)
+
+    routes = {}
+    for name, requests, total_ms, histogram in windows.values_list(
+        "route", "requests", "total_response_ms", "histogram"
+    ).order_by():
+        entry = routes.get(name)
+        if entry is None:
+            entry = routes[name] = [0, 0, new_counts()]
+        entry[0] += requests
+        entry[1] += total_ms
+        add_sparse(entry[2], histogram)
+
+    results = []
+    for name, (requests, total_ms, counts) in sorted(routes.items()):
+        if not requests:
+            continue
+        p50, p95, p99 = percentiles(counts)
+        results.append({
+            "route": name,
+            "requests": requests,
+            "avg_ms": round(total_ms / requests, 1),
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        })
+    return results
@@ -0,0 +1,227 @@
+import threading
+from collections import deque, namedtuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.timezone import now
+
+from core.background import BackgroundFlusher
+from core.metrics import CallbackMetric
+from core.usage_rollups import record_usage
+
+
+LogEntry = namedtuple(
+    "LogEntry",
+    [
+        "user_id",
+        "service_name",
+        "log_level",
+        "message",
+        "request_path",
+        "http_status",
+        "response_time_ms",
+        "user_ip_address",
+        "logged_at",
+    ],
+)
+
+DEFAULT_LOG_BUFFER = {
+    "ENABLED": True,
+    "MAX_SIZE": 10000,
+    "BATCH_SIZE": 500,
+    "FLUSH_INTERVAL_MS": 1000,
+}
+
+
+class SystemLogBuffer:
+    """
+    Bounded in-memory queue of SystemLog rows.
+
+    Requests only append a compact LogEntry tuple; a background thread drains
+    the queue with bulk_create every FLUSH_INTERVAL_MS, or as soon as
+    BATCH_SIZE entries are waiting. When the queue is full new entries are
+    dropped and counted instead of blocking the request.
+    """
+
+    def __init__(self, enabled=True, max_size=10000, batch_size=500, flush_interval_ms=1000):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.batch_size = batch_size
+
+        self._entries = deque()
+        self._lock = threading.Lock()
+
+        self.dropped = 0
+        self.failed = 0
+        self.flushed = 0
+
+        self._flusher = BackgroundFlusher(
+            self.flush,
+            flush_interval_ms / 1000,
+            name="systemlog-buffer",
+        )
+
+    @classmethod
+    def from_settings(cls):
+        config = {**DEFAULT_LOG_BUFFER, **getattr(settings, "API_LOG_BUFFER", {})}
+        return cls(
+            enabled=config["ENABLED"],
+            max_size=config["MAX_SIZE"],
+            batch_size=config["BATCH_SIZE"],
+            flush_interval_ms=config["FLUSH_INTERVAL_MS"],
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def record(
+        self,
+        *,
+        user_id,
+        service_name,
+        log_level,
+        message,
+        request_path,
+        http_status,
+        response_time_ms=None,
+        user_ip_address=None,
+    ):
+        # SystemLog.created_by is mandatory, anonymous hits are not stored
+        if user_id is None:
+            return False
+
+        entry = LogEntry(
+            user_id,
+            service_name,
+            log_level,
+            message,
+            request_path[:255],
+            http_status,
+            response_time_ms,
+            user_ip_address,
+            # the time of the request, not of the flush writing it
+            now(),
+        )
+
+        if not self.enabled:
+            self._write([entry])
+            return True
+
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self.dropped += 1
+                return False
+
+            self._entries.append(entry)
+            depth = len(self._entries)
+
+        self._flusher.ensure_started()
+
+        if depth >= self.batch_size:
+            self._flusher.wake()
+
+        return True
+
+    def flush(self):
+        """Write every pending entry. Returns the number of rows handed to the DB."""
+        total = 0
+
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return total
+
+            self._write(batch)
+            total += len(batch)
+
+    def stop(self):
+        self._flusher.stop()
+
+    def clear(self):
+        """Drops the pending entries without writing them."""
+        with self._lock:
+            self._entries.clear()
+
+    def _drain(self, limit):
+        with self._lock:
+            count = min(limit, len(self._entries))
+            return [self._entries.popleft() for _ in range(count)]
+
+    def _write(self, batch):
+        """
+        Inserts the batch and adds it to UsageRollup in one transaction, so
+        the rollups never count rows that were not written, or miss some.
+        """
+        from core.models import SystemLog
+
+        objs = [
+            SystemLog(
+                created_by_id=entry.user_id,
+                service_name=entry.service_name,
+                log_level=entry.log_level,
+                message=entry.message,
+                request_path=entry.request_path,
+                http_status=entry.http_status,
+                response_time_ms=entry.response_time_ms,
+                user_ip_address=entry.user_ip_address,
+                logged_at=entry.logged_at,
+            )
+            for entry in batch
+        ]
+
+        # public ids are assigned by SoftDeleteQuerySet.bulk_create
+        try:
+            with transaction.atomic():
+                SystemLog.objects.bulk_create(objs)
+                record_usage(batch)
+            self.flushed += len(objs)
+            return
+        except IntegrityError:
+            pass
+        except Exception as e:
+            self.failed += len(objs)
+            print(f"[SystemLog Buffer] write of {len(objs)} rows failed: {e}")
+            return
+
+        # Rare public_id clash: fall back to row-by-row inserts, save()
+        # draws fresh ids. Rows that still fail are left out of the rollup.
+        written = []
+        try:
+            with transaction.atomic():
+                for entry, obj in zip(batch, objs):
+                    try:
+                        with transaction.atomic():
+                            obj.pk = None
+                            obj.public_id = ""
+                            obj.save()
+                        written.append(entry)
+                    except Exception as e:
+                        print(f"[SystemLog Buffer] insert failed: {e}")
+
+                record_usage(written)
+        except Exception as e:
+            print(f"[SystemLog Buffer] usage rollup failed: {e}")
+            written = []
+
+        self.flushed += len(written)
+        self.failed += len(objs) - len(written)
+
+
+log_buffer = SystemLogBuffer.from_settings()
+
+CallbackMetric(
+    "systemlog_buffer_depth",
+    "SystemLog entries waiting for the background flush.",
+    lambda: [({}, len(log_buffer))],
+)
+CallbackMetric(
+    "systemlog_buffer_entries_total",
+    "SystemLog entries by outcome: flushed, dropped (queue full) or failed (insert error).",
+    lambda: [
+        ({"outcome": "flushed"}, log_buffer.flushed),
+        ({"outcome": "dropped"}, log_buffer.dropped),
+        ({"outcome": "failed"}, log_buffer.failed),
+    ],
+    kind="counter",
+    labelnames=["outcome"],
+)
@@ -0,0 +1,272 @@
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncHour
+from django.utils.timezone import now
+
+from core.models import SystemLog, SystemLogRollup
+
+
+DEFAULT_SYSTEM_LOG_RETENTION = {
+    "PARTITION": "month",      # month | day, the range of one Postgres partition
+    "PARTITIONS_AHEAD": 2,     # future partitions kept ready for inserts
+    "RAW_DAYS": 30,            # raw rows older than this are rolled up and dropped
+    "DELETE_BATCH_SIZE": 5000, # rows per DELETE where partitions are not available
+}
+
+TABLE = SystemLog._meta.db_table
+
+
+def get_retention_config():
+    return {**DEFAULT_SYSTEM_LOG_RETENTION, **getattr(settings, "SYSTEM_LOG_RETENTION", {})}
+
+
+#------------------------------------------ Periods Starts ------------------------------------------
+
+def period_start(moment, period):
+    moment = moment.astimezone(dt_timezone.utc)
+    if period == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_period(start, period):
+    if period == "day":
+        return start + timedelta(days=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(start, period):
+    suffix = start.strftime("%Y%m%d" if period == "day" else "%Y%m")
+    return f"{TABLE}_p{suffix}"
+
+
+def parse_partition_name(name, period):
+    """Start of the period a partition created by ensure_partitions covers, None for others."""
+    prefix = f"{TABLE}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        start = datetime.strptime(name[len(prefix):], "%Y%m%d" if period == "day" else "%Y%m")
+    except ValueError:
+        return None
+    return start.replace(tzinfo=dt_timezone.utc)
+
+#------------------------------------------ Periods Ends ------------------------------------------
+
+
+#------------------------------------------ Postgres Partitions Starts ------------------------------------------
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [TABLE])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s ORDER BY child.relname",
+            [TABLE],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
+def legacy_end():
+    """
+    Upper bound of core_systemlog_legacy, the pre-partitioning table that
+    migration 0031 attached for MINVALUE up to the end of its newest period.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_get_expr(relpartbound, oid) FROM pg_class WHERE relname = %s AND relispartition",
+            [f"{TABLE}_legacy"],
+        )
+        row = cursor.fetchone()
+
+    match = re.search(r"TO \('([^']+)'\)", row[0]) if row else None
+    if match is None:
+        return None
+    return datetime.fromisoformat(match.group(1)).astimezone(dt_timezone.utc)
+
+
+def bound(moment):
+    # DDL takes no bind parameters
+    return f"'{moment:%Y-%m-%d %H:%M:%S}+00'"
+
+
+def create_partition(cursor, start, period):
+    end = next_period(start, period)
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(partition_name(start, period))} "
+        f"PARTITION OF {connection.ops.quote_name(TABLE)} "
+        f"FOR VALUES FROM ({bound(start)}) TO ({bound(end)})"
+    )
+
+
+def ensure_partitions(start=None, config=None):
+    """
+    Creates the partitions from `start` (default: the current period)
+    through PARTITIONS_AHEAD periods in the future, skipping the periods
+    the legacy partition covers. No-op unless the table is partitioned.
+    """
+    config = config or get_retention_config()
+    if not is_partitioned():
+        return 0
+
+    period = config["PARTITION"]
+    current = period_start(start or now(), period)
+
+    covered = legacy_end()
+    if covered is not None and covered > current:
+        current = covered
+    last = period_start(now(), period)
+    for _ in range(config["PARTITIONS_AHEAD"]):
+        last = next_period(last, period)
+
+    created = 0
+    with connection.cursor() as cursor:
+        while current <= last:
+            create_partition(cursor, current, period)
+            current = next_period(current, period)
+            created += 1
+    return created
+
+#------------------------------------------ Postgres Partitions Ends ------------------------------------------
+
+
+#------------------------------------------ Rollup Starts ------------------------------------------
+
+def hour_floor(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_system_logs(start, end):
+    """
+    Adds the SystemLog rows logged in [start, end) to SystemLogRollup.
+    Run it in the transaction that removes those rows, so nothing is
+    counted twice. Returns the number of raw rows rolled up.
+    """
+    groups = (
+        SystemLog.all_objects.filter(logged_at__gte=start, logged_at__lt=end)
+        .annotate(hour=TruncHour("logged_at", tzinfo=dt_timezone.utc))
+        .values("created_by_id", "hour", "request_path", "http_status")
+        .annotate(
+            requests=Count("pk"),
+            total_response_ms=Sum("response_time_ms"),
+            max_response_ms=Max("response_time_ms"),
+        )
+        .order_by()
+    )
+
+    incoming = {
+        (row["created_by_id"], row["hour"], row["request_path"], row["http_status"]): row
+        for row in groups
+    }
+    if not incoming:
+        return 0
+
+    existing = {
+        (rollup.tenant_id, rollup.hour, rollup.request_path, rollup.http_status): rollup
+        for rollup in SystemLogRollup.objects.select_for_update().filter(
+            hour__gte=hour_floor(start), hour__lt=end
+        )
+    }
+
+    created, updated = [], []
+    for key, row in incoming.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            rollup = SystemLogRollup(
+                tenant_id=key[0], hour=key[1], request_path=key[2], http_status=key[3]
+            )
+            created.append(rollup)
+        else:
+            updated.append(rollup)
+
+        rollup.requests += row["requests"]
+        rollup.total_response_ms += row["total_response_ms"] or 0
+        rollup.max_response_ms = max(rollup.max_response_ms, row["max_response_ms"] or 0)
+
+    SystemLogRollup.objects.bulk_create(created)
+    SystemLogRollup.objects.bulk_update(updated, ["requests", "total_response_ms", "max_response_ms"])
+
+    return sum(row["requests"] for row in incoming.values())
+
+#------------------------------------------ Rollup Ends ------------------------------------------
+
+
+def compact_system_logs(config=None, until=None):
+    """
+    Rolls raw SystemLog rows older than RAW_DAYS up into SystemLogRollup and
+    removes them. On a partitioned Postgres table whole expired partitions
+    are rolled up, detached and dropped; elsewhere rows are deleted a day
+    at a time in DELETE_BATCH_SIZE batches. Returns the raw rows removed.
+    """
+    config = config or get_retention_config()
+    cutoff = until or now() - timedelta(days=config["RAW_DAYS"])
+
+    removed = 0
+    if is_partitioned():
+        removed += drop_expired_partitions(cutoff, config)
+        ensure_partitions(config=config)
+
+    # everything else, e.g. rows that landed in the default partition
+    return removed + delete_expired_rows(cutoff, config)
+
+
+def drop_expired_partitions(cutoff, config):
+    period = config["PARTITION"]
+    removed = 0
+
+    for name in list_partitions():
+        start = parse_partition_name(name, period)
+        if start is None or next_period(start, period) > cutoff:
+            continue
+
+        with transaction.atomic():
+            removed += rollup_system_logs(start, next_period(start, period))
+            with connection.cursor() as cursor:
+                quoted = connection.ops.quote_name(name)
+                cursor.execute(f"ALTER TABLE {connection.ops.quote_name(TABLE)} DETACH PARTITION {quoted}")
+                cursor.execute(f"DROP TABLE {quoted}")
+
+    return removed
+
+
+def delete_expired_rows(cutoff, config):
+    removed = 0
+
+    while True:
+        # the day of the oldest expired row: empty days are skipped
+        oldest = (
+            SystemLog.all_objects.filter(logged_at__lt=cutoff)
+            .order_by("logged_at")
+            .values_list("logged_at", flat=True)
+            .first()
+        )
+        if oldest is None:
+            return removed
+
+        start = period_start(oldest, "day")
+        end = min(start + timedelta(days=1), cutoff)
+
+        with transaction.atomic():
+            rollup_system_logs(start, end)
+
+            rows = SystemLog.all_objects.filter(logged_at__gte=start, logged_at__lt=end)
+            while True:
+                ids = list(rows.values_list("pk", flat=True)[:config["DELETE_BATCH_SIZE"]])
+                if not ids:
+                    break
+                removed += SystemLog.all_objects.filter(pk__in=ids).hard_delete()[0]
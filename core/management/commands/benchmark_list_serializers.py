@@ -0,0 +1,85 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.fast_serializers import get_fast_serializer
+from core.models import ProductCatalog
+from core.serializers import ProductCatalogSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ProductCatalogSerializer with the FastRowSerializer read path "
+        "(query + serialize + render) and check both render identical bytes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Benchmark this user's products.")
+        parser.add_argument(
+            "--sizes",
+            default="5,100,500",
+            help="Comma separated page sizes (default 5,100,500).",
+        )
+        parser.add_argument("--repeat", type=int, default=50, help="Runs per page size.")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        fast = get_fast_serializer(ProductCatalogSerializer)
+        renderer = JSONRenderer()
+
+        with transaction.atomic():
+            user = self.get_user(options["user"], max(sizes))
+            queryset = ProductCatalog.objects.filter(created_by=user).order_by("created_at", "id")
+
+            self.stdout.write(f"{'page':>6} {'serializer ms':>14} {'fast ms':>9} {'speedup':>8}  identical")
+
+            for size in sizes:
+                def slow():
+                    return renderer.render(ProductCatalogSerializer(queryset[:size], many=True).data)
+
+                def quick():
+                    return renderer.render(fast.rows(queryset.values(*fast.sources)[:size]))
+
+                identical = slow() == quick()
+                slow_ms = self.time(slow, options["repeat"])
+                fast_ms = self.time(quick, options["repeat"])
+
+                self.stdout.write(
+                    f"{size:>6} {slow_ms:>14.3f} {fast_ms:>9.3f} {slow_ms / fast_ms:>7.1f}x  {identical}"
+                )
+
+            # seeded rows are never kept
+            transaction.set_rollback(True)
+
+    def get_user(self, user_id, rows):
+        if user_id is not None:
+            try:
+                return User.objects.get(pk=user_id)
+            except User.DoesNotExist:
+                raise CommandError(f"User {user_id} does not exist")
+
+        user = User.objects.create(username=f"benchmark-{time.time_ns()}")
+        ProductCatalog.objects.bulk_create([
+            ProductCatalog(
+                created_by=user,
+                product_id=f"BENCH-{i}",
+                product_name=f"Benchmark product {i}",
+                category="benchmark",
+                price=Decimal(i % 1000) + Decimal("0.99"),
+                currency="INR",
+                stock_count=i,
+                product_rating=(i % 50) / 10,
+            )
+            for i in range(rows)
+        ])
+        return user
+
+    def time(self, func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
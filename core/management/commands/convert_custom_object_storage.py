@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.custom_records import convert_storage
+from core.models import CustomObject
+
+
+class Command(BaseCommand):
+    help = "Move the records of a custom object between EAV and DOCUMENT storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tenant_id", type=int)
+        parser.add_argument("api_name")
+        parser.add_argument(
+            "--to",
+            dest="mode",
+            choices=CustomObject.StorageMode.values,
+            default=CustomObject.StorageMode.DOCUMENT,
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            custom_object = CustomObject.objects.get(
+                tenant_id=options["tenant_id"],
+                api_name=options["api_name"],
+            )
+        except CustomObject.DoesNotExist:
+            raise CommandError("Custom object not found.")
+
+        moved = convert_storage(
+            custom_object,
+            options["mode"],
+            batch_size=options["batch_size"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{custom_object.api_name}: {moved} record(s) now use {options['mode']} storage."
+            )
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core.usage import reconcile_records_used
+
+
+class Command(BaseCommand):
+    help = "Recompute UserProfile.records_used from the quota models and fix drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only reconcile this user id (repeatable).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = reconcile_records_used(
+            user_ids=options["user_ids"],
+            dry_run=options["dry_run"],
+        )
+
+        for profile, stored, actual in drifted:
+            self.stdout.write(
+                f"user={profile.user_id} records_used {stored} -> {actual}"
+            )
+
+        verb = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(drifted)} drifted profile(s)."))
@@ -0,0 +1,35 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import Worker, autodiscover_jobs, job_metrics, queue_stats
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the Job table (core.jobs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, help="Jobs run at once (default JOB_QUEUE['CONCURRENCY']).")
+        parser.add_argument("--poll-interval", type=float, help="Seconds between polls of an idle queue.")
+        parser.add_argument("--once", action="store_true", help="Run the due jobs and exit.")
+        parser.add_argument("--stats", action="store_true", help="Print queue statistics and exit.")
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            for key, value in sorted(queue_stats().items()):
+                self.stdout.write(f"{key}: {value}")
+            return
+
+        autodiscover_jobs()
+        worker = Worker(concurrency=options["concurrency"], poll_interval=options["poll_interval"])
+
+        # finish the running jobs on SIGTERM / Ctrl-C
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        signal.signal(signal.SIGINT, lambda *_: worker.stop())
+
+        self.stdout.write(f"worker {worker.worker_id} concurrency={worker.concurrency}")
+        worker.run(once=options["once"])
+
+        counts, _ = job_metrics.snapshot()
+        for (name, outcome), total in sorted(counts.items()):
+            self.stdout.write(f"{name} {outcome}={total}")
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.outbox import get_outbox_config, send_pending_emails
+
+
+class Command(BaseCommand):
+    help = "Send queued OutboundEmail rows in batches over one SMTP connection per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the due emails and exit.")
+        parser.add_argument("--batch-size", type=int, help="Emails per batch (default EMAIL_OUTBOX['BATCH_SIZE']).")
+
+    def handle(self, *args, **options):
+        poll_interval = get_outbox_config()["POLL_INTERVAL"]
+
+        while True:
+            try:
+                sent, failed = send_pending_emails(batch_size=options["batch_size"])
+            except Exception as e:
+                # e.g. the database went away: keep the worker alive and try again
+                self.stderr.write(f"send failed: {e}")
+                if options["once"]:
+                    break
+                close_old_connections()
+                time.sleep(poll_interval)
+                continue
+
+            if sent or failed:
+                self.stdout.write(f"sent={sent} failed={failed}")
+                continue
+
+            if options["once"]:
+                break
+
+            close_old_connections()
+            time.sleep(poll_interval)
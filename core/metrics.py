@@ -0,0 +1,318 @@
+import json
+import os
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+
+from core.background import BackgroundFlusher
+
+
+DEFAULT_METRICS = {
+    "ENABLED": True,
+    "MULTIPROCESS_DIR": None,      # directory shared by the workers of one host
+    "WRITE_INTERVAL_MS": 5000,     # how often a worker writes its samples there
+    "TOKEN": None,                 # bearer token of the scraper
+}
+
+DEFAULT_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def get_metrics_config():
+    return {**DEFAULT_METRICS, **getattr(settings, "METRICS", {})}
+
+
+#------------------------------------------ Registry Starts ------------------------------------------
+
+class MetricsRegistry:
+    """
+    Metric definitions and their samples for this process.
+
+    Every thread increments its own dict of samples, so the hot path takes
+    no lock; scrapes sum the dicts of all threads. With MULTIPROCESS_DIR
+    every process also writes its samples to `<dir>/metrics-<pid>.json`
+    and a scrape adds up the files of all workers.
+    """
+
+    def __init__(self, multiprocess_dir=None, write_interval_ms=5000):
+        self.multiprocess_dir = multiprocess_dir
+        self.metrics = {}
+
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+        self._writer = BackgroundFlusher(
+            self.write_samples,
+            write_interval_ms / 1000,
+            name="metrics-writer",
+        )
+
+    @classmethod
+    def from_settings(cls):
+        config = get_metrics_config()
+        return cls(
+            multiprocess_dir=config["MULTIPROCESS_DIR"],
+            write_interval_ms=config["WRITE_INTERVAL_MS"],
+        )
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def shard(self):
+        samples = getattr(self._local, "samples", None)
+        if samples is None:
+            samples = self._local.samples = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), samples))
+            if self.multiprocess_dir:
+                self._writer.ensure_started()
+        return samples
+
+    def add(self, key, amount):
+        samples = self.shard()
+        samples[key] = samples.get(key, 0) + amount
+
+    def local_samples(self):
+        """{(name, suffix, labels): value} of this process."""
+        with self._lock:
+            alive = []
+            for thread, samples in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, samples))
+                else:
+                    # finished threads are folded in once, their dict is final
+                    merge_samples(self._retired, samples)
+            self._shards = alive
+            totals = dict(self._retired)
+
+        for _, samples in alive:
+            # dict() copies in one step under the GIL
+            merge_samples(totals, dict(samples))
+
+        for metric in self.metrics.values():
+            if isinstance(metric, CallbackMetric):
+                for labels, value in metric.collect():
+                    totals[(metric.name, "", labels)] = value
+        return totals
+
+    #---------------------------- Multiprocess ----------------------------
+
+    def write_samples(self):
+        if not self.multiprocess_dir:
+            return
+
+        path = os.path.join(self.multiprocess_dir, f"metrics-{os.getpid()}.json")
+        rows = [[name, suffix, list(labels), value] for (name, suffix, labels), value in self.local_samples().items()]
+
+        # written aside and renamed: readers never see half a file
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"pid": os.getpid(), "samples": rows}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def read_samples(self):
+        """Samples of every process: counters of exited workers are kept, their gauges are not."""
+        totals = self.local_samples()
+        if not self.multiprocess_dir:
+            return totals
+
+        for filename in sorted(os.listdir(self.multiprocess_dir)):
+            if not (filename.startswith("metrics-") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, filename)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            pid = data.get("pid")
+            if pid == os.getpid():
+                continue
+
+            alive = process_alive(pid)
+            for name, suffix, labels, value in data.get("samples", []):
+                metric = self.metrics.get(name)
+                if metric is None or (metric.kind == "gauge" and not alive):
+                    continue
+                key = (name, suffix, tuple(tuple(pair) for pair in labels))
+                totals[key] = totals.get(key, 0) + value
+
+        return totals
+
+    #---------------------------- Exposition ----------------------------
+
+    def render(self):
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        by_metric = {}
+        for (name, suffix, labels), value in self.read_samples().items():
+            by_metric.setdefault(name, []).append((suffix, labels, value))
+
+        lines = []
+        for name in sorted(self.metrics):
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.expose(sorted(by_metric.get(name, []))))
+        return "\n".join(lines) + "\n"
+
+
+def merge_samples(target, samples):
+    for key, value in samples.items():
+        target[key] = target.get(key, 0) + value
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, TypeError):
+        return pid is not None
+    return True
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+
+def format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+#------------------------------------------ Registry Ends ------------------------------------------
+
+
+#------------------------------------------ Metric Types Starts ------------------------------------------
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=(), registry=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or metrics_registry
+        self.registry.register(self)
+
+    def label_key(self, labels):
+        return tuple((name, str(labels.get(name, ""))) for name in self.labelnames)
+
+    def expose(self, samples):
+        return [f"{self.name}{format_labels(labels)} {format_value(value)}" for _, labels, value in samples]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if METRICS_ENABLED:
+            self.registry.add((self.name, "", self.label_key(labels)), amount)
+
+
+class Histogram(Metric):
+    """Observations per bucket; the cumulative `le` series are built on exposition."""
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_SECONDS_BUCKETS, registry=None):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labelnames, registry)
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        labels = self.label_key(labels)
+        index = bisect_left(self.buckets, value)
+        bound = str(self.buckets[index]) if index < len(self.buckets) else "+Inf"
+
+        add = self.registry.add
+        add((self.name, "_bucket", labels + (("le", bound),)), 1)
+        add((self.name, "_sum", labels), value)
+        add((self.name, "_count", labels), 1)
+
+    def expose(self, samples):
+        series = {}
+        for suffix, labels, value in samples:
+            if suffix == "_bucket":
+                labels, bound = labels[:-1], labels[-1][1]
+                series.setdefault(labels, {}).setdefault("buckets", {})[bound] = value
+            else:
+                series.setdefault(labels, {})[suffix] = value
+
+        lines = []
+        for labels, values in sorted(series.items()):
+            seen = 0
+            counts = values.get("buckets", {})
+            for bound in [str(b) for b in self.buckets] + ["+Inf"]:
+                seen += counts.get(bound, 0)
+                lines.append(f"{self.name}_bucket{format_labels(labels + (('le', bound),))} {format_value(seen)}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(values.get('_sum', 0))}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {format_value(values.get('_count', 0))}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """
+    Values read at scrape (or snapshot) time from `callback()`, which returns
+    [({label: value}, number)]. For state other objects already keep,
+    like queue depths.
+    """
+
+    def __init__(self, name, help, callback, kind="gauge", labelnames=(), registry=None):
+        self.kind = kind
+        self.callback = callback
+        super().__init__(name, help, labelnames, registry)
+
+    def collect(self):
+        try:
+            return [(self.label_key(labels), value) for labels, value in self.callback()]
+        except Exception as e:
+            print(f"[metrics] {self.name} failed: {e}")
+            return []
+
+#------------------------------------------ Metric Types Ends ------------------------------------------
+
+
+METRICS_ENABLED = get_metrics_config()["ENABLED"]
+
+metrics_registry = MetricsRegistry.from_settings()
+
+
+#------------------------------------------ Shared Instruments Starts ------------------------------------------
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by URL pattern, method and status.",
+    ["route", "method", "status"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time spent in the Django middleware chain per request.",
+    ["route", "method"],
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run per request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in database queries per request.",
+    ["route"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit, miss, stale).",
+    ["cache", "result"],
+)
+
+#------------------------------------------ Shared Instruments Ends ------------------------------------------
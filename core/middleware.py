@@ -1,9 +1,14 @@
+from django.conf import settings
 from django.http import JsonResponse
 import time
 from django.utils.timezone import now
 from django.contrib.auth.models import AnonymousUser
-from core.models import SystemLog
-from django.db import models
+from core.latency import latency_recorder
+from core.metrics import DB_QUERIES, DB_SECONDS, HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+from core.query_budget import QueryInspector, check_request, get_query_budget_config, server_timing
+from core.log_buffer import log_buffer
+from core.tenancy import get_tenant
+from django.db import connection, models
 from django.shortcuts import redirect
 from django.urls import reverse
 
@@ -18,11 +23,12 @@ class PlanNamespaceMiddleware:
         if not request.user.is_authenticated:
             return JsonResponse({"detail": "Authentication required"}, status=401)
 
-        profile = getattr(request.user, "profile", None)
+        tenant = get_tenant(request)
+        profile = tenant.profile
         if not profile or not profile.is_active:
             return JsonResponse({"detail": "Inactive account"}, status=403)
 
-        plan = profile.plan
+        plan = tenant.plan
         namespace = request.path.strip("/").split("/")[0]
 
         if "*" not in plan.allowed_namespaces and namespace not in plan.allowed_namespaces:
@@ -40,6 +46,85 @@ class PlanNamespaceMiddleware:
         return self.get_response(request)
     
 
+def route_of(request):
+    """URL pattern of the request, so ids in paths do not multiply series."""
+    match = getattr(request, "resolver_match", None)
+    return match.route if match else "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Request count and latency by route, method and status, plus the DB
+    queries each request ran (counted by QueryBudgetMiddleware), for the
+    Prometheus endpoint (core.metrics).
+    """
+
+    METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        route = route_of(request)
+        method = request.method if request.method in self.METHODS else "OTHER"
+
+        HTTP_REQUESTS.inc(route=route, method=method, status=response.status_code)
+        HTTP_REQUEST_SECONDS.observe(elapsed, route=route, method=method)
+
+        queries = getattr(request, "query_inspector", None)
+        if queries is not None:
+            DB_QUERIES.observe(queries.count, route=route)
+            DB_SECONDS.observe(queries.seconds, route=route)
+
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the queries and DB time of every request, reports routes over
+    their QUERY_BUDGETS budget and repeated SQL shapes (suspected N+1), and
+    sends superusers a Server-Timing header: db, serialize (response
+    rendering) and total.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_query_budget_config()
+        if not config["ENABLED"]:
+            return self.get_response(request)
+
+        inspector = request.query_inspector = QueryInspector()
+        request.render_seconds = 0.0
+        started = time.perf_counter()
+
+        with connection.execute_wrapper(inspector):
+            response = self.get_response(request)
+
+        total = time.perf_counter() - started
+        check_request(route_of(request), inspector, config, request.method)
+
+        user = getattr(request, "user", None)
+        if user is not None and user.is_superuser:
+            response["Server-Timing"] = server_timing(inspector, request.render_seconds, total)
+
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses and templates are rendered right after this hook
+        started = time.perf_counter()
+
+        def rendered(response):
+            request.render_seconds = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
 class APILoggingMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -71,26 +156,27 @@ class APILoggingMiddleware:
             + (f" | error={error_message}" if error_message else "")
         )
 
-        try:
-            SystemLog.objects.create(
-                created_by=user,  # ✅ THIS is the fix
-                service_name="API",
-                log_level="INFO" if response.status_code < 400 else "ERROR",
-                message=f"{request.method} {request.path}",
-                request_path=request.path,
-                http_status=response.status_code,
-                response_time_ms=duration_ms,
-                user_ip_address=client_ip,
-            )
-        except Exception:
-            # logging must never break requests
-            pass
+        latency_recorder.record(route_of(request), duration_ms)
+
+        # Buffered: the row is written by the background flusher
+        log_buffer.record(
+            user_id=user.pk if user else None,
+            service_name="API",
+            log_level="INFO" if response.status_code < 400 else "ERROR",
+            message=f"{request.method} {request.path}",
+            request_path=request.path,
+            http_status=response.status_code,
+            response_time_ms=duration_ms,
+            user_ip_address=client_ip,
+        )
         
 
 class EmailVerifiedAccessMiddleware:
 
     PUBLIC_PREFIXES = (
         "/blogs/",
+        # the view checks the scraper token or superuser itself
+        "/metrics",
     )
 
     AUTH_PREFIXES = (
@@ -134,7 +220,7 @@ class EmailVerifiedAccessMiddleware:
             return redirect(settings.LOGIN_URL)
 
         # 5️⃣ Logged in but NOT email verified (browser only)
-        profile = getattr(request.user, "profile", None)
+        profile = get_tenant(request).profile
 
         if profile and not profile.is_email_verified:
             if path.startswith(self.AUTH_PREFIXES):
@@ -1,21 +1,30 @@
 # Generated by Django 5.2.9 on 2025-12-25 12:16
 
-import random
 from django.db import migrations
 
-def generate_public_id():
-    return "".join(str(random.randint(0, 9)) for _ in range(14))
+from core.public_ids import public_id_generator
+
+
+PUBLIC_ID_MODELS = [
+    "CustomerProfile",
+    "FeatureUsageAnalytics",
+    "OrderTransaction",
+    "ProductCatalog",
+    "SystemLog",
+]
+
 
 def backfill_public_id(apps, schema_editor):
-    CustomerProfile = apps.get_model("core", "CustomerProfile")
+    # ids are unique by construction: no per-row existence check, one
+    # bulk UPDATE per batch
+    for model_name in PUBLIC_ID_MODELS:
+        model = apps.get_model("core", model_name)
+        pending = list(model.objects.filter(public_id__isnull=True).only("pk").order_by("pk"))
+
+        for obj, public_id in zip(pending, public_id_generator.next_ids(len(pending))):
+            obj.public_id = public_id
 
-    for obj in CustomerProfile.objects.filter(public_id__isnull=True):
-        while True:
-            candidate = generate_public_id()
-            if not CustomerProfile.objects.filter(public_id=candidate).exists():
-                obj.public_id = candidate
-                obj.save(update_fields=["public_id"])
-                break
+        model.objects.bulk_update(pending, ["public_id"], batch_size=1000)
 
 
 class Migration(migrations.Migration):
@@ -25,5 +34,5 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.RunPython(backfill_public_id),
+        migrations.RunPython(backfill_public_id, migrations.RunPython.noop),
     ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count
+
+QUOTA_MODELS = [
+    "ProductCatalog",
+    "CustomerProfile",
+    "OrderTransaction",
+    "FeatureUsageAnalytics",
+]
+
+
+def backfill_records_used(apps, schema_editor):
+    UserProfile = apps.get_model("core", "UserProfile")
+
+    totals = {}
+    for model_name in QUOTA_MODELS:
+        model = apps.get_model("core", model_name)
+        rows = (
+            model.objects.filter(is_deleted=False)
+            .values_list("created_by")
+            .annotate(total=Count("pk"))
+            .order_by()
+        )
+        for user_id, total in rows:
+            totals[user_id] = totals.get(user_id, 0) + total
+
+    profiles = list(UserProfile.objects.only("pk", "user_id", "records_used"))
+    for profile in profiles:
+        profile.records_used = totals.get(profile.user_id, 0)
+
+    UserProfile.objects.bulk_update(profiles, ["records_used"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_alter_systemlog_response_time_ms'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_records_used, migrations.RunPython.noop),
+    ]
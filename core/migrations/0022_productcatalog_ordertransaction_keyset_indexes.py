@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 20:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_backfill_userprofile_records_used'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ordertransaction',
+            index=models.Index(fields=['created_by', 'created_at', 'id'], name='order_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productcatalog',
+            index=models.Index(fields=['created_by', 'created_at', 'id'], name='product_owner_created_idx'),
+        ),
+    ]
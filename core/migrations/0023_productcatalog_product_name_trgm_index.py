@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm GIN indexes on product_name: Django compiles icontains to
+    # UPPER(col::text) LIKE UPPER(%s), so that expression gets its own index
+    # next to the plain column one used by the `%` similarity operator.
+    # Other databases keep the btree index (core.search falls back).
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS product_name_trgm_idx "
+        "ON core_productcatalog USING gin (product_name gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS product_name_upper_trgm_idx "
+        "ON core_productcatalog USING gin ((UPPER(product_name::text)) gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS product_name_upper_trgm_idx")
+    schema_editor.execute("DROP INDEX IF EXISTS product_name_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_productcatalog_ordertransaction_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_productcatalog_product_name_trgm_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customobject',
+            name='storage_mode',
+            field=models.CharField(choices=[('EAV', 'One row per field value'), ('DOCUMENT', 'JSON document per record')], default='EAV', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='customobjectrecord',
+            name='data',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
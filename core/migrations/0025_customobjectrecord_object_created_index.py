@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-18 20:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_custom_object_document_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customobjectrecord',
+            index=models.Index(fields=['tenant', 'object_api_name', 'created_at', 'id'], name='record_object_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_customobjectrecord_object_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customobject',
+            name='schema_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-18 20:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemLogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('request_path', models.CharField(max_length=255)),
+                ('http_status', models.PositiveSmallIntegerField()),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('total_response_ms', models.BigIntegerField(default=0)),
+                ('max_response_ms', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['logged_at'], name='systemlog_logged_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='systemlogrollup',
+            name='tenant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='system_log_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='systemlogrollup',
+            constraint=models.UniqueConstraint(fields=('tenant', 'hour', 'request_path', 'http_status'), name='unique_system_log_rollup'),
+        ),
+    ]
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import migrations
+
+
+def period_start(moment, period):
+    if period == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_period(start, period):
+    if period == "day":
+        return start + timedelta(days=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def bound(moment):
+    return f"'{moment:%Y-%m-%d %H:%M:%S}+00'"
+
+
+def partition_system_log(apps, schema_editor):
+    # Declarative range partitioning by logged_at, Postgres only: other
+    # databases keep the plain table and core.log_partitions deletes
+    # expired rows in batches instead of dropping partitions.
+    #
+    # The existing table is attached as the partition of everything up to
+    # the end of the period of its newest row, at least the current one (no
+    # copy: ATTACH only validates the range); new partitions start after it
+    # and core.log_partitions keeps them ahead. Unique keys must contain the
+    # partition key, so the primary key becomes (id, logged_at) and id is
+    # fed by a plain sequence.
+    #
+    # Manual check against a copy of production: run the migration, then
+    #   SELECT relname, pg_get_expr(relpartbound, oid) FROM pg_class
+    #   WHERE relispartition AND relname LIKE 'core_systemlog%';
+    # must list the legacy partition up to the next period, the period
+    # partitions after it and the default partition. The Postgres tests in
+    # core/tests.py (SystemLogPartitionTests) run the same path.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    config = getattr(settings, "SYSTEM_LOG_RETENTION", {})
+    period = config.get("PARTITION", "month")
+    ahead = config.get("PARTITIONS_AHEAD", 2)
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) + 1, MAX(logged_at) FROM core_systemlog")
+        next_id, newest = cursor.fetchone()
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute "
+            "WHERE attrelid = 'core_systemlog'::regclass AND attname = 'id'"
+        )
+        identity = bool(cursor.fetchone()[0])
+
+    now = datetime.now(timezone.utc)
+    newest = max(now, newest.astimezone(timezone.utc)) if newest else now
+    legacy_end = next_period(period_start(newest, period), period)
+
+    statements = [
+        "ALTER TABLE core_systemlog RENAME TO core_systemlog_legacy",
+        "ALTER INDEX systemlog_logged_at_idx RENAME TO core_systemlog_legacy_logged_at_idx",
+    ]
+
+    if identity:
+        # partitions cannot keep their own identity column
+        statements += [
+            "ALTER TABLE core_systemlog_legacy ALTER COLUMN id DROP IDENTITY",
+            "CREATE TABLE core_systemlog (LIKE core_systemlog_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (logged_at)",
+            f"CREATE SEQUENCE core_systemlog_id_seq START WITH {next_id} OWNED BY core_systemlog.id",
+            "ALTER TABLE core_systemlog ALTER COLUMN id SET DEFAULT nextval('core_systemlog_id_seq')",
+        ]
+    else:
+        # serial column: the copied default keeps using the same sequence
+        statements += [
+            "CREATE TABLE core_systemlog (LIKE core_systemlog_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (logged_at)",
+            "ALTER SEQUENCE core_systemlog_id_seq OWNED BY core_systemlog.id",
+        ]
+
+    statements += [
+        "ALTER TABLE core_systemlog ADD CONSTRAINT core_systemlog_partitioned_pkey PRIMARY KEY (id, logged_at)",
+        "ALTER TABLE core_systemlog ADD CONSTRAINT core_systemlog_public_id_logged_at_uniq UNIQUE (public_id, logged_at)",
+        "ALTER TABLE core_systemlog ADD CONSTRAINT core_systemlog_log_id_logged_at_uniq UNIQUE (log_id, logged_at)",
+        "CREATE INDEX systemlog_logged_at_idx ON core_systemlog (logged_at)",
+        "CREATE INDEX core_systemlog_partitioned_created_by_idx ON core_systemlog (created_by_id)",
+        "ALTER TABLE core_systemlog ADD CONSTRAINT core_systemlog_partitioned_created_by_fk "
+        "FOREIGN KEY (created_by_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED",
+        f"ALTER TABLE core_systemlog ATTACH PARTITION core_systemlog_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ({bound(legacy_end)})",
+    ]
+
+    start = legacy_end
+    for _ in range(ahead):
+        end = next_period(start, period)
+        suffix = start.strftime("%Y%m%d" if period == "day" else "%Y%m")
+        statements.append(
+            f"CREATE TABLE core_systemlog_p{suffix} PARTITION OF core_systemlog "
+            f"FOR VALUES FROM ({bound(start)}) TO ({bound(end)})"
+        )
+        start = end
+
+    # rows outside every range (e.g. when no partition was created in time)
+    statements.append("CREATE TABLE core_systemlog_default PARTITION OF core_systemlog DEFAULT")
+
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_systemlogrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_system_log, migrations.RunPython.noop),
+    ]
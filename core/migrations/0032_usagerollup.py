@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-18 20:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_partition_systemlog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('request_path', models.CharField(max_length=255)),
+                ('status_class', models.PositiveSmallIntegerField()),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('timed_requests', models.PositiveIntegerField(default=0)),
+                ('total_response_ms', models.BigIntegerField(default=0)),
+                ('histogram', models.JSONField(default=list)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tenant', 'hour', 'request_path', 'status_class'), name='unique_usage_rollup')],
+            },
+        ),
+    ]
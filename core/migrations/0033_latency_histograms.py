@@ -0,0 +1,64 @@
+# Generated by Django 5.2.9 on 2026-10-18 20:50
+
+from django.db import migrations, models
+
+
+# bounds of the fixed buckets 0032 stored, and core.latency's bucket layout
+OLD_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def log_linear_index(ms):
+    if ms < 32:
+        return ms
+    shift = ms.bit_length() - 5
+    return shift * 16 + (ms >> shift)
+
+
+def convert_histograms(apps, schema_editor):
+    """Each old bucket's count moves to the log-linear bucket of its upper bound."""
+    UsageRollup = apps.get_model("core", "UsageRollup")
+
+    changed = []
+    for rollup in UsageRollup.objects.exclude(histogram={}).iterator():
+        if not isinstance(rollup.histogram, list):
+            continue
+
+        sparse = {}
+        for index, count in enumerate(rollup.histogram):
+            if count:
+                key = str(log_linear_index(OLD_BUCKETS_MS[min(index, len(OLD_BUCKETS_MS) - 1)]))
+                sparse[key] = sparse.get(key, 0) + count
+        rollup.histogram = sparse
+        changed.append(rollup)
+
+    UsageRollup.objects.bulk_update(changed, ["histogram"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_usagerollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usagerollup',
+            name='histogram',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(convert_histograms, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='LatencyWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_start', models.DateTimeField()),
+                ('route', models.CharField(max_length=255)),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('total_response_ms', models.BigIntegerField(default=0)),
+                ('histogram', models.JSONField(default=dict)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('window_start', 'route'), name='unique_latency_window')],
+            },
+        ),
+    ]
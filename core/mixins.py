@@ -1,8 +1,11 @@
 from django.conf import settings
-from django.db import models
-import random
+from django.db import IntegrityError, models, transaction
+from collections import Counter
 from django.utils.timezone import now
 from core.validators import enforce_record_quota
+from core.usage import adjust_records_used, reconcile_records_used
+from core.public_ids import assign_public_ids, public_id_generator
+from core.data_versions import bump_data_versions
 
 
 User = settings.AUTH_USER_MODEL
@@ -38,30 +41,112 @@ class PublicIDMixin(models.Model):
         abstract = True
 
     def _generate_public_id(self):
-        return "".join(str(random.randint(0, 9)) for _ in range(14))
+        return public_id_generator.next_id()
+
+    # inserts retried with a fresh id when the unique index reports a clash
+    PUBLIC_ID_SAVE_ATTEMPTS = 3
 
     def save(self, *args, **kwargs):
-        if not self.public_id:
-            for _ in range(5):  # retry protection
-                candidate = self._generate_public_id()
-                if not self.__class__.objects.filter(public_id=candidate).exists():
-                    self.public_id = candidate
-                    break
-            else:
-                raise RuntimeError("Failed to generate unique public_id")
+        # no existence check: ids are unique by construction per node. Two
+        # writers sharing a node (PUBLIC_ID_NODE unset, equal pids in
+        # containers) or a legacy random id can still clash; the insert is
+        # then retried in a savepoint with a fresh id on a reseeded node.
+        if self.public_id:
+            return super().save(*args, **kwargs)
+
+        for attempt in range(self.PUBLIC_ID_SAVE_ATTEMPTS):
+            self.public_id = self._generate_public_id()
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError as e:
+                if "public_id" not in str(e) or attempt == self.PUBLIC_ID_SAVE_ATTEMPTS - 1:
+                    raise
+                public_id_generator.reseed()
 
-        super().save(*args, **kwargs)
-        
 class AllObjectsManager(models.Manager):
     def get_queryset(self):
         return SoftDeleteQuerySet(self.model, using=self._db)
 
 class SoftDeleteQuerySet(models.QuerySet):
     def delete(self):
-        return super().update(is_deleted=True, deleted_at=now())
+        if not issubclass(self.model, RecordCountedMixin):
+            return self.update(is_deleted=True, deleted_at=now())
+
+        with transaction.atomic(using=self.db):
+            rows = list(
+                self.filter(is_deleted=False)
+                .select_for_update()
+                .values_list("pk", "created_by_id")
+            )
+            updated = self.model.all_objects.filter(
+                pk__in=[pk for pk, _ in rows]
+            ).update(is_deleted=True, deleted_at=now())
+
+            adjust_records_used(
+                {owner: -count for owner, count in Counter(owner for _, owner in rows).items()}
+            )
+
+        return updated
+
+    def update(self, **kwargs):
+        # soft deletes, restores and bulk_update() all end up here
+        if not issubclass(self.model, DataVersionedMixin):
+            return super().update(**kwargs)
+
+        kwargs.setdefault("updated_at", now())
+
+        with transaction.atomic(using=self.db):
+            owners = set(self.order_by().values_list("created_by_id", flat=True).distinct())
+            updated = super().update(**kwargs)
+
+            if updated:
+                bump_data_versions(self.model, owners)
+
+        return updated
 
     def hard_delete(self):
-        return super().delete()
+        if not issubclass(self.model, DataVersionedMixin):
+            # per-row post_delete signals keep records_used in step
+            return super().delete()
+
+        with transaction.atomic(using=self.db):
+            owners = set(self.order_by().values_list("created_by_id", flat=True).distinct())
+            deleted = super().delete()
+            bump_data_versions(self.model, owners)
+
+        return deleted
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if issubclass(self.model, PublicIDMixin):
+            objs = assign_public_ids(list(objs))
+
+        if issubclass(self.model, DataVersionedMixin):
+            with transaction.atomic(using=self.db):
+                created = self._bulk_create_counted(objs, *args, **kwargs)
+                bump_data_versions(self.model, {obj.created_by_id for obj in created})
+            return created
+
+        return self._bulk_create_counted(objs, *args, **kwargs)
+
+    def _bulk_create_counted(self, objs, *args, **kwargs):
+        if not issubclass(self.model, RecordCountedMixin):
+            return super().bulk_create(objs, *args, **kwargs)
+
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+
+            if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+                # inserted rows are unknown, recount the affected owners
+                reconcile_records_used(
+                    user_ids={obj.created_by_id for obj in created}
+                )
+            else:
+                adjust_records_used(
+                    Counter(obj.created_by_id for obj in created if not obj.is_deleted)
+                )
+
+        return created
 
     def alive(self):
         return self.filter(is_deleted=False)
@@ -94,8 +179,72 @@ class SoftDeleteModel(models.Model):
         self.is_deleted = False
         self.deleted_at = None
         self.save(update_fields=["is_deleted", "deleted_at"])
+
+
+class RecordCountedMixin(models.Model):
+    """
+    Keeps the owner's UserProfile.records_used equal to its number of alive
+    rows. Every counter change commits or rolls back with the write itself;
+    `manage.py reconcile_record_counts` repairs drift.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if adding and not self.is_deleted:
+                adjust_records_used({self.created_by_id: 1})
+
+    def delete(self, using=None, keep_parents=False):
+        self._set_deleted(True)
+
+    def restore(self):
+        self._set_deleted(False)
+
+    def _set_deleted(self, deleted):
+        deleted_at = now() if deleted else None
+
+        with transaction.atomic():
+            # Conditional UPDATE so a stale instance can't count twice
+            changed = self.__class__.all_objects.filter(
+                pk=self.pk,
+                is_deleted=not deleted,
+            ).update(is_deleted=deleted, deleted_at=deleted_at)
+
+            if changed:
+                adjust_records_used({self.created_by_id: -1 if deleted else 1})
+
+        self.is_deleted = deleted
+        self.deleted_at = deleted_at
         
 
+class DataVersionedMixin(models.Model):
+    """
+    Bumps the owner's DataVersion of this model (core.data_versions) with
+    every write, soft deletes included, so list endpoints can answer
+    conditional GETs from the version alone.
+    """
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            bump_data_versions(self.__class__, [self.created_by_id])
+
+
 class RecordQuotaValidationMixin:
     def validate(self, attrs):
         request = self.context.get("request")
@@ -2,7 +2,7 @@ from django.db import models
 import uuid
 from django.conf import settings
 from . import plans
-from .mixins import PublicIDMixin, SoftDeleteModel, OwnedModel
+from .mixins import PublicIDMixin, SoftDeleteModel, OwnedModel, RecordCountedMixin, DataVersionedMixin
 from django.utils.timezone import now
 from dateutil.relativedelta import relativedelta
 from django.core.exceptions import PermissionDenied
@@ -66,6 +66,46 @@ class PasswordResetToken(models.Model):
     token = models.UUIDField(default=uuid.uuid4, unique=True)
     created_at = models.DateTimeField(default=now)
     is_used = models.BooleanField(default=False)
+
+
+class OutboundEmail(models.Model):
+    """
+    Email outbox. Rows are written in the transaction of whatever they
+    announce (a token, ...) and sent by `manage.py send_outbound_emails`,
+    see core.outbox.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SENT = "SENT", "Sent"
+        FAILED = "FAILED", "Failed"
+
+    kind = models.CharField(max_length=30)
+    to = models.JSONField(default=list)
+    from_email = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(default=now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the worker's "due" scan
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status="PENDING"),
+                name="outbound_email_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} -> {', '.join(self.to)} ({self.status})"
     
 #------------------------------------------ User Profile Model Starts ------------------------------------------
 
@@ -79,7 +119,7 @@ class UserRole(models.TextChoices):
     TEAMLEAD = "TEAM LEAD", "Team Lead"
 
 #CustomerProfile Model
-class CustomerProfile(PublicIDMixin, SoftDeleteModel, OwnedModel):
+class CustomerProfile(RecordCountedMixin, PublicIDMixin, SoftDeleteModel, OwnedModel):
     user_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     full_name = models.CharField(max_length = 50, db_index=True)
     username = models.CharField(max_length=50, unique=True, db_index=True)
@@ -103,7 +143,7 @@ class Currency(models.TextChoices):
     EUR = "EUR", "Euro"
     
 # Creating the product catalog model
-class ProductCatalog(PublicIDMixin, SoftDeleteModel, OwnedModel):
+class ProductCatalog(RecordCountedMixin, DataVersionedMixin, PublicIDMixin, SoftDeleteModel, OwnedModel):
 #     user = models.ForeignKey(
 #     settings.AUTH_USER_MODEL,
 #     on_delete=models.CASCADE,
@@ -129,6 +169,13 @@ class ProductCatalog(PublicIDMixin, SoftDeleteModel, OwnedModel):
                 name="unique_product_per_user"
             )
         ]
+        indexes = [
+            # keyset pagination (PlanBasedPagination ?cursor=)
+            models.Index(
+                fields=["created_by", "created_at", "id"],
+                name="product_owner_created_idx",
+            ),
+        ]
         
     def __str__(self):
         return self.product_name
@@ -150,7 +197,7 @@ class PaymentStatus(models.TextChoices):
     PENDING = "PENDING", "Pending"
     
 # Creating the order transaction model
-class OrderTransaction(PublicIDMixin, SoftDeleteModel, OwnedModel):
+class OrderTransaction(RecordCountedMixin, DataVersionedMixin, PublicIDMixin, SoftDeleteModel, OwnedModel):
     order_id = models.CharField(max_length=30, unique=True, db_index=True)
     order_amount = models.DecimalField(max_digits=12, decimal_places=2)
     payment_method = models.CharField(max_length=20, choices=PaymentMethod.choices)
@@ -160,12 +207,99 @@ class OrderTransaction(PublicIDMixin, SoftDeleteModel, OwnedModel):
     order_date = models.DateField()
     discount_applied = models.FloatField(help_text="Percentage value")
 
+    class Meta:
+        indexes = [
+            # keyset pagination (PlanBasedPagination ?cursor=)
+            models.Index(
+                fields=["created_by", "created_at", "id"],
+                name="order_owner_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.order_id
     
 #------------------------------------------ Order Transaction Model Ends ------------------------------------------
 
 
+#------------------------------------------ Data Version Model Starts ------------------------------------------
+class DataVersion(models.Model):
+    """
+    Write counter per tenant and model (DataVersionedMixin), keys the
+    ETags of the list endpoints. Maintained by core.data_versions.
+    """
+
+    tenant = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="data_versions",
+    )
+    model = models.CharField(max_length=100)  # app_label.model_name
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant", "model"],
+                name="unique_data_version_per_tenant_model",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.tenant_id}:{self.model}@{self.version}"
+
+#------------------------------------------ Data Version Model Ends ------------------------------------------
+
+
+#------------------------------------------ Job Model Starts ------------------------------------------
+class Job(models.Model):
+    """
+    One unit of background work for `manage.py run_jobs`, see core.jobs.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    priority = models.SmallIntegerField(default=0)  # higher runs first
+    run_at = models.DateTimeField(default=now)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    last_error = models.TextField(blank=True, default="")
+
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    # periodic jobs: one row per schedule slot, whichever worker enqueues it
+    dedupe_key = models.CharField(max_length=150, unique=True, null=True, blank=True)
+
+    created_at = models.DateTimeField(default=now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the claim query of core.jobs.claim_jobs
+            models.Index(
+                fields=["-priority", "run_at", "id"],
+                condition=models.Q(status="QUEUED"),
+                name="job_queued_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+#------------------------------------------ Job Model Ends ------------------------------------------
+
+
 #------------------------------------------ System Log Model Starts ------------------------------------------
 # Creating the log-level-enum
 class LogLevel(models.TextChoices):
@@ -188,17 +322,114 @@ class SystemLog(PublicIDMixin, SoftDeleteModel, OwnedModel):
     request_path = models.CharField(max_length=255)
     http_status = models.PositiveSmallIntegerField()
     response_time_ms = models.PositiveIntegerField(null=True, blank=True)
-    logged_at = models.DateTimeField(auto_now_add=True)
+    # set by core.log_buffer when the request is logged, not when it is flushed
+    logged_at = models.DateTimeField(default=now, editable=False)
     user_ip_address = models.GenericIPAddressField(null=True)
 
+    class Meta:
+        # On Postgres the table is range partitioned by logged_at (migration
+        # 0031, core.log_partitions); the primary key there is (id, logged_at).
+        indexes = [
+            models.Index(fields=["logged_at"], name="systemlog_logged_at_idx"),
+        ]
+
     def __str__(self):
         return f"{self.service_name} - {self.log_level}"
+
+
+class SystemLogRollup(models.Model):
+    """
+    Hourly aggregate of SystemLog rows per tenant, path and status, written
+    when raw rows pass retention (core.log_partitions.compact_system_logs).
+    """
+
+    tenant = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="system_log_rollups",
+    )
+    hour = models.DateTimeField()
+    request_path = models.CharField(max_length=255)
+    http_status = models.PositiveSmallIntegerField()
+
+    requests = models.PositiveIntegerField(default=0)
+    total_response_ms = models.BigIntegerField(default=0)
+    max_response_ms = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant", "hour", "request_path", "http_status"],
+                name="unique_system_log_rollup",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.tenant_id} {self.hour:%Y-%m-%d %H}h {self.request_path} {self.http_status}"
+    
+
+class UsageRollup(models.Model):
+    """
+    API calls per tenant, path, status class (2 for 2xx, ...) and hour with
+    a latency histogram, updated by every SystemLog buffer flush
+    (core.usage_rollups). Backs /core/api/v1/usage/.
+    """
+
+    tenant = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="usage_rollups",
+    )
+    hour = models.DateTimeField()
+    request_path = models.CharField(max_length=255)
+    status_class = models.PositiveSmallIntegerField()
+
+    requests = models.PositiveIntegerField(default=0)
+    timed_requests = models.PositiveIntegerField(default=0)
+    total_response_ms = models.BigIntegerField(default=0)
+    # sparse core.latency histogram: {"bucket index": count}
+    histogram = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant", "hour", "request_path", "status_class"],
+                name="unique_usage_rollup",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.tenant_id} {self.hour:%Y-%m-%d %H}h {self.request_path} {self.status_class}xx"
+
+
+class LatencyWindow(models.Model):
+    """
+    Response time histogram of one route (URL pattern) over one window of
+    LATENCY_HISTOGRAMS["WINDOW_SECONDS"], merged from every worker by
+    core.latency.
+    """
+
+    window_start = models.DateTimeField()
+    route = models.CharField(max_length=255)
+
+    requests = models.PositiveIntegerField(default=0)
+    total_response_ms = models.BigIntegerField(default=0)
+    # sparse core.latency histogram: {"bucket index": count}
+    histogram = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["window_start", "route"], name="unique_latency_window")
+        ]
+
+    def __str__(self):
+        return f"{self.route} {self.window_start:%Y-%m-%d %H:%M}"
     
 #------------------------------------------ System Log Model Ends ------------------------------------------    
 
 
 #------------------------------------------ FeatureUsageAnalytics Model Starts -----------------------------
-class FeatureUsageAnalytics(PublicIDMixin, SoftDeleteModel, OwnedModel):
+class FeatureUsageAnalytics(RecordCountedMixin, PublicIDMixin, SoftDeleteModel, OwnedModel):
     event_id = models.CharField(max_length=30, unique=True)
     feature_name = models.CharField(max_length=100)
     api_calls_made = models.PositiveIntegerField()
@@ -216,6 +447,10 @@ class FeatureUsageAnalytics(PublicIDMixin, SoftDeleteModel, OwnedModel):
 
 # Create your models here.
 class CustomObject(models.Model):
+    class StorageMode(models.TextChoices):
+        EAV = "EAV", "One row per field value"
+        DOCUMENT = "DOCUMENT", "JSON document per record"
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     tenant = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -234,6 +469,16 @@ class CustomObject(models.Model):
     max_records = models.PositiveIntegerField(default=1000)
     allow_api_access = models.BooleanField(default=True)
 
+    # How record values are stored, see core.custom_records
+    storage_mode = models.CharField(
+        max_length=10,
+        choices=StorageMode.choices,
+        default=StorageMode.EAV,
+    )
+
+    # Bumped whenever a CustomField changes; keys core.custom_schema cache
+    schema_version = models.PositiveIntegerField(default=1, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -305,9 +550,20 @@ class CustomObjectRecord(models.Model):
 
     object_api_name = models.CharField(max_length=50)
 
+    # Typed values when the object uses DOCUMENT storage (JSONB on Postgres)
+    data = models.JSONField(default=dict, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["tenant", "object_api_name", "created_at", "id"],
+                name="record_object_created_idx",
+            ),
+        ]
+
 
 class CustomFieldValue(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils.timezone import now
+
+from core.models import OutboundEmail
+
+
+DEFAULT_EMAIL_OUTBOX = {
+    "BATCH_SIZE": 50,          # emails sent over one SMTP connection
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF_SECONDS": 30,     # doubled after every failed attempt
+    "MAX_BACKOFF_SECONDS": 3600,
+    "POLL_INTERVAL": 5,        # seconds the worker sleeps on an empty outbox
+}
+
+
+def get_outbox_config():
+    return {**DEFAULT_EMAIL_OUTBOX, **getattr(settings, "EMAIL_OUTBOX", {})}
+
+
+def queue_email(kind, subject, body, to, from_email=None):
+    """
+    Adds an email to the outbox. Call it inside the transaction of the
+    data the email refers to: both commit, or neither does.
+    """
+    return OutboundEmail.objects.create(
+        kind=kind,
+        to=list(to),
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body=body,
+    )
+
+
+def retry_delay(attempts, config):
+    return timedelta(
+        seconds=min(config["BACKOFF_SECONDS"] * 2 ** (attempts - 1), config["MAX_BACKOFF_SECONDS"])
+    )
+
+
+def record_failure(email, error, config):
+    """One failed attempt: retried after a backoff, FAILED after MAX_ATTEMPTS."""
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+
+    if email.attempts >= config["MAX_ATTEMPTS"]:
+        email.status = OutboundEmail.Status.FAILED
+    else:
+        email.next_attempt_at = now() + retry_delay(email.attempts, config)
+
+
+def reconnect(connection):
+    # a broken SMTP session would fail the rest of the batch too
+    try:
+        connection.close()
+        connection.open()
+    except Exception:
+        pass
+
+
+def send_pending_emails(batch_size=None, connection=None):
+    """
+    Sends one batch of due emails over a single connection and returns
+    (sent, failed). Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED,
+    so several workers never send the same email. A failed email is retried
+    with exponential backoff until MAX_ATTEMPTS, then marked FAILED; when
+    the connection cannot be opened that counts as an attempt of every
+    email in the batch.
+    """
+    config = get_outbox_config()
+    batch_size = batch_size or config["BATCH_SIZE"]
+    sent = failed = 0
+
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now())
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if not emails:
+            return sent, failed
+
+        try:
+            connection = connection or get_connection(fail_silently=False)
+            connection.open()
+        except Exception as e:
+            for email in emails:
+                record_failure(email, e, config)
+            OutboundEmail.objects.bulk_update(emails, ["status", "attempts", "next_attempt_at", "last_error"])
+            return sent, len(emails)
+
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject,
+                    email.body,
+                    email.from_email,
+                    email.to,
+                    connection=connection,
+                )
+
+                try:
+                    # the connection is already open, send_messages keeps it so
+                    connection.send_messages([message])
+                except Exception as e:
+                    failed += 1
+                    record_failure(email, e, config)
+                    reconnect(connection)
+                    continue
+
+                email.attempts += 1
+                sent += 1
+                email.status = OutboundEmail.Status.SENT
+                email.sent_at = now()
+                email.last_error = ""
+        finally:
+            connection.close()
+
+        OutboundEmail.objects.bulk_update(
+            emails,
+            ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+        )
+
+    return sent, failed
@@ -1,14 +1,148 @@
+import base64
+import json
+
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 from .paginations_config import PLAN_PAGINATION_LIMITS
+from .tenancy import get_tenant
 
 
 class PlanBasedPagination(PageNumberPagination):
+    """
+    Page-number pagination sized by the user's plan.
+
+    Passing `?cursor=` (empty for the first page) switches to keyset
+    pagination over (created_at, id): no OFFSET and no COUNT(*). Counts are
+    only returned with `?count=exact` or `?count=estimate` (planner
+    estimate on Postgres).
+    """
+
     page_query_param = "page"
     page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    cursor_ordering = ("created_at", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cursor_mode = self.cursor_query_param in request.query_params
+
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        return self.paginate_queryset_by_cursor(queryset, request)
+
+    def paginate_queryset_by_cursor(self, queryset, request):
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        date_field, id_field = self.cursor_ordering
+
+        backwards = bool(position and position[2])
+        # counted before the cursor filter: the total, not what is left after it
+        unfiltered = queryset
+
+        if position:
+            created_at, pk = position[0], position[1]
+            op = "lt" if backwards else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{date_field}__{op}": created_at})
+                | Q(**{date_field: created_at, f"{id_field}__{op}": pk})
+            )
+
+        if backwards:
+            queryset = queryset.order_by(f"-{date_field}", f"-{id_field}")
+        else:
+            queryset = queryset.order_by(date_field, id_field)
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if backwards:
+            rows.reverse()
+
+        self.count = self.get_cursor_count(unfiltered, request)
+        self.next_position = None
+        self.previous_position = None
+
+        if rows:
+            if has_more or backwards:
+                self.next_position = self.get_position(rows[-1])
+            if (has_more and backwards) or (position and not backwards):
+                self.previous_position = self.get_position(rows[0])
+
+        return rows
+
+    def get_position(self, item):
+        date_field, id_field = self.cursor_ordering
+
+        if isinstance(item, dict):
+            return item[date_field], item[id_field]
+
+        return getattr(item, date_field), getattr(item, id_field)
+
+    def encode_cursor(self, created_at, pk, backwards=False):
+        # integer ids stay numbers, UUID ids travel as strings
+        pk = pk if isinstance(pk, int) else str(pk)
+        raw = json.dumps([created_at.isoformat(), pk, int(backwards)])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, pk, backwards = json.loads(base64.urlsafe_b64decode(padded))
+            created_at = parse_datetime(created_at)
+            if created_at is None or not isinstance(pk, (int, str)):
+                raise ValueError
+            return created_at, pk, bool(backwards)
+        except (TypeError, ValueError):
+            raise ValidationError("Invalid cursor")
+
+    def get_cursor_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+
+        if not mode:
+            return None
+
+        if mode == "exact":
+            return queryset.order_by().count()
+
+        if mode == "estimate":
+            return self.estimate_count(queryset)
+
+        raise ValidationError("count must be 'exact' or 'estimate'")
+
+    def estimate_count(self, queryset):
+        # Planner row estimate, only meaningful on Postgres
+        if connections[queryset.db].vendor != "postgresql":
+            return None
+
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        if isinstance(plan, list):
+            plan = plan[0]
+        return int(plan["Plan"]["Plan Rows"])
+
+    def get_cursor_link(self, position, backwards):
+        if position is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(*position, backwards=backwards),
+        )
 
     def get_page_size(self, request):
         user = request.user
@@ -19,12 +153,10 @@ class PlanBasedPagination(PageNumberPagination):
         if not user.is_authenticated:
             return default_page_size
 
-        profile = getattr(user, "profile", None)
-        if not profile or not profile.plan:
+        plan_name = get_tenant(request).plan_name  # e.g. FREE, PRO
+        if not plan_name:
             return default_page_size
 
-        plan_name = profile.plan.name.upper()  # e.g. FREE, PRO
-
         plan_config = PLAN_PAGINATION_LIMITS.get(plan_name)
         if not plan_config:
             return default_page_size
@@ -49,8 +181,16 @@ class PlanBasedPagination(PageNumberPagination):
         return plan_config["page_size"]
     
     def get_paginated_response(self, data):
-        user = self.request.user
-        plan = getattr(getattr(user, "profile", None), "plan", None)
+        plan = get_tenant(self.request).plan
+
+        if self.cursor_mode:
+            return Response({
+                "plan": plan.name if plan else "UNKNOWN",
+                "count": self.count,
+                "next": self.get_cursor_link(self.next_position, backwards=False),
+                "previous": self.get_cursor_link(self.previous_position, backwards=True),
+                "results": data,
+            })
 
         return Response({
             "plan": plan.name if plan else "UNKNOWN",
@@ -4,6 +4,7 @@ from rest_framework.permissions import BasePermission
 from rest_framework.exceptions import PermissionDenied
 from core.plan_limits import PLAN_CUSTOM_OBJECT_LIMITS 
 from .models import CustomObject, CustomField
+from .tenancy import TenantContext, get_tenant
 
 class IsSuperUser(BasePermission):
     def has_permission(self, request, view):
@@ -24,7 +25,7 @@ class IsEmailVerified(BasePermission):
         if not user.is_active:
             raise PermissionDenied("ACCOUNT_INACTIVE")
 
-        profile = getattr(user, "profile", None)
+        profile = get_tenant(request).profile
 
         if profile and not profile.is_email_verified:
             raise PermissionDenied("EMAIL_NOT_VERIFIED")
@@ -33,7 +34,8 @@ class IsEmailVerified(BasePermission):
     
 
 def get_plan_limits(user):
-    plan_name = user.profile.plan.name.upper()
+    # plan from the process cache: no profile -> plan query per call
+    plan_name = TenantContext.for_user(user).plan_name
     return PLAN_CUSTOM_OBJECT_LIMITS.get(plan_name, {})
 
 def can_create_custom_object(user):
@@ -56,3 +58,14 @@ def can_add_field_to_object(user, custom_object):
     ).count()
 
     return current_fields < max_fields
+
+def can_index_field(user, custom_object, field=None):
+    """Whether one more is_indexed field fits the plan; `field` is the one being edited."""
+    limits = get_plan_limits(user)
+    max_indexed = limits.get("max_indexed_fields_per_object", 0)
+
+    indexed = CustomField.objects.filter(custom_object=custom_object, is_indexed=True)
+    if field is not None and field.pk:
+        indexed = indexed.exclude(pk=field.pk)
+
+    return indexed.count() < max_indexed
@@ -15,32 +15,70 @@ QUOTA_MODELS = [
 
 QUOTA_MODEL_OWNERSHIP = {
     "core.ProductCatalog": "created_by",
-    "core.CustomerProfile": "user",
+    "core.CustomerProfile": "created_by",
     "core.OrderTransaction": "created_by",
-    "core.FeatureUsageAnalytics": "user",
+    "core.FeatureUsageAnalytics": "created_by",
     "core.CustomObject": "tenant",
 }
 
 
+# Every is_indexed field costs a partial index on the shared record tables
+# (core.custom_records.sync_field_indexes), hence max_indexed_fields_per_object.
 PLAN_CUSTOM_OBJECT_LIMITS = {
     "FREE": {
         "max_objects": 2,
         "max_fields_per_object": 5,
         "max_records_per_object": 100,
+        "max_unindexed_sort_records": 1000,
+        "max_indexed_fields_per_object": 1,
     },
     "BASE": {
         "max_objects": 5,
         "max_fields_per_object": 15,
         "max_records_per_object": 1000,
+        "max_unindexed_sort_records": 5000,
+        "max_indexed_fields_per_object": 3,
     },
     "PRO": {
         "max_objects": 20,
         "max_fields_per_object": 50,
         "max_records_per_object": 10000,
+        "max_unindexed_sort_records": None,
+        "max_indexed_fields_per_object": 10,
     },
     "ENTERPRISE": {
         "max_objects": 20,
         "max_fields_per_object": 50,
         "max_records_per_object": 10000,
+        "max_unindexed_sort_records": None,
+        "max_indexed_fields_per_object": 10,
     },
-}
\ No newline at end of file
+}
+
+# Bulk endpoints (core.bulk). "charge" is how a bulk call counts against the
+# monthly API quota: "request" counts it once, "rows" counts one call per
+# `rows_per_call` rows.
+PLAN_BULK_LIMITS = {
+    "FREE": {
+        "max_rows": 0,
+        "charge": "rows",
+        "rows_per_call": 1,
+    },
+    "BASE": {
+        "max_rows": 1000,
+        "charge": "rows",
+        "rows_per_call": 100,
+    },
+    "PRO": {
+        "max_rows": 5000,
+        "charge": "request",
+        "rows_per_call": None,
+    },
+    "ENTERPRISE": {
+        "max_rows": 10000,
+        "charge": "request",
+        "rows_per_call": None,
+    },
+}
+
+BULK_CHUNK_SIZE = 1000
@@ -1,6 +1,16 @@
+import threading
+import time
+
 from django.db import models
 from django.core.exceptions import PermissionDenied
 
+from core.metrics import CACHE_REQUESTS
+
+
+# Seconds a cached Plan is trusted. Plan.save() clears the cache of its own
+# process at once; other workers pick the change up within this window.
+PLAN_CACHE_TTL = 60
+
 class Plan(models.Model):
     PLAN_CHOICES = [
         ("FREE", "Free"),
@@ -38,6 +48,56 @@ class Plan(models.Model):
         if user and not user.is_superuser:
             raise PermissionDenied("Plans can only be modified by admins")
         super().save(*args, **kwargs)
-        
+        invalidate_plan_cache()
+
     def delete(self, *args, **kwargs):
         raise PermissionDenied("Plans cannot be deleted")
+
+
+#------------------------------------------ Plan Cache Starts ------------------------------------------
+
+_plans = {}
+_plans_loaded_at = 0.0
+_plans_lock = threading.Lock()
+
+
+def _plan_table():
+    global _plans, _plans_loaded_at
+
+    if _plans and time.monotonic() - _plans_loaded_at < PLAN_CACHE_TTL:
+        CACHE_REQUESTS.inc(cache="plans", result="hit")
+        return _plans
+
+    with _plans_lock:
+        if not _plans or time.monotonic() - _plans_loaded_at >= PLAN_CACHE_TTL:
+            # a handful of rows: load them all in one query
+            CACHE_REQUESTS.inc(cache="plans", result="miss")
+            plans = list(Plan.objects.all())
+            _plans = {plan.pk: plan for plan in plans}
+            _plans.update({plan.name: plan for plan in plans})
+            _plans_loaded_at = time.monotonic()
+
+    return _plans
+
+
+def get_cached_plan(key):
+    """Plan by primary key or name from the process cache, None if unknown."""
+    if key is None:
+        return None
+
+    plan = _plan_table().get(key)
+    if plan is None:
+        # created since the table was loaded
+        invalidate_plan_cache()
+        plan = _plan_table().get(key)
+
+    return plan
+
+
+def invalidate_plan_cache():
+    global _plans
+
+    with _plans_lock:
+        _plans = {}
+
+#------------------------------------------ Plan Cache Ends ------------------------------------------
@@ -0,0 +1,106 @@
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+
+
+# 14 digits: SSSSSSSSS NN QQQ
+#   S  seconds since PUBLIC_ID_EPOCH (9 digits, good until 2056)
+#   N  node: PUBLIC_ID_NODE setting, else the worker pid (2 digits). Set
+#      PUBLIC_ID_NODE per worker when several writers run: pids modulo 100
+#      can repeat on one host and do repeat across container replicas.
+#   Q  per-second sequence (3 digits)
+PUBLIC_ID_EPOCH = 1735689600  # 2025-01-01T00:00:00Z
+PUBLIC_ID_LENGTH = 14
+NODE_COUNT = 100
+SEQUENCE_SIZE = 1000
+
+
+class PublicIDGenerator:
+    """
+    Time-ordered public ids, unique by construction within a node: the
+    sequence restarts every second and, once a second is used up, the
+    generator borrows the next one instead of waiting. Ids of different
+    nodes never overlap, so no existence check is needed before an insert;
+    the unique index only has to catch shared nodes or legacy random ids
+    (PublicIDMixin.save retries those after reseed()). Ids grow with time,
+    keeping index inserts append-only.
+    """
+
+    def __init__(self, node=None, clock=time.time):
+        self._node = node
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._second = -1
+        self._sequence = 0
+        self._pid = None
+        self._fallback_node = None
+
+    @property
+    def node(self):
+        if self._node is not None:
+            return self._node % NODE_COUNT
+
+        configured = getattr(settings, "PUBLIC_ID_NODE", None)
+        if configured is not None:
+            return int(configured) % NODE_COUNT
+
+        # consecutive worker pids on one host map to distinct nodes
+        if self._fallback_node is None:
+            self._fallback_node = os.getpid() % NODE_COUNT
+        return self._fallback_node
+
+    def reseed(self):
+        """
+        After a clash: moves an unconfigured node elsewhere, so this writer
+        stops following the one it collided with.
+        """
+        with self._lock:
+            if self._node is None and getattr(settings, "PUBLIC_ID_NODE", None) is None:
+                self._fallback_node = random.randrange(NODE_COUNT)
+
+    def next_id(self):
+        return self.next_ids(1)[0]
+
+    def next_ids(self, count):
+        """Reserves `count` consecutive ids under one lock (bulk inserts)."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # a forked worker gets its own node, start its clock afresh
+                self._pid = os.getpid()
+                self._second = -1
+                self._fallback_node = None
+
+            node = self.node
+            ids = []
+
+            for _ in range(count):
+                second = int(self._clock()) - PUBLIC_ID_EPOCH
+
+                if second > self._second:
+                    self._second = second
+                    self._sequence = 0
+                elif self._sequence >= SEQUENCE_SIZE:
+                    # second exhausted (or clock stepped back): borrow ahead
+                    self._second += 1
+                    self._sequence = 0
+
+                ids.append(f"{self._second:09d}{node:02d}{self._sequence:03d}")
+                self._sequence += 1
+
+            return ids
+
+
+public_id_generator = PublicIDGenerator()
+
+
+def assign_public_ids(objs):
+    """Fills the missing public_id of unsaved instances (bulk_create bypasses save())."""
+    missing = [obj for obj in objs if not obj.public_id]
+
+    for obj, public_id in zip(missing, public_id_generator.next_ids(len(missing))):
+        obj.public_id = public_id
+
+    return objs
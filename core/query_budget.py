@@ -0,0 +1,167 @@
+import re
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+from core.metrics import Counter
+
+
+DEFAULT_QUERY_BUDGETS = {
+    "ENABLED": True,
+    "N_PLUS_ONE_THRESHOLD": 5,     # same SQL shape this often in one request: suspected N+1
+    "DEFAULT_BUDGET": None,        # max queries of reads without their own budget
+    "ROUTES": {},                  # {"URL pattern" or "METHOD URL pattern": max queries per request}
+    "RAISE": False,                # raise QueryBudgetExceeded instead of reporting
+}
+
+
+def get_query_budget_config():
+    return {**DEFAULT_QUERY_BUDGETS, **getattr(settings, "QUERY_BUDGETS", {})}
+
+
+BUDGET_EXCEEDED = Counter(
+    "query_budget_exceeded_total",
+    "Requests that ran more queries than the budget of their route.",
+    ["route"],
+)
+N_PLUS_ONE_SUSPECTED = Counter(
+    "query_n_plus_one_suspected_total",
+    "Requests repeating one SQL shape N_PLUS_ONE_THRESHOLD times or more.",
+    ["route"],
+)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+#------------------------------------------ Inspector Starts ------------------------------------------
+
+IN_LIST = re.compile(r"\bIN \((?:%s, )*%s\)")
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+\b")
+WHITESPACE = re.compile(r"\s+")
+
+
+def sql_shape(sql):
+    """SQL without its values: queries differing only in parameters share a shape."""
+    shape = IN_LIST.sub("IN (...)", sql)
+    shape = STRING_LITERAL.sub("?", shape)
+    shape = NUMBER_LITERAL.sub("?", shape)
+    return WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryInspector:
+    """
+    connection.execute_wrapper counting the queries of a block, their time
+    and how often each SQL shape ran.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+
+            shape = sql_shape(sql)
+            self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold):
+        """[(shape, count)] of the shapes run `threshold` times or more, most frequent first."""
+        return sorted(
+            ((shape, count) for shape, count in self.shapes.items() if count >= threshold),
+            key=lambda item: -item[1],
+        )
+
+#------------------------------------------ Inspector Ends ------------------------------------------
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def budget_for(route, config=None, method="GET"):
+    """
+    Budget of `method` on `route`: a "METHOD route" entry first; plain
+    route entries and DEFAULT_BUDGET only cover reads, since writes run
+    their own validation and quota queries.
+    """
+    config = config or get_query_budget_config()
+    routes = config["ROUTES"]
+
+    budget = routes.get(f"{method} {route}")
+    if budget is None and method in SAFE_METHODS:
+        budget = routes.get(route, config["DEFAULT_BUDGET"])
+    return budget
+
+
+def find_problems(inspector, budget=None, threshold=None):
+    """Human-readable budget and N+1 findings of one inspected block."""
+    problems = []
+
+    if budget is not None and inspector.count > budget:
+        problems.append(f"{inspector.count} queries, budget is {budget}")
+
+    for shape, count in inspector.repeated(threshold) if threshold else []:
+        problems.append(f"suspected N+1, {count}x: {shape[:300]}")
+
+    return problems
+
+
+def check_request(route, inspector, config=None, method="GET"):
+    """Counts and reports the problems of one request; raises with RAISE."""
+    config = config or get_query_budget_config()
+    budget = budget_for(route, config, method)
+    threshold = config["N_PLUS_ONE_THRESHOLD"]
+
+    if budget is not None and inspector.count > budget:
+        BUDGET_EXCEEDED.inc(route=route)
+    if threshold and inspector.repeated(threshold):
+        N_PLUS_ONE_SUSPECTED.inc(route=route)
+
+    problems = find_problems(inspector, budget, threshold)
+    if problems and config["RAISE"]:
+        raise QueryBudgetExceeded(f"{method} {route}: " + "; ".join(problems))
+
+    for problem in problems:
+        print(f"[query-budget] {method} {route}: {problem}")
+    return problems
+
+
+@contextmanager
+def assert_query_budget(budget=None, route=None, n_plus_one_threshold=None, method="GET"):
+    """
+    For tests: fails when the block runs more than `budget` queries (by
+    default the QUERY_BUDGETS budget of `method` on `route`) or repeats a
+    SQL shape N_PLUS_ONE_THRESHOLD times.
+    """
+    config = get_query_budget_config()
+    if budget is None and route is not None:
+        budget = budget_for(route, config, method)
+    threshold = n_plus_one_threshold or config["N_PLUS_ONE_THRESHOLD"]
+
+    inspector = QueryInspector()
+    with connection.execute_wrapper(inspector):
+        yield inspector
+
+    problems = find_problems(inspector, budget, threshold)
+    if problems:
+        raise AssertionError("Query budget failed:\n" + "\n".join(problems))
+
+
+def server_timing(inspector, serialize_seconds, total_seconds):
+    """Server-Timing header value, durations in ms."""
+    return (
+        f'db;dur={inspector.seconds * 1000:.1f};desc="{inspector.count} queries", '
+        f"serialize;dur={serialize_seconds * 1000:.1f}, "
+        f"total;dur={total_seconds * 1000:.1f}"
+    )
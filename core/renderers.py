@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    `?format=ndjson`. Exports are streamed by core.exports; this renders the
+    small non-streamed responses (errors) of such a request.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        rows = data if isinstance(data, list) else [data]
+        return "".join(
+            json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + "\n" for row in rows
+        ).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """`?format=csv`, see NDJSONRenderer."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        rows = data if isinstance(data, list) else [data]
+        header = list(rows[0]) if rows and isinstance(rows[0], dict) else []
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row.get(name) for name in header)
+
+        return buffer.getvalue().encode(self.charset)
@@ -0,0 +1,120 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from core.metrics import CACHE_REQUESTS
+
+
+DEFAULT_API_RESPONSE_CACHE = {
+    "ENABLED": True,
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": 300,            # seconds an entry lives; writes invalidate earlier
+    "LOCK_TIMEOUT": 10,        # seconds a computing request holds the lock
+    "WAIT_MS": 2000,           # how long other requests wait for that result
+    "POLL_MS": 20,
+    "KEY_PREFIX": "api-response",
+}
+
+
+class ResponseCache:
+    """
+    Rendered-data cache for read endpoints, keyed by the response's ETag.
+    The ETag already covers the tenant, its data version, the plan and the
+    query string, so a write invalidates every entry of its tenant just by
+    moving the version, and nothing has to be deleted.
+
+    Misses are single-flight: the first request takes a lock with
+    cache.add() and computes the response, identical concurrent requests
+    wait for its result instead of running the same queries.
+    """
+
+    def __init__(
+        self,
+        enabled=True,
+        cache_alias="default",
+        timeout=300,
+        lock_timeout=10,
+        wait_ms=2000,
+        poll_ms=20,
+        key_prefix="api-response",
+    ):
+        self.enabled = enabled
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+        self.wait = wait_ms / 1000
+        self.poll = poll_ms / 1000
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_settings(cls):
+        config = {**DEFAULT_API_RESPONSE_CACHE, **getattr(settings, "API_RESPONSE_CACHE", {})}
+        return cls(
+            enabled=config["ENABLED"],
+            cache_alias=config["CACHE_ALIAS"],
+            timeout=config["TIMEOUT"],
+            lock_timeout=config["LOCK_TIMEOUT"],
+            wait_ms=config["WAIT_MS"],
+            poll_ms=config["POLL_MS"],
+            key_prefix=config["KEY_PREFIX"],
+        )
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_or_compute(self, etag, compute):
+        """
+        The cached response for `etag`, or compute() stored when cacheable
+        (a plain 200 Response). compute() runs at most once per key at a time.
+        """
+        if not self.enabled:
+            return compute()
+
+        key = f"{self.key_prefix}:{etag.strip(chr(34))}"
+        lock_key = f"{key}:lock"
+
+        entry = self.cache.get(key)
+        if entry is None and not self.cache.add(lock_key, 1, self.lock_timeout):
+            entry = self.wait_for(key)
+
+            if entry is None:
+                # the holder failed or is slow: compute without the lock
+                return self.store(key, compute())
+
+        if entry is not None:
+            CACHE_REQUESTS.inc(cache="api_response", result="hit")
+            return self.hit(entry)
+
+        try:
+            return self.store(key, compute())
+        finally:
+            self.cache.delete(lock_key)
+
+    def wait_for(self, key):
+        deadline = time.monotonic() + self.wait
+        while time.monotonic() < deadline:
+            time.sleep(self.poll)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def store(self, key, response):
+        CACHE_REQUESTS.inc(cache="api_response", result="miss")
+
+        if isinstance(response, Response) and response.status_code == 200 and not response.exception:
+            self.cache.set(key, response.data, self.timeout)
+            response["X-Cache"] = "MISS"
+
+        return response
+
+    def hit(self, data):
+        response = Response(data)
+        response["X-Cache"] = "HIT"
+        return response
+
+
+response_cache = ResponseCache.from_settings()
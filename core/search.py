@@ -0,0 +1,44 @@
+from django.db import connections
+from django.db.models import Case, FloatField, Q, Value, When
+
+
+def search_products(queryset, term):
+    """
+    Ranked product_name search.
+
+    On Postgres both the substring match and the fuzzy `%` match
+    (pg_trgm.similarity_threshold) are served by the trigram GIN indexes
+    from migration 0023 and ranked by similarity. Other databases fall back
+    to icontains ranked exact > prefix > substring, which is enough for
+    local testing.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    if connections[queryset.db].vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        return (
+            queryset
+            .filter(
+                Q(product_name__icontains=term)
+                | Q(product_name__trigram_similar=term)
+            )
+            .annotate(search_rank=TrigramSimilarity("product_name", term))
+            .order_by("-search_rank", "id")
+        )
+
+    return (
+        queryset
+        .filter(product_name__icontains=term)
+        .annotate(
+            search_rank=Case(
+                When(product_name__iexact=term, then=Value(1.0)),
+                When(product_name__istartswith=term, then=Value(0.5)),
+                default=Value(0.1),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-search_rank", "id")
+    )
@@ -37,6 +37,16 @@ class ProductCatalogSerializer(RecordQuotaValidationMixin, serializers.ModelSeri
             "product_rating",
         ]       
     
+
+class ProductCatalogBulkSerializer(ProductCatalogSerializer):
+    """
+    Row serializer of the bulk endpoints. Quota and uniqueness are checked
+    once per batch by core.bulk, not per row.
+    """
+
+    def validate(self, attrs):
+        return attrs
+
 #-------------------ProductCatalogSerializer Ends---------------
 
 #-------------------OrderTransactionSerializer Starts---------------
@@ -53,6 +63,16 @@ class OrderTransactionSerializer(RecordQuotaValidationMixin, serializers.ModelSe
             'order_date',
             'discount_applied',
         ]
+
+class OrderTransactionBulkSerializer(OrderTransactionSerializer):
+    """Row serializer of the bulk endpoints, see ProductCatalogBulkSerializer."""
+
+    class Meta(OrderTransactionSerializer.Meta):
+        extra_kwargs = {"order_id": {"validators": []}}
+
+    def validate(self, attrs):
+        return attrs
+
 #-------------------OrderTransactionSerializer Ends---------------
 
 #-------------------SystemLogSerializer Starts---------------     
@@ -91,7 +111,7 @@ class FeatureUsageAnalyticsSerializer(serializers.ModelSerializer):
 class CustomObjectSerializer(RecordQuotaValidationMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomObject
-        fields = ["id", "name", "api_name", "description"]
+        fields = ["id", "name", "api_name", "description", "storage_mode"]
 
 
 class CustomFieldSerializer(RecordQuotaValidationMixin, serializers.ModelSerializer):
@@ -104,6 +124,7 @@ class CustomFieldSerializer(RecordQuotaValidationMixin, serializers.ModelSeriali
             "data_type",
             "is_required",
             "is_unique",
+            "is_indexed",
             "default_value",
             "min_value",
             "max_value",
@@ -1,14 +1,81 @@
-from django.db.models.signals import post_save
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from core.models import UserProfile
-from core.plans import Plan
+from django.db.models import F
+from django.utils.timezone import now
+from core.models import UserProfile, CustomField, CustomObject
+from core.plans import Plan, get_cached_plan
+from core.mixins import RecordCountedMixin
+from core.usage import adjust_records_used
+from core.tasks import queue_index_drop, queue_index_sync
+from core.custom_schema import invalidate_schema
 
 @receiver(post_save, sender=User)
 def ensure_user_profile(sender, instance, created, **kwargs):
     if not hasattr(instance, "profile"):
-        free_plan = Plan.objects.get(name="FREE")
+        free_plan = get_cached_plan("FREE") or Plan.objects.get(name="FREE")
         UserProfile.objects.create(
             user=instance,
             plan=free_plan
         )
+
+
+def release_record_quota(sender, instance, **kwargs):
+    # hard deletes of alive rows give the quota back
+    if not instance.is_deleted:
+        adjust_records_used({instance.created_by_id: -1})
+
+
+for model in apps.get_app_config("core").get_models():
+    if issubclass(model, RecordCountedMixin):
+        post_delete.connect(
+            release_record_quota,
+            sender=model,
+            dispatch_uid=f"release_record_quota_{model._meta.label_lower}",
+        )
+
+
+def bump_schema_version(custom_object):
+    # compiled schemas in every process are keyed by this version
+    CustomObject.objects.filter(pk=custom_object.pk).update(
+        schema_version=F("schema_version") + 1,
+        updated_at=now(),
+    )
+    invalidate_schema(custom_object)
+
+
+INDEX_FIELDS = ("api_name", "data_type", "is_indexed")
+
+
+@receiver(pre_save, sender=CustomField)
+def remember_custom_field_index(sender, instance, **kwargs):
+    # what the stored row was indexed as, to skip saves that change nothing
+    instance._stored_index = None
+    if not instance._state.adding:
+        instance._stored_index = (
+            CustomField.objects.filter(pk=instance.pk).values_list(*INDEX_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=CustomField)
+def sync_custom_field_index(sender, instance, created, **kwargs):
+    bump_schema_version(instance.custom_object)
+
+    # partial indexes follow CustomField.is_indexed, built by a job
+    stored = getattr(instance, "_stored_index", None)
+    current = tuple(getattr(instance, name) for name in INDEX_FIELDS)
+    if stored == current or (stored is None and not instance.is_indexed):
+        return
+
+    if stored is not None and stored[2] and stored[:2] != current[:2]:
+        # renamed or retyped: the old index is named after the old field
+        queue_index_drop(instance.custom_object_id, stored[0], stored[1])
+    queue_index_sync(instance.custom_object)
+
+
+@receiver(post_delete, sender=CustomField)
+def drop_custom_field_index(sender, instance, **kwargs):
+    bump_schema_version(instance.custom_object)
+    if instance.is_indexed:
+        queue_index_drop(instance.custom_object_id, instance.api_name, instance.data_type)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.utils.timezone import now
+
+from core.custom_records import drop_field_index, sync_field_indexes
+from core.jobs import enqueue, get_job_config, job
+from core.latency import get_latency_config
+from core.log_partitions import compact_system_logs as compact_logs, ensure_partitions
+from core.models import CustomObject, Job, LatencyWindow
+from core.outbox import send_pending_emails
+from core.usage import reconcile_records_used, usage_counter
+
+
+@job("core.send_outbound_emails")
+def send_outbound_emails(batch_size=None):
+    send_pending_emails(batch_size=batch_size)
+
+
+@job("core.reconcile_record_counts")
+def reconcile_record_counts(user_ids=None):
+    reconcile_records_used(user_ids=user_ids)
+
+
+@job("core.flush_api_usage")
+def flush_api_usage():
+    usage_counter.flush()
+
+
+@job("core.purge_finished_jobs")
+def purge_finished_jobs(days=None):
+    days = days if days is not None else get_job_config()["KEEP_FINISHED_DAYS"]
+
+    Job.objects.filter(
+        status__in=[Job.Status.DONE, Job.Status.FAILED],
+        finished_at__lt=now() - timedelta(days=days),
+    ).delete()
+
+
+@job("core.compact_system_logs")
+def compact_system_logs():
+    compact_logs()
+
+
+@job("core.ensure_system_log_partitions")
+def ensure_system_log_partitions():
+    ensure_partitions()
+
+
+@job("core.purge_latency_windows")
+def purge_latency_windows(days=None):
+    days = days if days is not None else get_latency_config()["KEEP_DAYS"]
+    LatencyWindow.objects.filter(window_start__lt=now() - timedelta(days=days)).delete()
+
+
+#------------------------------------------ Field Indexes Starts ------------------------------------------
+# CREATE/DROP INDEX CONCURRENTLY on the shared record tables runs on the
+# job worker, outside any transaction, instead of in the request that
+# changed the field.
+
+@job("core.sync_field_indexes")
+def sync_custom_field_indexes(custom_object_id):
+    custom_object = CustomObject.objects.filter(pk=custom_object_id).first()
+    if custom_object is not None:
+        sync_field_indexes(custom_object)
+
+
+@job("core.drop_field_index")
+def drop_custom_field_index(custom_object_id, api_name, data_type=None):
+    drop_field_index(custom_object_id, api_name, data_type)
+
+
+def queue_index_sync(custom_object):
+    # partial indexes only exist on Postgres
+    if connection.vendor == "postgresql":
+        enqueue("core.sync_field_indexes", {"custom_object_id": str(custom_object.pk)})
+
+
+def queue_index_drop(custom_object_id, api_name, data_type=None):
+    if connection.vendor == "postgresql":
+        enqueue(
+            "core.drop_field_index",
+            {"custom_object_id": str(custom_object_id), "api_name": api_name, "data_type": data_type},
+        )
+
+#------------------------------------------ Field Indexes Ends ------------------------------------------
@@ -0,0 +1,99 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.plans import get_cached_plan
+
+
+class TenantContext:
+    """
+    The user, profile and plan of one request, resolved once. Every layer
+    (middleware, permissions, throttle, pagination, usage counting) reads
+    them from here instead of walking user.profile.plan on its own.
+    """
+
+    __slots__ = ("user", "profile", "plan")
+
+    def __init__(self, user, profile=None, plan=None):
+        self.user = user
+        self.profile = profile
+        self.plan = plan
+
+    @property
+    def plan_name(self):
+        return self.plan.name.upper() if self.plan else None
+
+    @classmethod
+    def for_user(cls, user):
+        if user is None or not user.is_authenticated:
+            return cls(user)
+
+        profile = getattr(user, "profile", None)
+        if profile is None:
+            return cls(user)
+
+        if "plan" in profile._state.fields_cache:
+            plan = profile.plan
+        else:
+            plan = get_cached_plan(profile.plan_id)
+            # later user.profile.plan reads hit the same instance
+            profile.plan = plan
+
+        return cls(user, profile, plan)
+
+
+def get_tenant(request):
+    """
+    TenantContext of `request` (Django or DRF request). Set by
+    TenantJWTAuthentication for API calls, built lazily for session users.
+    """
+    tenant = getattr(request, "tenant", None)
+
+    if tenant is None or tenant.user is not request.user:
+        tenant = TenantContext.for_user(request.user)
+        # DRF requests proxy attribute reads to the underlying HttpRequest
+        setattr(getattr(request, "_request", request), "tenant", tenant)
+
+    return tenant
+
+
+class TenantJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that loads the user, profile and plan in one query
+    and attaches the TenantContext to the request.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is None:
+            return None
+
+        user, token = result
+        request._request.tenant = TenantContext.for_user(user)
+        return user, token
+
+    def get_user(self, validated_token):
+        # same checks as JWTAuthentication.get_user, one joined query
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        try:
+            user = (
+                self.user_model.objects
+                .select_related("profile__plan")
+                .get(**{api_settings.USER_ID_FIELD: user_id})
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+
+        return user
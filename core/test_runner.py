@@ -0,0 +1,27 @@
+from django.test.runner import DiscoverRunner
+
+from core.background import BackgroundFlusher
+from core.latency import latency_recorder
+from core.log_buffer import log_buffer
+from core.usage import usage_counter
+
+
+class CoreTestRunner(DiscoverRunner):
+    """
+    Runs the tests without the background flushers: their threads write
+    outside the test transactions, and the final flush at interpreter exit
+    would reach the real database once the test databases are gone. What
+    the tests leave pending is dropped.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        BackgroundFlusher.autostart = False
+
+    def teardown_test_environment(self, **kwargs):
+        log_buffer.clear()
+        usage_counter.backend.drain()
+        latency_recorder.drain()
+
+        BackgroundFlusher.autostart = True
+        super().teardown_test_environment(**kwargs)
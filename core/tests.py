@@ -1,3 +1,1687 @@
-from django.test import TestCase
+import io
+import json
+import threading
+from unittest import mock, skipUnless
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, IntegrityError, connection
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
 
 # Create your tests here.
+from django.contrib.auth.models import User
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from datetime import datetime, timedelta, timezone
+
+from core.jobs import claim_jobs, enqueue, heartbeat, job, requeue_stale_jobs, schedule_periodic_jobs, work_once
+from core.latency import MAX_TRACKED_MS, LatencyRecorder, bucket_bounds, bucket_index, new_counts, percentiles, route_latency
+from core.background import BackgroundFlusher
+from core.custom_records import convert_storage
+from core.custom_schema import CompiledField, _schemas, get_schema, invalidate_schema
+from core.fast_serializers import get_fast_serializer
+from core.log_buffer import LogEntry, SystemLogBuffer
+from core.metrics import Counter, Histogram, MetricsRegistry
+from core.log_partitions import (
+    compact_system_logs, ensure_partitions, get_retention_config, is_partitioned, legacy_end,
+    list_partitions, next_period, partition_name, period_start,
+)
+from core.models import (
+    CustomField, CustomFieldValue, CustomObject, Job, OrderTransaction, OutboundEmail, ProductCatalog,
+    SystemLog, SystemLogRollup, UsageRollup, UserProfile,
+)
+from core.parsers import NDJSONParser
+from core.plan_limits import PLAN_CUSTOM_OBJECT_LIMITS
+from core.outbox import queue_email, send_pending_emails
+from core.plans import Plan, get_cached_plan, invalidate_plan_cache
+from core.public_ids import PUBLIC_ID_EPOCH, SEQUENCE_SIZE, PublicIDGenerator, public_id_generator
+from core.response_cache import ResponseCache
+from core.search import search_products
+from core.serializers import OrderTransactionSerializer, ProductCatalogSerializer
+from core.query_budget import assert_query_budget, budget_for
+from core.usage import APIUsageCounter, LocalUsageBackend, RedisUsageBackend, reconcile_records_used, usage_counter
+from core.usage_rollups import record_usage, usage_report
+
+
+def create_plans():
+    for name in ("FREE", "BASE", "ENTERPRISE"):
+        Plan.objects.get_or_create(
+            name=name,
+            defaults={
+                "monthly_api_limit": 1000,
+                "max_records": 1000,
+                "max_records_per_query": 100,
+                "can_create_records": True,
+                "can_update_records": name != "FREE",
+                "can_delete_records": name != "FREE",
+                "allow_filters": True,
+                "allow_sorting": True,
+                "allow_bulk_operations": name != "FREE",
+            },
+        )
+    invalidate_plan_cache()
+
+
+def create_tenant(username, plan="BASE"):
+    """A verified user on `plan`; create_plans() must have run."""
+    user = User.objects.create_user(username=username, password="x")
+    UserProfile.objects.filter(user=user).update(
+        plan=Plan.objects.get(name=plan),
+        is_email_verified=True,
+        api_reset_at=now() + timedelta(days=30),
+    )
+    return User.objects.get(pk=user.pk)
+
+
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    return client
+
+
+def create_product(user, product_id, **fields):
+    return ProductCatalog.objects.create(
+        created_by=user,
+        product_id=product_id,
+        product_name=fields.pop("product_name", f"Widget {product_id}"),
+        category=fields.pop("category", "tools"),
+        price=fields.pop("price", "1.50"),
+        currency=fields.pop("currency", "INR"),
+        stock_count=fields.pop("stock_count", 1),
+        product_rating=fields.pop("product_rating", 4.5),
+        **fields,
+    )
+
+
+def create_custom_object(user, api_name, storage_mode="EAV", fields=()):
+    """A custom object with `fields` as (api_name, data_type) or (api_name, data_type, options)."""
+    obj = CustomObject.objects.create(tenant=user, name=api_name.title(), api_name=api_name, storage_mode=storage_mode)
+    for api_name, data_type, *options in fields:
+        CustomField.objects.create(
+            custom_object=obj, name=api_name, api_name=api_name, data_type=data_type, **(options[0] if options else {}),
+        )
+    return CustomObject.objects.get(pk=obj.pk)
+
+
+class TenantContextQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in ("FREE", "BASE"):
+            Plan.objects.create(
+                name=name,
+                monthly_api_limit=1000,
+                max_records=1000,
+                max_records_per_query=100,
+            )
+
+        cls.user = User.objects.create_user(username="tenant", password="x")
+        UserProfile.objects.filter(user=cls.user).update(
+            plan=Plan.objects.get(name="BASE"),
+            is_email_verified=True,
+        )
+
+    def setUp(self):
+        invalidate_plan_cache()
+        # cached responses are keyed by user pk, reused across test databases
+        cache.clear()
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_list_resolves_user_profile_and_plan_once(self):
+        # 1 user + profile + plan, 1 data version, 1 COUNT, 1 page of products
+        with self.assertNumQueries(4):
+            response = self.client.get("/core/api/v1/product-catalog/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["plan"], "BASE")
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.client.get("/core/api/v1/product-catalog/")["ETag"]
+
+        # user + profile + plan and the data version, no data tables
+        with self.assertNumQueries(2):
+            response = self.client.get("/core/api/v1/product-catalog/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_endpoints_stay_within_query_budgets(self):
+        for route in ("core/api/v1/product-catalog/", "core/api/v1/order-transaction/", "core/api/v1/usage/"):
+            with self.subTest(route=route), assert_query_budget(route=route):
+                self.assertEqual(self.client.get(f"/{route}").status_code, 200)
+
+    def test_repeated_query_shape_is_flagged_as_n_plus_one(self):
+        with self.assertRaisesMessage(AssertionError, "suspected N+1, 5x"):
+            with assert_query_budget():
+                for pk in range(5):
+                    User.objects.filter(pk=pk).first()
+
+    def test_plan_cache_is_invalidated_on_save(self):
+        plan = get_cached_plan("BASE")
+        with self.assertNumQueries(0):
+            self.assertIs(get_cached_plan(plan.pk), plan)
+
+        plan.monthly_api_limit = 5
+        plan.save()
+
+        self.assertEqual(get_cached_plan("BASE").monthly_api_limit, 5)
+
+
+class FlakyEmailBackend(EmailBackend):
+    """locmem backend failing the first `failures` sends."""
+
+    def __init__(self, failures=0, open_fails=False, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.open_fails = open_fails
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+        if self.open_fails:
+            raise ConnectionRefusedError("smtp unreachable")
+        return super().open()
+
+    def send_messages(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("smtp down")
+        return super().send_messages(messages)
+
+
+class OutboxTests(TestCase):
+
+    def test_batch_is_sent_over_one_connection(self):
+        for i in range(3):
+            queue_email("verification", f"Verify {i}", "body", [f"user{i}@example.com"])
+
+        backend = FlakyEmailBackend()
+        self.assertEqual(send_pending_emails(connection=backend), (3, 0))
+
+        self.assertEqual(backend.opened, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.Status.SENT).exists())
+
+    def test_failed_email_is_retried_with_backoff(self):
+        email = queue_email("password_reset", "Reset", "body", ["user@example.com"])
+
+        self.assertEqual(send_pending_emails(connection=FlakyEmailBackend(failures=1)), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.Status.PENDING, 1))
+
+        # not due until the backoff has passed
+        self.assertEqual(send_pending_emails(connection=FlakyEmailBackend()), (0, 0))
+
+        OutboundEmail.objects.update(next_attempt_at=email.created_at)
+        self.assertEqual(send_pending_emails(connection=FlakyEmailBackend()), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+
+    def test_connection_failure_counts_an_attempt_per_email(self):
+        first = queue_email("verification", "Verify", "body", ["a@example.com"])
+        queue_email("verification", "Verify", "body", ["b@example.com"])
+
+        self.assertEqual(send_pending_emails(connection=FlakyEmailBackend(open_fails=True)), (0, 2))
+
+        rows = OutboundEmail.objects.order_by("id")
+        self.assertEqual([(row.status, row.attempts) for row in rows], [(OutboundEmail.Status.PENDING, 1)] * 2)
+        self.assertGreater(rows[0].next_attempt_at, first.next_attempt_at)
+        self.assertIn("smtp unreachable", rows[0].last_error)
+
+    def test_command_survives_a_failed_batch(self):
+        stderr = io.StringIO()
+        results = [RuntimeError("database is locked"), (1, 0), KeyboardInterrupt()]
+
+        with mock.patch("core.management.commands.send_outbound_emails.send_pending_emails", side_effect=results) as send, \
+                mock.patch("core.management.commands.send_outbound_emails.time.sleep"):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command("send_outbound_emails", stdout=io.StringIO(), stderr=stderr)
+
+        self.assertEqual(send.call_count, 3)
+        self.assertIn("database is locked", stderr.getvalue())
+
+ran = []
+
+
+@job("tests.record", max_attempts=2)
+def record_job(value, fail=False):
+    if fail:
+        raise RuntimeError("boom")
+    ran.append(value)
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        ran.clear()
+
+    def test_due_jobs_run_once(self):
+        enqueue("tests.record", {"value": 1})
+        enqueue("tests.record", {"value": 2}, delay=3600)
+
+        self.assertEqual(work_once(), 1)
+        self.assertEqual(work_once(), 0)
+        self.assertEqual(ran, [1])
+        self.assertEqual(Job.objects.filter(status=Job.Status.DONE).count(), 1)
+
+    def test_failing_job_is_retried_then_failed(self):
+        job_row = enqueue("tests.record", {"value": 1, "fail": True})
+
+        work_once()
+        job_row.refresh_from_db()
+        self.assertEqual((job_row.status, job_row.attempts), (Job.Status.QUEUED, 1))
+
+        Job.objects.update(run_at=job_row.created_at)
+        work_once()
+        job_row.refresh_from_db()
+        self.assertEqual((job_row.status, job_row.attempts), (Job.Status.FAILED, 2))
+        self.assertIn("boom", job_row.last_error)
+
+    def test_periodic_jobs_are_enqueued_once_per_slot(self):
+        config = {"PERIODIC": {"record": {"job": "tests.record", "every": 3600, "payload": {"value": 3}}}}
+
+        schedule_periodic_jobs(config)
+        schedule_periodic_jobs(config)
+
+        self.assertEqual(Job.objects.filter(name="tests.record").count(), 1)
+
+
+    def test_stale_jobs_are_requeued_or_failed(self):
+        retry = enqueue("tests.record", {"value": 1})
+        spent = enqueue("tests.record", {"value": 2})
+        alive = enqueue("tests.record", {"value": 3})
+        claim_jobs("worker-1", 3)
+
+        long_ago = now() - timedelta(hours=1)
+        Job.objects.filter(pk__in=[retry.pk, spent.pk]).update(locked_at=long_ago)
+        Job.objects.filter(pk=spent.pk).update(attempts=2)
+        # the worker is still running `alive`; the other two lost their heartbeat
+        self.assertEqual(heartbeat("worker-1", [alive.pk]), 1)
+
+        self.assertEqual(requeue_stale_jobs({"STALE_AFTER_SECONDS": 600}), (1, 1))
+
+        statuses = dict(Job.objects.values_list("pk", "status"))
+        self.assertEqual(
+            [statuses[retry.pk], statuses[spent.pk], statuses[alive.pk]],
+            [Job.Status.QUEUED, Job.Status.FAILED, Job.Status.RUNNING],
+        )
+
+class SystemLogCompactionTests(TestCase):
+
+    def log(self, user, logged_at, status=200, ms=10):
+        row = SystemLog.objects.create(
+            created_by=user,
+            service_name="API",
+            log_level="INFO",
+            message="GET /core/api/v1/product-catalog/",
+            request_path="/core/api/v1/product-catalog/",
+            http_status=status,
+            response_time_ms=ms,
+        )
+        SystemLog.all_objects.filter(pk=row.pk).update(logged_at=logged_at)
+
+    def test_expired_rows_are_rolled_up_and_removed(self):
+        Plan.objects.create(name="FREE", monthly_api_limit=100, max_records=100, max_records_per_query=10)
+        invalidate_plan_cache()
+        user = User.objects.create_user(username="logs")
+        hour = datetime(2026, 1, 5, 10, tzinfo=timezone.utc)
+
+        self.log(user, hour + timedelta(minutes=1), ms=10)
+        self.log(user, hour + timedelta(minutes=30), ms=30)
+        self.log(user, hour + timedelta(minutes=40), status=500, ms=5)
+        self.log(user, hour + timedelta(days=40))
+
+        self.assertEqual(compact_system_logs(until=hour + timedelta(days=1)), 3)
+        self.assertEqual(SystemLog.all_objects.count(), 1)
+
+        ok = SystemLogRollup.objects.get(tenant=user, hour=hour, http_status=200)
+        self.assertEqual((ok.requests, ok.total_response_ms, ok.max_response_ms), (2, 40, 30))
+
+        # a late row of an already compacted hour is merged, not duplicated
+        self.log(user, hour + timedelta(minutes=50), ms=50)
+        compact_system_logs(until=hour + timedelta(days=1))
+
+        ok.refresh_from_db()
+        self.assertEqual((ok.requests, ok.max_response_ms), (3, 50))
+
+
+@skipUnless(connection.vendor == "postgresql", "range partitioning is Postgres only")
+class SystemLogPartitionTests(TestCase):
+    """The DDL of migration 0031 and core.log_partitions, on the test database."""
+
+    def test_current_period_lives_in_legacy_partition(self):
+        config = get_retention_config()
+        current = period_start(now(), config["PARTITION"])
+
+        self.assertTrue(is_partitioned())
+        self.assertEqual(legacy_end(), next_period(current, config["PARTITION"]))
+
+        partitions = list_partitions()
+        self.assertIn("core_systemlog_legacy", partitions)
+        self.assertIn("core_systemlog_default", partitions)
+        self.assertNotIn(partition_name(current, config["PARTITION"]), partitions)
+
+        # periods the legacy partition covers are skipped
+        ensure_partitions(config=config)
+
+        Plan.objects.create(name="FREE", monthly_api_limit=100, max_records=100, max_records_per_query=10)
+        invalidate_plan_cache()
+        user = User.objects.create_user(username="partitions")
+        row = SystemLog.objects.create(
+            created_by=user, service_name="API", log_level="INFO", message="GET /",
+            request_path="/", http_status=200,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM core_systemlog WHERE id = %s", [row.pk])
+            self.assertEqual(cursor.fetchone()[0], "core_systemlog_legacy")
+
+
+class UsageRollupTests(TestCase):
+
+    def entry(self, user, logged_at, status=200, ms=10):
+        return LogEntry(user.pk, "API", "INFO", "GET", "/core/api/v1/product-catalog/", status, ms, None, logged_at)
+
+    def test_flushes_are_merged_into_hourly_rollups(self):
+        Plan.objects.create(name="FREE", monthly_api_limit=100, max_records=100, max_records_per_query=10)
+        invalidate_plan_cache()
+        user = User.objects.create_user(username="usage")
+        hour = datetime(2026, 1, 5, 10, tzinfo=timezone.utc)
+
+        early, late = hour + timedelta(minutes=5), hour + timedelta(minutes=50)
+
+        record_usage([self.entry(user, early, ms=8), self.entry(user, early, status=404, ms=40)])
+        record_usage([self.entry(user, late, ms=12), self.entry(user, late, status=503, ms=None)])
+
+        [row] = usage_report(user, hour, hour + timedelta(days=1))
+        self.assertEqual(
+            (row["requests"], row["client_errors"], row["server_errors"], row["avg_ms"], row["p50_ms"], row["p95_ms"]),
+            (4, 1, 1, 20.0, 12, 41),
+        )
+
+
+    def test_entries_are_rolled_up_in_their_own_hour(self):
+        create_plans()
+        user = create_tenant("usage-hours")
+        hour = datetime(2026, 1, 5, 10, tzinfo=timezone.utc)
+
+        record_usage([
+            self.entry(user, hour + timedelta(minutes=59)),
+            self.entry(user, hour + timedelta(minutes=61)),
+            self.entry(user, hour + timedelta(minutes=62)),
+        ])
+
+        self.assertEqual(
+            list(UsageRollup.objects.filter(tenant=user).order_by("hour").values_list("hour", "requests")),
+            [(hour, 1), (hour + timedelta(hours=1), 2)],
+        )
+
+    def test_usage_endpoint_reports_only_the_callers_rollups(self):
+        create_plans()
+        user, other = create_tenant("usage-api"), create_tenant("usage-other")
+        day = datetime(2026, 1, 5, tzinfo=timezone.utc)
+        products, orders = "/core/api/v1/product-catalog/", "/core/api/v1/order-transaction/"
+
+        def rollup(tenant, hour, path, status_class, requests, ms):
+            UsageRollup.objects.create(
+                tenant=tenant, hour=day + timedelta(hours=hour), request_path=path, status_class=status_class,
+                requests=requests, timed_requests=requests, total_response_ms=requests * ms,
+                histogram={str(bucket_index(ms)): requests},
+            )
+
+        rollup(user, 9, products, 2, 3, 10)
+        rollup(user, 10, products, 2, 4, 20)
+        rollup(user, 10, products, 4, 1, 5)
+        rollup(user, 10, orders, 5, 2, 100)
+        rollup(user, 24, products, 2, 7, 10)           # the next day
+        rollup(other, 10, products, 2, 50, 1)
+
+        invalidate_plan_cache()
+        cache.clear()
+        client = jwt_client(user)
+
+        def report(query):
+            response = client.get("/core/api/v1/usage/" + query)
+            self.assertEqual(response.status_code, 200, response.content)
+            return response.json()
+
+        hourly = report("?from=2026-01-05T10:30:00Z&to=2026-01-05&granularity=hour")
+        self.assertEqual((hourly["from"], hourly["to"]), ("2026-01-05T10:00:00+00:00", "2026-01-06T00:00:00+00:00"))
+        self.assertEqual(
+            [(r["period"], r["request_path"], r["requests"], r["client_errors"], r["server_errors"], r["avg_ms"])
+             for r in hourly["results"]],
+            [
+                ("2026-01-05T10:00:00+00:00", orders, 2, 0, 2, 100.0),
+                ("2026-01-05T10:00:00+00:00", products, 5, 1, 0, 17.0),
+            ],
+        )
+
+        [daily] = report(f"?from=2026-01-05&to=2026-01-05&path={products}")["results"]
+        self.assertEqual(
+            (daily["period"], daily["requests"], daily["client_errors"], daily["error_rate"], daily["p50_ms"], daily["p99_ms"]),
+            ("2026-01-05T00:00:00+00:00", 8, 1, 0.125, 10, 20),
+        )
+
+        self.assertEqual(report("?from=2026-01-06&to=2026-01-06")["results"][0]["requests"], 7)
+        self.assertEqual(client.get("/core/api/v1/usage/?from=2026-01-06&to=2026-01-05").status_code, 400)
+
+    def test_failed_rollup_keeps_the_log_rows_out(self):
+        create_plans()
+        user = create_tenant("usage-atomic")
+        buffer = SystemLogBuffer()
+        buffer.record(
+            user_id=user.pk, service_name="API", log_level="INFO", message="GET",
+            request_path="/", http_status=200,
+        )
+
+        with mock.patch("core.log_buffer.record_usage", side_effect=RuntimeError("locked")):
+            buffer.flush()
+
+        self.assertEqual((buffer.flushed, buffer.failed), (0, 1))
+        self.assertFalse(SystemLog.objects.exists())
+
+
+class LatencyHistogramTests(TestCase):
+
+    def test_buckets_stay_within_relative_error(self):
+        for ms in (0, 31, 32, 47, 100, 999, 12345, MAX_TRACKED_MS):
+            low, high = bucket_bounds(bucket_index(ms))
+            self.assertTrue(low <= ms < high)
+            self.assertLessEqual(high - low, max(1, low / 16))
+
+    def test_percentiles_of_bucket_counts(self):
+        counts = new_counts()
+        self.assertEqual(percentiles(counts), [None, None, None])
+
+        counts[bucket_index(7)] = 1
+        self.assertEqual(percentiles(counts), [7, 7, 7])
+
+        counts[bucket_index(200)] = 98
+        counts[bucket_index(MAX_TRACKED_MS)] = 1
+        # 200 ms shares a bucket with 207 ms, the bucket's highest value
+        self.assertEqual(percentiles(counts, (0, 0.01, 0.5, 0.99, 1)), [7, 7, 207, 207, MAX_TRACKED_MS])
+
+    def test_worker_histograms_merge_into_windows(self):
+        for recorder, samples in ((LatencyRecorder(), range(1, 51)), (LatencyRecorder(), range(51, 101))):
+            for ms in samples:
+                recorder.record("core/api/v1/usage/", ms)
+            recorder.flush()
+
+        [row] = route_latency(now() - timedelta(hours=1), now() + timedelta(hours=1))
+        self.assertEqual((row["requests"], row["avg_ms"]), (100, 50.5))
+        self.assertEqual((row["p50_ms"], row["p95_ms"], row["p99_ms"]), (51, 95, 99))
+
+    def test_failed_flush_keeps_the_windows(self):
+        recorder = LatencyRecorder()
+        recorder.record("core/api/v1/usage/", 10)
+
+        with mock.patch("core.latency.store_windows", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                recorder.flush()
+        # a later request lands in the same window as the restored one
+        recorder.record("core/api/v1/usage/", 30)
+
+        [(requests, total_ms, counts)] = recorder._pending.values()
+        self.assertEqual((requests, total_ms, sum(counts)), (2, 40, 2))
+        self.assertEqual(recorder.flush(), 1)
+
+
+class MetricsTests(TestCase):
+
+    def test_thread_shards_are_summed_on_render(self):
+        registry = MetricsRegistry()
+        requests = Counter("test_requests_total", "Requests.", ["status"], registry=registry)
+        seconds = Histogram("test_seconds", "Seconds.", buckets=(0.1, 1), registry=registry)
+
+        def work():
+            for _ in range(100):
+                requests.inc(status=200)
+            seconds.observe(0.5)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        requests.inc(status=500)
+
+        lines = registry.render().splitlines()
+        self.assertIn('test_requests_total{status="200"} 400', lines)
+        self.assertIn('test_requests_total{status="500"} 1', lines)
+        self.assertIn('test_seconds_bucket{le="0.1"} 0', lines)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn("test_seconds_sum 2", lines)
+
+
+class MetricsEndpointTests(TestCase):
+    url = "/metrics"
+
+    def scrape(self, token=None, **config):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        with override_settings(METRICS={**settings.METRICS, **config}):
+            # the test client sends from 127.0.0.1, like a local reverse proxy
+            return self.client.get(self.url, **headers)
+
+    def test_configured_token_is_accepted(self):
+        response = self.scrape("s3cret", TOKEN="s3cret")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        self.assertIn("# TYPE http_requests_total counter", response.content.decode())
+
+    def test_wrong_or_missing_token_is_rejected(self):
+        self.assertEqual(self.scrape("guess", TOKEN="s3cret").status_code, 403)
+        self.assertEqual(self.scrape(TOKEN="s3cret").status_code, 403)
+
+    def test_without_a_token_configured_only_superusers_are_served(self):
+        self.assertEqual(self.scrape(TOKEN=None).status_code, 403)
+        self.assertEqual(self.scrape("anything", TOKEN=None).status_code, 403)
+
+        create_plans()
+        self.client.force_login(User.objects.create_superuser("ops", "ops@example.com", "pw"))
+        self.assertEqual(self.scrape(TOKEN=None).status_code, 200)
+
+
+class PublicIDTests(TestCase):
+
+    def test_ids_grow_and_borrow_the_next_second(self):
+        clock = [PUBLIC_ID_EPOCH + 10.5]
+        generator = PublicIDGenerator(node=7, clock=lambda: clock[0])
+
+        ids = generator.next_ids(SEQUENCE_SIZE + 2)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids[0], "00000001007000")
+        # the second ran out of sequence numbers: the next one is borrowed
+        self.assertEqual(ids[-1], "00000001107001")
+
+        # the clock catches up with the borrowed second, ids keep growing
+        clock[0] += 1
+        self.assertGreater(generator.next_id(), ids[-1])
+
+    def test_fork_starts_a_new_node_and_clock(self):
+        generator = PublicIDGenerator(clock=lambda: PUBLIC_ID_EPOCH + 5)
+
+        with mock.patch("core.public_ids.os.getpid", return_value=4212):
+            parent = generator.next_id()
+        with mock.patch("core.public_ids.os.getpid", return_value=4213):
+            child = generator.next_id()
+
+        self.assertEqual((parent[9:11], parent[11:]), ("12", "000"))
+        self.assertEqual((child[9:11], child[11:]), ("13", "000"))
+
+    def test_save_retries_a_clashing_id(self):
+        create_plans()
+        user = create_tenant("ids")
+        first = create_product(user, "p1")
+
+        fresh = public_id_generator.next_id()
+        with mock.patch.object(public_id_generator, "next_id", side_effect=[first.public_id, fresh]):
+            second = create_product(user, "p2")
+
+        self.assertEqual(second.public_id, fresh)
+        self.assertEqual(ProductCatalog.objects.count(), 2)
+
+
+class CursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("pager")
+        for i in range(25):
+            create_product(cls.user, f"p{i:02}")
+
+    def setUp(self):
+        invalidate_plan_cache()
+        cache.clear()
+        self.client = jwt_client(self.user)
+
+    def walk(self, url):
+        pages = []
+        while url:
+            body = self.client.get(url).json()
+            pages.append(body)
+            url = body["next"]
+        return pages
+
+    def test_cursor_pages_cover_every_row_once(self):
+        pages = self.walk("/core/api/v1/product-catalog/?cursor=")
+
+        ids = [row["product_id"] for page in pages for row in page["results"]]
+        self.assertEqual([len(page["results"]) for page in pages], [10, 10, 5])
+        self.assertEqual(ids, [f"p{i:02}" for i in range(25)])
+        self.assertIsNone(pages[0]["previous"])
+
+    def test_previous_link_returns_the_page_before(self):
+        first, second = self.walk("/core/api/v1/product-catalog/?cursor=")[:2]
+
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual(back["results"], first["results"])
+        self.assertIsNotNone(back["next"])
+
+    def test_count_is_the_total_on_every_page(self):
+        pages = self.walk("/core/api/v1/product-catalog/?cursor=&count=exact")
+
+        self.assertEqual([page["count"] for page in pages], [25, 25, 25])
+        self.assertIsNone(self.client.get("/core/api/v1/product-catalog/?cursor=").json()["count"])
+
+    def test_invalid_cursor_and_count_are_rejected(self):
+        self.assertEqual(self.client.get("/core/api/v1/product-catalog/?cursor=nope").status_code, 400)
+        self.assertEqual(self.client.get("/core/api/v1/product-catalog/?cursor=&count=all").status_code, 400)
+
+
+class BulkEndpointTests(TestCase):
+    url = "/core/api/v1/product-catalog/bulk/"
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("bulk")
+
+    def setUp(self):
+        invalidate_plan_cache()
+        cache.clear()
+        usage_counter.reset(self.user.profile)
+        self.client = jwt_client(self.user)
+
+    def row(self, product_id, **fields):
+        return {
+            "product_id": product_id, "product_name": "Widget", "category": "tools",
+            "price": "2.00", "currency": "INR", "stock_count": 3, "product_rating": 4.0, **fields,
+        }
+
+    def records_used(self):
+        return UserProfile.objects.get(user=self.user).records_used
+
+    def test_create_patch_and_delete(self):
+        response = self.client.post(self.url, [self.row("a"), self.row("b"), self.row("c")], format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created"], 3)
+        self.assertEqual(self.records_used(), 3)
+
+        response = self.client.patch(self.url, [{"product_id": "a", "stock_count": 9}], format="json")
+        self.assertEqual(response.json(), {"updated": 1})
+        self.assertEqual(ProductCatalog.objects.get(product_id="a").stock_count, 9)
+
+        response = self.client.delete(self.url, ["a", {"product_id": "b"}, "zzz"], format="json")
+        self.assertEqual(response.json(), {"deleted": 2, "not_found": ["zzz"]})
+        self.assertEqual(self.records_used(), 1)
+        # BASE charges one call per 100 rows and request
+        self.assertEqual(usage_counter.backend.pending(self.user.profile.pk), 3)
+
+    def test_ndjson_upload(self):
+        body = "\n".join(json.dumps(self.row(f"n{i}")) for i in range(3)) + "\n"
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(ProductCatalog.objects.filter(created_by=self.user).count(), 3)
+
+    def test_invalid_rows_write_nothing(self):
+        create_product(self.user, "taken")
+        rows = [self.row("ok"), self.row("bad", price="x"), self.row("taken"), "nope", self.row("dup"), self.row("dup")]
+
+        response = self.client.post(self.url, rows, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["errors"]
+        self.assertEqual([error["index"] for error in errors], [1, 2, 3, 4, 5])
+        self.assertIn("price", errors[0]["errors"])
+        self.assertEqual(errors[1]["errors"], {"product_id": ["A row with this product_id already exists."]})
+        self.assertEqual(ProductCatalog.objects.filter(created_by=self.user).count(), 1)
+        self.assertEqual(self.records_used(), 1)
+        self.assertEqual(usage_counter.backend.pending(self.user.profile.pk), 0)
+
+    def test_non_scalar_keys_are_row_errors(self):
+        create_product(self.user, "a")
+
+        response = self.client.patch(self.url, [{"product_id": ["a"]}, {"product_id": {"k": 1}}, {"stock_count": 1}], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], [
+            {"index": 0, "errors": {"product_id": ["Expected a string or a number."]}},
+            {"index": 1, "errors": {"product_id": ["Expected a string or a number."]}},
+            {"index": 2, "errors": {"product_id": ["This field is required."]}},
+        ])
+
+        response = self.client.delete(self.url, [["a"], {"product_id": None}, "a"], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.json()["errors"]], [0, 1])
+        self.assertTrue(ProductCatalog.objects.filter(product_id="a").exists())
+
+    def test_plan_limits(self):
+        response = self.client.post(self.url, [self.row(f"r{i}") for i in range(1001)], format="json")
+        self.assertEqual(response.json()["error_code"], "BATCH_TOO_LARGE")
+
+        UserProfile.objects.filter(user=self.user).update(records_used=4999)
+        response = self.client.post(self.url, [self.row("x"), self.row("y")], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ProductCatalog.objects.filter(product_id="x").exists())
+
+        free = jwt_client(create_tenant("free-bulk", plan="FREE"))
+        response = free.post(self.url, [self.row("f")], format="json")
+        self.assertEqual((response.status_code, response.json()["error_code"]), (403, "BULK_NOT_ALLOWED"))
+
+    def test_quota_counts_rows(self):
+        Plan.objects.filter(name="BASE").update(monthly_api_limit=2)
+        invalidate_plan_cache()
+
+        response = self.client.post(self.url, [self.row(f"q{i}") for i in range(201)], format="json")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("3 API calls", response.json()["message"])
+
+
+class NDJSONParserTests(TestCase):
+
+    def parse(self, body):
+        return NDJSONParser().parse(io.BytesIO(body.encode()))
+
+    def test_one_value_per_line_blank_lines_skipped(self):
+        self.assertEqual(self.parse('{"a": 1}\n\n  \n{"a": 2}'), [{"a": 1}, {"a": 2}])
+
+    def test_error_names_the_line(self):
+        with self.assertRaisesMessage(ParseError, "line 2"):
+            self.parse('{"a": 1}\n{"a": \n')
+
+
+class QueryBudgetMethodTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("budget")
+
+    def setUp(self):
+        invalidate_plan_cache()
+        cache.clear()
+        self.client = jwt_client(self.user)
+
+    def test_read_budgets_do_not_cover_writes(self):
+        route = "core/api/v1/product-catalog/"
+        config = {"DEFAULT_BUDGET": 50, "ROUTES": {route: 4, f"POST {route}": 12}}
+
+        self.assertEqual(budget_for(route, config), 4)
+        self.assertEqual(budget_for(route, config, "HEAD"), 4)
+        self.assertEqual(budget_for(route, config, "POST"), 12)
+        self.assertIsNone(budget_for(route, config, "PATCH"))
+        self.assertIsNone(budget_for("core/other/", config, "DELETE"))
+        self.assertEqual(budget_for("core/other/", config), 50)
+
+    def test_write_within_its_own_budget_passes_with_raise(self):
+        obj = CustomObject.objects.create(tenant=self.user, name="Lead", api_name="lead")
+        CustomField.objects.create(custom_object=obj, name="Name", api_name="name", data_type="STRING")
+        CustomField.objects.create(custom_object=obj, name="Score", api_name="score", data_type="NUMBER")
+        route = "core/api/v1/objects/<str:api_name>/records/"
+
+        with override_settings(QUERY_BUDGETS={**settings.QUERY_BUDGETS, "RAISE": True}):
+            with assert_query_budget(route=route, method="POST") as inspector:
+                response = self.client.post("/core/api/v1/objects/lead/records/", {"name": "Ann", "score": 3}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        # more than the read budget of the route allows
+        self.assertGreater(inspector.count, budget_for(route))
+
+
+class SystemLogBufferTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("logger")
+
+    def make_buffer(self, **options):
+        # CoreTestRunner starts no flusher threads, the tests flush by hand
+        return SystemLogBuffer(**options)
+
+    def log(self, buffer, path="/core/api/v1/product-catalog/"):
+        return buffer.record(
+            user_id=self.user.pk, service_name="API", log_level="INFO", message="GET",
+            request_path=path, http_status=200, response_time_ms=5,
+        )
+
+    def test_full_buffer_drops_new_entries(self):
+        buffer = self.make_buffer(max_size=2)
+        self.addCleanup(buffer.clear)
+
+        self.assertEqual([self.log(buffer) for _ in range(3)], [True, True, False])
+        self.assertEqual((len(buffer), buffer.dropped), (2, 1))
+        self.assertFalse(buffer.record(
+            user_id=None, service_name="API", log_level="INFO", message="GET", request_path="/", http_status=200,
+        ))
+
+    def test_only_started_flushers_flush_at_exit(self):
+        flusher = BackgroundFlusher(mock.Mock(), 60, name="test-flusher")
+
+        with mock.patch("core.background.atexit.register") as register:
+            flusher.ensure_started()
+            self.assertFalse(register.called)
+
+            with mock.patch.object(BackgroundFlusher, "autostart", True):
+                self.addCleanup(flusher.stop)
+                flusher.ensure_started()
+                flusher._thread = None
+                flusher.ensure_started()
+
+        register.assert_called_once_with(flusher.stop)
+
+    def test_flush_writes_batches_with_the_request_time(self):
+        buffer = self.make_buffer(batch_size=2)
+        logged_at = datetime(2026, 1, 5, 10, 30, tzinfo=timezone.utc)
+        with mock.patch("core.log_buffer.now", return_value=logged_at):
+            for _ in range(5):
+                self.log(buffer)
+
+        with mock.patch.object(SystemLog.objects, "bulk_create", wraps=SystemLog.objects.bulk_create) as bulk_create:
+            self.assertEqual(buffer.flush(), 5)
+
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [2, 2, 1])
+        self.assertEqual((len(buffer), buffer.flushed), (0, 5))
+        self.assertEqual(set(SystemLog.objects.values_list("logged_at", flat=True)), {logged_at})
+
+    def test_public_id_clash_falls_back_to_row_inserts(self):
+        buffer = self.make_buffer()
+        for _ in range(2):
+            self.log(buffer)
+
+        with mock.patch.object(SystemLog.objects, "bulk_create", side_effect=IntegrityError("public_id")):
+            buffer.flush()
+
+        self.assertEqual((buffer.flushed, buffer.failed), (2, 0))
+        self.assertEqual(SystemLog.objects.count(), 2)
+
+
+class CustomRecordStorageTests(TestCase):
+    fields = (
+        ("first__name", "STRING", {"is_unique": True}),
+        ("score", "NUMBER"),
+        ("is__vip", "BOOLEAN"),
+    )
+    rows = [
+        {"first__name": "Ann", "score": 3, "is__vip": True},
+        {"first__name": "Bob", "score": 7, "is__vip": False},
+        {"first__name": "Cid", "score": 5},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("records")
+
+    def setUp(self):
+        invalidate_plan_cache()
+        cache.clear()
+        self.client = jwt_client(self.user)
+
+    def url(self, obj):
+        return f"/core/api/v1/objects/{obj.api_name}/records/"
+
+    def names(self, obj, query=""):
+        response = self.client.get(self.url(obj) + query)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(row.get("first__name") for row in response.json()["results"])
+
+    def test_double_underscore_api_names_in_both_engines(self):
+        for mode in CustomObject.StorageMode.values:
+            with self.subTest(mode=mode):
+                obj = create_custom_object(self.user, f"lead-{mode.lower()}", mode, self.fields)
+                self.assertEqual(self.client.post(self.url(obj), self.rows, format="json").status_code, 201)
+
+                self.assertEqual(self.names(obj), ["Ann", "Bob", "Cid"])
+                self.assertEqual(self.names(obj, "?filter[is__vip]=true"), ["Ann"])
+                self.assertEqual(self.names(obj, "?filter[is__vip][ne]=true"), ["Bob", "Cid"])
+                self.assertEqual(self.names(obj, "?filter[is__vip][isnull]=true"), ["Cid"])
+                self.assertEqual(self.names(obj, "?filter[first__name][startswith]=B"), ["Bob"])
+
+                response = self.client.post(self.url(obj), {"first__name": "Ann"}, format="json")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["errors"][0]["errors"], {"first__name": ["A record with this value already exists."]})
+
+    def test_convert_storage_keeps_the_values(self):
+        obj = create_custom_object(self.user, "lead", "EAV", self.fields)
+        self.client.post(self.url(obj), self.rows, format="json")
+        before = self.client.get(self.url(obj)).json()["results"]
+
+        self.assertEqual(convert_storage(obj, "DOCUMENT", batch_size=2), 3)
+        obj.refresh_from_db()
+        self.assertEqual(obj.storage_mode, "DOCUMENT")
+        self.assertFalse(CustomFieldValue.objects.filter(record__object_api_name="lead").exists())
+        self.assertEqual(self.client.get(self.url(obj)).json()["results"], before)
+
+        self.assertEqual(convert_storage(obj, "EAV"), 3)
+        self.assertEqual(CustomFieldValue.objects.filter(record__object_api_name="lead").count(), 8)
+        self.assertEqual(self.client.get(self.url(obj)).json()["results"], before)
+
+    def test_convert_command(self):
+        obj = create_custom_object(self.user, "lead", "EAV", self.fields)
+        self.client.post(self.url(obj), self.rows, format="json")
+        out = io.StringIO()
+
+        call_command("convert_custom_object_storage", self.user.pk, "lead", "--to", "DOCUMENT", stdout=out)
+
+        self.assertIn("3 record(s) now use DOCUMENT storage", out.getvalue())
+        self.assertEqual(CustomObject.objects.get(pk=obj.pk).storage_mode, "DOCUMENT")
+        with self.assertRaisesMessage(CommandError, "Custom object not found."):
+            call_command("convert_custom_object_storage", self.user.pk, "missing")
+
+
+class RecordFilterTests(TestCase):
+    fields = (
+        ("name", "STRING"),
+        ("score", "NUMBER"),
+        ("price", "DECIMAL"),
+        ("due", "DATE"),
+        ("active", "BOOLEAN"),
+        ("rank", "NUMBER", {"is_indexed": True}),
+    )
+    rows = [
+        {"name": "Alpha", "score": 1, "price": "1.50", "due": "2026-01-01", "active": True, "rank": 3},
+        {"name": "beta", "score": 5, "price": "10.00", "due": "2026-02-01", "active": False, "rank": 1},
+        {"name": "Gamma", "score": 9, "due": "2026-03-01", "rank": 2},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("filters")
+
+    def setUp(self):
+        invalidate_plan_cache()
+        cache.clear()
+        self.client = jwt_client(self.user)
+
+    def get(self, obj, query):
+        return self.client.get(f"/core/api/v1/objects/{obj.api_name}/records/{query}")
+
+    def names(self, obj, query, ordered=False):
+        response = self.get(obj, query)
+        self.assertEqual(response.status_code, 200, (query, response.content))
+        names = [row["name"] for row in response.json()["results"]]
+        return names if ordered else sorted(names)
+
+    def for_each_engine(self):
+        for mode in CustomObject.StorageMode.values:
+            with self.subTest(mode=mode):
+                obj = create_custom_object(self.user, f"deal-{mode.lower()}", mode, self.fields)
+                self.client.post(f"/core/api/v1/objects/{obj.api_name}/records/", self.rows, format="json")
+                yield obj
+
+    def test_operators(self):
+        cases = {
+            "?filter[score]=5": ["beta"],
+            "?filter[score][ne]=5": ["Alpha", "Gamma"],
+            "?filter[score][gt]=1": ["Gamma", "beta"],
+            "?filter[score][gte]=5": ["Gamma", "beta"],
+            "?filter[score][lt]=5": ["Alpha"],
+            "?filter[score][lte]=5": ["Alpha", "beta"],
+            "?filter[score][in]=1,9": ["Alpha", "Gamma"],
+            "?filter[price][gt]=2": ["beta"],
+            "?filter[price][isnull]=true": ["Gamma"],
+            "?filter[price][isnull]=false": ["Alpha", "beta"],
+            "?filter[due][gte]=2026-02-01": ["Gamma", "beta"],
+            "?filter[name][in]=Alpha,Gamma": ["Alpha", "Gamma"],
+            "?filter[name][contains]=eta": ["beta"],
+            "?filter[name][icontains]=ALP": ["Alpha"],
+            "?filter[name][startswith]=G": ["Gamma"],
+            "?filter[active]=false": ["beta"],
+            "?filter[active][ne]=true": ["Gamma", "beta"],
+            "?filter[active][isnull]=true": ["Gamma"],
+            "?filter[score][gt]=1&filter[due][lt]=2026-03-01": ["beta"],
+        }
+        for obj in self.for_each_engine():
+            for query, expected in cases.items():
+                self.assertEqual(self.names(obj, query), expected, query)
+
+    def test_invalid_filters_are_rejected(self):
+        too_many = ",".join(str(i) for i in range(101))
+        for obj in self.for_each_engine():
+            for query in (
+                "?filter[missing]=1",
+                "?filter[score][like]=1",
+                "?filter[score][contains]=1",
+                "?filter[score]=abc",
+                f"?filter[score][in]={too_many}",
+                "?sort=missing",
+            ):
+                self.assertEqual(self.get(obj, query).status_code, 400, query)
+
+    def test_sorting(self):
+        for obj in self.for_each_engine():
+            self.assertEqual(self.names(obj, "?sort=-score", ordered=True), ["Gamma", "beta", "Alpha"])
+            # records without a value come last either way
+            self.assertEqual(self.names(obj, "?sort=price", ordered=True), ["Alpha", "beta", "Gamma"])
+            self.assertEqual(self.names(obj, "?sort=-price", ordered=True), ["beta", "Alpha", "Gamma"])
+            self.assertEqual(self.names(obj, "?sort=rank&filter[score][gt]=1", ordered=True), ["beta", "Gamma"])
+
+    def test_reads_stay_within_the_route_budget(self):
+        route = "core/api/v1/objects/<str:api_name>/records/"
+
+        with override_settings(QUERY_BUDGETS={**settings.QUERY_BUDGETS, "RAISE": True}):
+            for obj in self.for_each_engine():
+                for query in ("", "?sort=score", "?sort=-rank", "?sort=score&filter[score][gt]=1"):
+                    with assert_query_budget(route=route):
+                        self.assertEqual(self.get(obj, query).status_code, 200, query)
+
+    def test_unindexed_sort_of_a_large_object_is_too_expensive(self):
+        limits = {**PLAN_CUSTOM_OBJECT_LIMITS["BASE"], "max_unindexed_sort_records": 2}
+
+        with mock.patch.dict(PLAN_CUSTOM_OBJECT_LIMITS, {"BASE": limits}):
+            for obj in self.for_each_engine():
+                response = self.get(obj, "?sort=score")
+                self.assertEqual((response.status_code, response.json()["error_code"]), (400, "QUERY_TOO_EXPENSIVE"))
+                # indexed fields and created_at stay sortable
+                self.assertEqual(self.names(obj, "?sort=rank", ordered=True), ["beta", "Gamma", "Alpha"])
+                self.assertEqual(self.get(obj, "?sort=-created_at").status_code, 200)
+
+
+class FieldIndexJobTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("indexes")
+
+    def setUp(self):
+        invalidate_plan_cache()
+        cache.clear()
+        # index jobs are only queued on Postgres
+        patcher = mock.patch("core.tasks.connection", mock.Mock(vendor="postgresql"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def queued(self):
+        jobs = Job.objects.filter(name__in=["core.sync_field_indexes", "core.drop_field_index"]).order_by("created_at", "id")
+        rows = [(job_row.name, job_row.payload.get("api_name")) for job_row in jobs]
+        jobs.delete()
+        return rows
+
+    def test_only_index_changes_queue_jobs(self):
+        obj = create_custom_object(self.user, "accounts", fields=[("name", "STRING")])
+        self.assertEqual(self.queued(), [])
+
+        rank = CustomField.objects.create(custom_object=obj, name="Rank", api_name="rank", data_type="NUMBER", is_indexed=True)
+        self.assertEqual(self.queued(), [("core.sync_field_indexes", None)])
+
+        rank.name = "Position"
+        rank.is_required = True
+        rank.save()
+        self.assertEqual(self.queued(), [])
+
+        rank.api_name = "position"
+        rank.save()
+        self.assertEqual(self.queued(), [("core.drop_field_index", "rank"), ("core.sync_field_indexes", None)])
+
+        name = obj.fields.get(api_name="name")
+        name.is_indexed = True
+        name.save()
+        self.assertEqual(self.queued(), [("core.sync_field_indexes", None)])
+
+        rank.delete()
+        self.assertEqual(self.queued(), [("core.drop_field_index", "position")])
+
+    def test_jobs_run_the_index_ddl(self):
+        obj = create_custom_object(self.user, "tickets", fields=[("due", "DATE", {"is_indexed": True})])
+        obj.fields.get().delete()
+
+        with mock.patch("core.tasks.sync_field_indexes") as sync, mock.patch("core.tasks.drop_field_index") as drop:
+            self.assertEqual(work_once(), 2)
+
+        self.assertEqual(sync.call_args.args[0].pk, obj.pk)
+        drop.assert_called_once_with(str(obj.pk), "due", "DATE")
+
+    def test_indexed_fields_are_capped_by_the_plan(self):
+        obj = create_custom_object(self.user, "orders", fields=[("total", "DECIMAL", {"is_indexed": True})])
+        url = f"/core/api/v1/objects/{obj.api_name}/fields/"
+        client = jwt_client(self.user)
+        limits = {**PLAN_CUSTOM_OBJECT_LIMITS["BASE"], "max_indexed_fields_per_object": 1}
+
+        with mock.patch.dict(PLAN_CUSTOM_OBJECT_LIMITS, {"BASE": limits}):
+            response = client.post(url, {"name": "Due", "api_name": "due", "data_type": "DATE", "is_indexed": True}, format="json")
+            self.assertEqual((response.status_code, response.json()["error_code"]), (400, "INDEX_LIMIT_EXCEEDED"))
+
+            response = client.post(url, {"name": "Due", "api_name": "due", "data_type": "DATE"}, format="json")
+            self.assertEqual(response.status_code, 201, response.content)
+
+        self.assertEqual(list(obj.fields.filter(is_indexed=True).values_list("api_name", flat=True)), ["total"])
+
+
+class StreamingExportTests(TestCase):
+    url = "/core/api/v1/product-catalog/"
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("exporter")
+        for i in range(3):
+            create_product(cls.user, f"e{i}", category="tools" if i else "toys", price=f"{i}.25")
+
+    def setUp(self):
+        invalidate_plan_cache()
+        cache.clear()
+        usage_counter.reset(self.user.profile)
+        self.client = jwt_client(self.user)
+
+    def body(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_streams_every_row_in_order(self):
+        response = self.client.get(f"{self.url}?format=ndjson")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn('filename="product-catalog-', response["Content-Disposition"])
+        rows = [json.loads(line) for line in self.body(response).splitlines()]
+        self.assertEqual([row["product_id"] for row in rows], ["e0", "e1", "e2"])
+        self.assertEqual(rows[1]["price"], "1.25")
+        self.assertEqual(set(rows[0]), set(ProductCatalogSerializer().fields))
+
+    def test_csv_has_a_header_and_honours_filters_and_fields(self):
+        response = self.client.get(f"{self.url}?format=csv&category=tools&fields=product_id,price")
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(self.body(response).splitlines(), ["product_id,price", "e1,1.25", "e2,2.25"])
+
+    def test_export_needs_bulk_operations(self):
+        free = jwt_client(create_tenant("free-exporter", plan="FREE"))
+
+        response = free.get(f"{self.url}?format=csv")
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.streaming)
+
+    def test_export_counts_as_one_call(self):
+        self.body(self.client.get(f"{self.url}?format=ndjson"))
+        self.assertEqual(usage_counter.backend.pending(self.user.profile.pk), 1)
+
+        self.client.get(self.url)
+        self.assertEqual(usage_counter.backend.pending(self.user.profile.pk), 2)
+
+
+class ProductTimestampsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductCatalog
+        fields = ["product_id", "price", "product_rating", "created_at", "deleted_at"]
+
+
+class FastRowSerializerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("fast")
+
+        create_product(cls.user, "cheap", price="0.10", product_rating=0.1)
+        create_product(cls.user, "round", price="5", product_rating=3.0, in_stock=False)
+        create_product(cls.user, "large", price="12345678.90", product_rating=4.999)
+        ProductCatalog.objects.filter(product_id="large").update(
+            deleted_at=datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        )
+
+        for order_id, amount, day, discount in (("o1", "0.01", 1, 0.0), ("o2", "999.5", 28, 12.5)):
+            OrderTransaction.objects.create(
+                created_by=cls.user, order_id=order_id, order_amount=amount, payment_method="UPI",
+                payment_status="SUCCESS", transaction_reference=f"ref-{order_id}", is_refundable=day > 1,
+                order_date=datetime(2026, 2, day).date(), discount_applied=discount,
+            )
+
+    def assertSameJSON(self, serializer_class, queryset):
+        fast = get_fast_serializer(serializer_class)
+        self.assertIsNotNone(fast)
+
+        queryset = queryset.order_by("pk")
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(fast.rows(queryset.values_list(*fast.sources))), expected)
+        self.assertEqual(JSONRenderer().render(fast.rows(queryset.values(*fast.sources))), expected)
+
+    def test_product_catalog(self):
+        self.assertSameJSON(ProductCatalogSerializer, ProductCatalog.all_objects.all())
+
+    def test_order_transaction(self):
+        self.assertSameJSON(OrderTransactionSerializer, OrderTransaction.objects.all())
+
+    def test_datetimes_and_nulls(self):
+        self.assertSameJSON(ProductTimestampsSerializer, ProductCatalog.all_objects.all())
+
+    def test_only_restricts_the_fields(self):
+        fast = get_fast_serializer(ProductCatalogSerializer, frozenset({"price", "product_id"}))
+        [row] = fast.rows(ProductCatalog.objects.filter(product_id="round").values_list(*fast.sources))
+        self.assertEqual(row, {"product_id": "round", "price": "5.00"})
+
+
+class SparseFieldsTests(TestCase):
+    url = "/core/api/v1/product-catalog/"
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("sparse")
+        create_product(cls.user, "s1", price="3.50")
+
+    def setUp(self):
+        invalidate_plan_cache()
+        cache.clear()
+        self.client = jwt_client(self.user)
+
+    def page_select(self, query):
+        """Results and the SQL of the page query of GET `query`."""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        [sql] = [
+            q["sql"] for q in captured.captured_queries
+            if q["sql"].startswith("SELECT") and "core_productcatalog" in q["sql"] and "COUNT(" not in q["sql"]
+        ]
+        return response.json()["results"], sql
+
+    def test_fields_limit_the_output_and_the_select(self):
+        for query in ("?fields=product_id,price", "?cursor=&fields=product_id,price"):
+            with self.subTest(query=query):
+                [row], sql = self.page_select(query)
+
+                self.assertEqual(row, {"product_id": "s1", "price": "3.50"})
+                self.assertIn('"price"', sql)
+                self.assertNotIn('"product_name"', sql)
+                self.assertNotIn('"stock_count"', sql)
+
+    def test_all_fields_without_the_parameter(self):
+        [row], sql = self.page_select("")
+
+        self.assertEqual(set(row), set(ProductCatalogSerializer().fields))
+        self.assertIn('"product_name"', sql)
+
+    def test_unknown_fields_are_rejected(self):
+        for query in ("?fields=price,secret", "?fields=,", "?format=csv&fields=created_by"):
+            with self.subTest(query=query):
+                response = self.client.get(self.url + query)
+                self.assertEqual(response.status_code, 400)
+
+        self.assertIn("Unknown field(s): secret", self.client.get(self.url + "?fields=price,secret").json()["fields"][0])
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.responses = ResponseCache(wait_ms=500, poll_ms=5, key_prefix="test-response")
+        self.computed = 0
+
+    def compute(self, status=200):
+        self.computed += 1
+        return Response({"n": self.computed}, status=status)
+
+    def test_miss_then_hit(self):
+        first = self.responses.get_or_compute('"v1"', self.compute)
+        second = self.responses.get_or_compute('"v1"', self.compute)
+
+        self.assertEqual((first["X-Cache"], second["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(second.data, {"n": 1})
+        self.assertEqual(self.computed, 1)
+        self.assertIsNone(cache.get("test-response:v1:lock"))
+
+        self.responses.get_or_compute('"v2"', self.compute)
+        self.assertEqual(self.computed, 2)
+
+    def test_errors_are_not_cached(self):
+        self.responses.get_or_compute('"v1"', lambda: self.compute(status=400))
+        self.responses.get_or_compute('"v1"', self.compute)
+        self.assertEqual(self.computed, 2)
+
+    def test_concurrent_miss_waits_for_the_lock_holder(self):
+        cache.add("test-response:v1:lock", 1)
+        timer = threading.Timer(0.05, cache.set, ["test-response:v1", {"n": "holder"}])
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        response = self.responses.get_or_compute('"v1"', self.compute)
+
+        self.assertEqual((response["X-Cache"], response.data), ("HIT", {"n": "holder"}))
+        self.assertEqual(self.computed, 0)
+
+    def test_lock_timeout_falls_back_to_computing(self):
+        cache.add("test-response:v1:lock", 1)
+        self.responses.wait = 0.02
+
+        response = self.responses.get_or_compute('"v1"', self.compute)
+
+        self.assertEqual((response["X-Cache"], self.computed), ("MISS", 1))
+        # the lock belongs to the other request
+        self.assertEqual(cache.get("test-response:v1:lock"), 1)
+
+
+class CachedListTests(TestCase):
+    url = "/core/api/v1/product-catalog/"
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("cached")
+        create_product(cls.user, "c1")
+
+    def setUp(self):
+        invalidate_plan_cache()
+        cache.clear()
+        usage_counter.reset(self.user.profile)
+        self.client = jwt_client(self.user)
+
+    def test_hits_are_charged_and_writes_invalidate(self):
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+        hit = self.client.get(self.url)
+        self.assertEqual(hit["X-Cache"], "HIT")
+        self.assertEqual(hit.json()["count"], 1)
+        self.assertEqual(usage_counter.backend.pending(self.user.profile.pk), 2)
+
+        create_product(self.user, "c2")
+        miss = self.client.get(self.url)
+        self.assertEqual((miss["X-Cache"], miss.json()["count"]), ("MISS", 2))
+
+    def test_entries_are_per_query_string(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(f"{self.url}?category=tools")["X-Cache"], "MISS")
+
+
+class FakeRedis:
+    """The hash commands RedisUsageBackend uses, on a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    def hincrby(self, key, field, amount):
+        fields = self.data.setdefault(key, {})
+        fields[str(field).encode()] = fields.get(str(field).encode(), 0) + amount
+        return fields[str(field).encode()]
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(str(field).encode())
+
+    def hdel(self, key, field):
+        self.data.get(key, {}).pop(str(field).encode(), None)
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def rename(self, key, new_key):
+        if key not in self.data:
+            raise KeyError("no such key")
+        self.data[new_key] = self.data.pop(key)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class APIUsageCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.profiles = [create_tenant(f"usage-{i}").profile for i in range(2)]
+
+    def setUp(self):
+        self.counter = APIUsageCounter(LocalUsageBackend(), slack=100)
+
+    def used_in_db(self):
+        return list(UserProfile.objects.filter(pk__in=[p.pk for p in self.profiles]).order_by("pk").values_list("api_calls_used", flat=True))
+
+    def test_flush_writes_every_tenant_in_one_update(self):
+        first, second = self.profiles
+        self.counter.increment(first, 3)
+        self.counter.increment(second)
+        self.counter.increment(first)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.counter.flush(), 2)
+
+        self.assertEqual(self.used_in_db(), [4, 1])
+        self.assertEqual(self.counter.backend.drain(), {})
+
+    def test_failed_flush_puts_the_calls_back(self):
+        first, _ = self.profiles
+        self.counter.increment(first, 2)
+
+        with mock.patch.object(UserProfile.objects, "filter", side_effect=DatabaseError("down")):
+            with self.assertRaises(DatabaseError):
+                self.counter.flush()
+        self.counter.increment(first)
+
+        self.assertEqual(self.counter.backend.pending(first.pk), 3)
+        self.counter.flush()
+        self.assertEqual(self.used_in_db()[0], 3)
+
+    def test_has_quota_counts_pending_calls(self):
+        first, _ = self.profiles
+        first.api_calls_used = 7
+
+        self.counter.increment(first, 2)
+        self.assertEqual(self.counter.used(first), 9)
+        self.assertTrue(self.counter.has_quota(first, 10))
+        self.assertFalse(self.counter.has_quota(first, 10, amount=2))
+
+        self.counter.reset(first)
+        self.assertTrue(self.counter.has_quota(first, 10, amount=3))
+
+    def test_redis_backend_drains_atomically(self):
+        backend = RedisUsageBackend(FakeRedis(), key_prefix="test-usage")
+        self.assertEqual(backend.drain(), {})
+
+        backend.incr(7, 2)
+        backend.incr(7)
+        backend.incr(9, 5)
+        self.assertEqual(backend.pending(7), 3)
+
+        self.assertEqual(backend.drain(), {7: 3, 9: 5})
+        self.assertEqual(backend.client.data, {})
+        self.assertEqual(backend.pending(7), 0)
+
+    def test_redis_drain_lost_to_another_worker_is_empty(self):
+        backend = RedisUsageBackend(FakeRedis(), key_prefix="test-usage")
+        backend.incr(7)
+
+        with mock.patch.object(backend.client, "rename", side_effect=RuntimeError("ERR no such key")):
+            self.assertEqual(backend.drain(), {})
+
+
+class RecordsUsedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("counted")
+        cls.other = create_tenant("counted-other")
+
+    def records_used(self, user=None):
+        return UserProfile.objects.get(user=user or self.user).records_used
+
+    def test_soft_delete_and_restore(self):
+        product = create_product(self.user, "a")
+        create_product(self.user, "b")
+        self.assertEqual(self.records_used(), 2)
+
+        product.delete()
+        product.delete()  # already deleted: not counted twice
+        self.assertEqual(self.records_used(), 1)
+
+        product.restore()
+        self.assertEqual(self.records_used(), 2)
+
+        ProductCatalog.objects.filter(created_by=self.user).delete()
+        self.assertEqual(self.records_used(), 0)
+
+    def test_bulk_create_counts_per_owner(self):
+        ProductCatalog.objects.bulk_create([
+            ProductCatalog(created_by=owner, product_id=f"p{i}", product_name="W", category="c",
+                           price="1.00", currency="INR", stock_count=1, product_rating=1.0)
+            for i, owner in enumerate([self.user, self.user, self.other])
+        ])
+
+        self.assertEqual((self.records_used(), self.records_used(self.other)), (2, 1))
+
+    def test_hard_delete_gives_the_quota_back_through_post_delete(self):
+        alive = create_product(self.user, "alive")
+        deleted = create_product(self.user, "gone")
+        deleted.delete()
+        self.assertEqual(self.records_used(), 1)
+
+        # a soft-deleted row was already released, only the alive one counts
+        ProductCatalog.all_objects.filter(pk__in=[alive.pk, deleted.pk]).hard_delete()
+        self.assertEqual(self.records_used(), 0)
+
+    def test_reconcile_fixes_drift(self):
+        create_product(self.user, "a")
+        UserProfile.objects.filter(user=self.user).update(records_used=40)
+        UserProfile.objects.filter(user=self.other).update(records_used=-1)
+
+        self.assertEqual(len(reconcile_records_used(dry_run=True)), 2)
+        self.assertEqual(self.records_used(), 40)
+
+        drifted = reconcile_records_used(user_ids=[self.user.pk])
+        self.assertEqual([(stored, actual) for _, stored, actual in drifted], [(40, 1)])
+        self.assertEqual((self.records_used(), self.records_used(self.other)), (1, -1))
+
+        out = io.StringIO()
+        call_command("reconcile_record_counts", stdout=out)
+        self.assertIn("Fixed 1 drifted profile(s).", out.getvalue())
+        self.assertEqual(self.records_used(self.other), 0)
+
+
+class ProductSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("searcher")
+        for product_id, name in [
+            ("p1", "Cordless Drill Kit"), ("p2", "drill"), ("p3", "Hammer"), ("p4", "Drill Bits"),
+        ]:
+            create_product(cls.user, product_id, product_name=name)
+
+    def search(self, term):
+        return search_products(ProductCatalog.objects.filter(created_by=self.user), term)
+
+    def test_exact_then_prefix_then_substring(self):
+        results = self.search("  Drill ")
+
+        self.assertEqual([p.product_id for p in results], ["p2", "p4", "p1"])
+        if connection.vendor != "postgresql":
+            self.assertEqual([p.search_rank for p in results], [1.0, 0.5, 0.1])
+
+    def test_blank_term_leaves_the_queryset(self):
+        self.assertEqual(self.search("   ").count(), 4)
+        self.assertFalse(self.search("saw").exists())
+
+    def test_search_parameter_on_the_list(self):
+        invalidate_plan_cache()
+        cache.clear()
+        response = jwt_client(self.user).get("/core/api/v1/product-catalog/?search=drill")
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual({row["product_id"] for row in response.json()["results"]}, {"p1", "p2", "p4"})
+
+
+class CustomSchemaCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_plans()
+        cls.user = create_tenant("schemas")
+
+    def setUp(self):
+        self.obj = create_custom_object(self.user, "leads", fields=[("email", "EMAIL"), ("score", "NUMBER")])
+        self.addCleanup(invalidate_schema, self.obj)
+
+    def reload(self):
+        return CustomObject.objects.get(pk=self.obj.pk)
+
+    def cache_as_another_process(self, schema):
+        # invalidate_schema only clears this process: put the old schema back
+        _schemas[(schema.tenant_id, schema.api_name)] = schema
+
+    def test_schema_is_compiled_once_per_version(self):
+        schema = get_schema(self.obj)
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_schema(self.obj), schema)
+        self.assertEqual(list(schema.by_name), ["email", "score"])
+
+    def test_field_save_bumps_the_version_and_rebuilds(self):
+        old = get_schema(self.obj)
+        field = self.obj.fields.get(api_name="score")
+        field.is_required = True
+        field.save()
+        self.cache_as_another_process(old)
+
+        obj = self.reload()
+        schema = get_schema(obj)
+
+        self.assertEqual(obj.schema_version, old.version + 1)
+        self.assertIsNot(schema, old)
+        self.assertEqual(schema.version, obj.schema_version)
+        self.assertEqual(schema.required, {"score"})
+        self.assertEqual(schema.clean({"email": "a@b.co"})[1], {"score": ["This field is required."]})
+
+    def test_field_delete_bumps_the_version_and_rebuilds(self):
+        old = get_schema(self.obj)
+        self.obj.fields.get(api_name="email").delete()
+        self.cache_as_another_process(old)
+
+        obj = self.reload()
+        schema = get_schema(obj)
+
+        self.assertEqual(obj.schema_version, old.version + 1)
+        self.assertEqual(list(schema.by_name), ["score"])
+        self.assertEqual(schema.clean({"email": "not an email", "score": "3"}), ({"score": 3}, {}))
+
+    def test_recreated_object_does_not_reuse_the_old_schema(self):
+        old = get_schema(self.obj)
+        self.obj.delete()
+
+        # as many fields as before: the version starts over at the same number
+        obj = create_custom_object(self.user, "leads", fields=[("email", "STRING"), ("phone", "STRING")])
+        self.addCleanup(invalidate_schema, obj)
+        self.assertEqual(obj.schema_version, old.version)
+        self.cache_as_another_process(old)
+
+        schema = get_schema(obj)
+        self.assertEqual((schema.object_id, list(schema.by_name)), (obj.pk, ["email", "phone"]))
+        self.assertEqual(schema.clean({"email": "not an email"}), ({"email": "not an email"}, {}))
+
+
+class CompiledFieldTests(TestCase):
+
+    def field(self, data_type):
+        return CompiledField(CustomField(name=data_type, api_name=data_type.lower(), data_type=data_type))
+
+    def assertInvalid(self, field, raw):
+        with self.assertRaises(ValidationError, msg=repr(raw)):
+            field.clean(raw)
+
+    def test_numbers_are_whole_and_64_bit(self):
+        number = self.field("NUMBER")
+
+        for raw, value in [(3, 3), ("42", 42), (" -7 ", -7), (2.0, 2), ("5.0", 5), (2 ** 63 - 1, 2 ** 63 - 1), (-2 ** 63, -2 ** 63)]:
+            self.assertEqual(number.clean(raw), value)
+
+        for raw in (1.9, "1.9", 2 ** 63, str(2 ** 63), -2 ** 63 - 1, 1e20, float("inf"), float("nan"), "NaN", "abc", True, [1]):
+            self.assertInvalid(number, raw)
+
+    def test_booleans_reject_unknown_values(self):
+        boolean = self.field("BOOLEAN")
+
+        for raw in (True, 1, "1", "on", "true", "yes"):
+            self.assertIs(boolean.clean(raw), True)
+        for raw in (False, 0, "0", "off", "false", "no"):
+            self.assertIs(boolean.clean(raw), False)
+
+        for raw in ("maybe", "nope", [], {}, 2):
+            self.assertInvalid(boolean, raw)
@@ -1,6 +1,16 @@
 from rest_framework.throttling import BaseThrottle
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
+from core.metrics import Counter
+from core.usage import usage_counter
+from core.tenancy import get_tenant
+
+
+THROTTLE_DECISIONS = Counter(
+    "api_throttle_decisions_total",
+    "PlanBasedUserThrottle decisions by plan and decision (allowed, throttled).",
+    ["plan", "decision"],
+)
 
 class PlanBasedUserThrottle(BaseThrottle):
     """
@@ -11,15 +21,24 @@ class PlanBasedUserThrottle(BaseThrottle):
         user = request.user
 
         if not user.is_authenticated:
+            THROTTLE_DECISIONS.inc(plan="", decision="throttled")
             return False
 
         if user.is_superuser:
+            THROTTLE_DECISIONS.inc(plan="superuser", decision="allowed")
             return True
 
-        profile = getattr(user, "profile", None)
-        if not profile or not profile.plan:
+        tenant = get_tenant(request)
+        profile = tenant.profile
+        if not profile or not tenant.plan:
+            THROTTLE_DECISIONS.inc(plan="", decision="throttled")
             return False
 
+        allowed = self.has_quota(tenant, profile)
+        THROTTLE_DECISIONS.inc(plan=tenant.plan.name, decision="allowed" if allowed else "throttled")
+        return allowed
+
+    def has_quota(self, tenant, profile):
         now = timezone.now()
 
         # 🔁 Reset monthly quota window
@@ -27,9 +46,10 @@ class PlanBasedUserThrottle(BaseThrottle):
             profile.api_calls_used = 0
             profile.api_reset_at = now + relativedelta(months=1)
             profile.save(update_fields=["api_calls_used", "api_reset_at"])
+            usage_counter.reset(profile)
 
-        # ❌ Do NOT increment here
-        if profile.api_calls_used >= profile.plan.monthly_api_limit:
+        # ❌ Do NOT increment here (persisted + pending calls, no UPDATE)
+        if not usage_counter.has_quota(profile, tenant.plan.monthly_api_limit):
             return False
 
         return True
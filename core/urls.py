@@ -32,8 +32,10 @@ urlpatterns = [
     "api/v1/product-catalog/create/",
     views.ProductCatalogCreateAPIView.as_view(),
 ),
+    path("api/v1/product-catalog/bulk/", views.ProductCatalogBulkAPIView.as_view(), name="product_catalog_bulk_api"),
     
     path('api/v1/order-transaction/', views.OrderTransactionAPIView.as_view(), name="order_transaction_api_view"),
+    path("api/v1/order-transaction/bulk/", views.OrderTransactionBulkAPIView.as_view(), name="order_transaction_bulk_api"),
     path('v1/order-transaction/', views.order_transaction_list_view, name="order_transaction_list_view"),
     
     path("account/api-tokens/", views.api_tokens_view, name="api_tokens"),
@@ -42,6 +44,7 @@ urlpatterns = [
     path("api/v1/objects/", views.CustomObjectCreateAPIView.as_view()),
     path("api/v1/objects/<str:api_name>/", views.CustomObjectDetailAPIView.as_view()),
     path("api/v1/objects/<str:api_name>/fields/", views.CustomFieldCreateAPIView.as_view()),
+    path("api/v1/objects/<str:api_name>/records/", views.CustomObjectRecordAPIView.as_view(), name="custom_object_records_api"),
     
     # Custom Objects
     path("v1/custom-objects/", views.custom_object_list_view, name="custom_object_list"),
@@ -62,5 +65,8 @@ urlpatterns = [
         name="custom_record_create",
     ),
     
+    path("api/v1/usage/", views.UsageAPIView.as_view(), name="usage_api_view"),
+    path("api/v1/internal/latency/", views.LatencyMetricsAPIView.as_view(), name="latency_metrics_api_view"),
+
     path("api/v1/api-endpoints/details/", views.api_endpoint_list_view, name="api_endpoint_list_view"),
 ]
\ No newline at end of file
@@ -1,6 +1,253 @@
-from django.db.models import F
+import threading
+import uuid
 
-def increment_api_usage(user):
-    user.profile.__class__.objects.filter(
-        pk=user.profile.pk
-    ).update(api_calls_used=F("api_calls_used") + 1)
\ No newline at end of file
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.utils.module_loading import import_string
+
+from core.background import BackgroundFlusher
+from core.plan_limits import QUOTA_MODELS, QUOTA_MODEL_OWNERSHIP
+
+
+DEFAULT_API_USAGE_COUNTER = {
+    "BACKEND": "local",          # local | redis
+    "FLUSH_INTERVAL_MS": 5000,
+    "SLACK": 50,                 # pending calls per tenant before an early flush
+    "REDIS_URL": None,
+    "CLIENT_FACTORY": None,      # dotted path returning a Redis-protocol client
+    "KEY_PREFIX": "api-usage",
+}
+
+
+class LocalUsageBackend:
+    """
+    Pending API call deltas kept in this process only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def incr(self, profile_id, amount=1):
+        with self._lock:
+            value = self._pending.get(profile_id, 0) + amount
+            self._pending[profile_id] = value
+            return value
+
+    def pending(self, profile_id):
+        return self._pending.get(profile_id, 0)
+
+    def discard(self, profile_id):
+        with self._lock:
+            self._pending.pop(profile_id, None)
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+
+class RedisUsageBackend:
+    """
+    Pending API call deltas shared by every worker through a Redis hash.
+    Any client speaking the Redis protocol works (redis-py, fakeredis, ...).
+    """
+
+    def __init__(self, client, key_prefix="api-usage"):
+        self.client = client
+        self.key = f"{key_prefix}:pending"
+        self.key_prefix = key_prefix
+
+    def incr(self, profile_id, amount=1):
+        return int(self.client.hincrby(self.key, profile_id, amount))
+
+    def pending(self, profile_id):
+        return int(self.client.hget(self.key, profile_id) or 0)
+
+    def discard(self, profile_id):
+        self.client.hdel(self.key, profile_id)
+
+    def drain(self):
+        # RENAME is atomic: increments landing after it start a fresh hash,
+        # so a delta is either drained here or left for the next flush.
+        flushing_key = f"{self.key_prefix}:flushing:{uuid.uuid4().hex}"
+
+        if not self.client.exists(self.key):
+            return {}
+
+        try:
+            self.client.rename(self.key, flushing_key)
+        except Exception:
+            # another worker drained the hash between EXISTS and RENAME
+            return {}
+
+        raw = self.client.hgetall(flushing_key)
+        self.client.delete(flushing_key)
+
+        return {int(pid): int(delta) for pid, delta in raw.items()}
+
+
+def build_backend(config):
+    if config["BACKEND"] == "local":
+        return LocalUsageBackend()
+
+    if config["BACKEND"] == "redis":
+        if config["CLIENT_FACTORY"]:
+            client = import_string(config["CLIENT_FACTORY"])()
+        else:
+            import redis
+            client = redis.Redis.from_url(config["REDIS_URL"])
+        return RedisUsageBackend(client, key_prefix=config["KEY_PREFIX"])
+
+    raise ValueError(f"Unknown API usage backend: {config['BACKEND']}")
+
+
+class APIUsageCounter:
+    """
+    Counts API calls in memory (or Redis) and writes aggregated deltas
+    behind to UserProfile.api_calls_used.
+
+    The effective usage of a tenant is the persisted column plus whatever is
+    still pending in the backend. Deltas are removed from the backend before
+    they are added to the row, so a crash can lose at most one interval of
+    calls but never counts a call twice.
+    """
+
+    def __init__(self, backend, flush_interval_ms=5000, slack=50):
+        self.backend = backend
+        self.slack = slack
+        self._flusher = BackgroundFlusher(
+            self.flush,
+            flush_interval_ms / 1000,
+            name="api-usage-counter",
+        )
+
+    @classmethod
+    def from_settings(cls):
+        config = {**DEFAULT_API_USAGE_COUNTER, **getattr(settings, "API_USAGE_COUNTER", {})}
+        return cls(
+            build_backend(config),
+            flush_interval_ms=config["FLUSH_INTERVAL_MS"],
+            slack=config["SLACK"],
+        )
+
+    def used(self, profile):
+        return profile.api_calls_used + self.backend.pending(profile.pk)
+
+    def has_quota(self, profile, limit, amount=1):
+        return self.used(profile) + amount <= limit
+
+    def increment(self, profile, amount=1):
+        pending = self.backend.incr(profile.pk, amount)
+        self._flusher.ensure_started()
+
+        if pending >= self.slack:
+            self._flusher.wake()
+
+    def reset(self, profile):
+        """Drop pending calls of a tenant whose monthly window just rolled over."""
+        self.backend.discard(profile.pk)
+
+    def flush(self):
+        deltas = {pid: delta for pid, delta in self.backend.drain().items() if delta}
+        if not deltas:
+            return 0
+
+        UserProfile = apps.get_model("core", "UserProfile")
+
+        try:
+            UserProfile.objects.filter(pk__in=deltas).update(
+                api_calls_used=F("api_calls_used") + Case(
+                    *[When(pk=pid, then=Value(delta)) for pid, delta in deltas.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+        except Exception:
+            # put the calls back so the next flush retries them
+            for pid, delta in deltas.items():
+                self.backend.incr(pid, delta)
+            raise
+
+        return len(deltas)
+
+
+usage_counter = APIUsageCounter.from_settings()
+
+
+def increment_api_usage(user, amount=1):
+    # user.profile was loaded with the user by TenantJWTAuthentication
+    usage_counter.increment(user.profile, amount)
+
+
+def adjust_records_used(deltas):
+    """
+    Applies {user_id: delta} to UserProfile.records_used in one UPDATE.
+    Callers run this inside the transaction of the write being counted.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    UserProfile = apps.get_model("core", "UserProfile")
+
+    UserProfile.objects.filter(user_id__in=deltas).update(
+        records_used=F("records_used") + Case(
+            *[When(user_id=user_id, then=Value(delta)) for user_id, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def count_alive_records(user_ids=None):
+    """
+    Alive rows per owner across QUOTA_MODELS, one grouped query per model.
+    """
+    totals = {}
+
+    for model_path in QUOTA_MODELS:
+        app_label, model_name = model_path.rsplit(".", 1)
+        model = apps.get_model(app_label, model_name)
+        owner_field = QUOTA_MODEL_OWNERSHIP[model_path]
+
+        qs = model.objects.all()
+        if user_ids is not None:
+            qs = qs.filter(**{f"{owner_field}__in": user_ids})
+
+        rows = qs.values_list(owner_field).annotate(total=Count("pk")).order_by()
+        for user_id, total in rows:
+            totals[user_id] = totals.get(user_id, 0) + total
+
+    return totals
+
+
+def reconcile_records_used(user_ids=None, dry_run=False):
+    """
+    Recomputes records_used from the quota models and fixes drifted profiles
+    with a single bulk_update. Returns [(profile, stored, actual), ...].
+    """
+    UserProfile = apps.get_model("core", "UserProfile")
+
+    actual = count_alive_records(user_ids)
+
+    profiles = UserProfile.objects.only("pk", "user_id", "records_used")
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+
+    drifted = []
+    for profile in profiles.iterator(chunk_size=2000):
+        expected = actual.get(profile.user_id, 0)
+        if profile.records_used != expected:
+            drifted.append((profile, profile.records_used, expected))
+            profile.records_used = expected
+
+    if drifted and not dry_run:
+        UserProfile.objects.bulk_update(
+            [profile for profile, _, _ in drifted],
+            ["records_used"],
+            batch_size=1000,
+        )
+
+    return drifted
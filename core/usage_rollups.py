@@ -0,0 +1,188 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.apps import apps
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import now
+
+from core.latency import add_sparse, bucket_index, merge_sparse, new_counts, percentiles, to_sparse
+
+
+GRANULARITIES = ("hour", "day")
+
+DEFAULT_RANGE_DAYS = 7
+MAX_RANGE_DAYS = 90
+
+
+#------------------------------------------ Incremental Rollup Starts ------------------------------------------
+
+def hour_of(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def aggregate_entries(entries):
+    """{(user_id, hour, path, status_class): totals} for log buffer entries, by their logged_at hour."""
+    totals = {}
+
+    for entry in entries:
+        key = (entry.user_id, hour_of(entry.logged_at), entry.request_path, entry.http_status // 100)
+        row = totals.get(key)
+        if row is None:
+            row = totals[key] = {"requests": 0, "timed": 0, "total_ms": 0, "histogram": new_counts()}
+
+        row["requests"] += 1
+        if entry.response_time_ms is not None:
+            row["timed"] += 1
+            row["total_ms"] += entry.response_time_ms
+            row["histogram"][bucket_index(entry.response_time_ms)] += 1
+
+    return totals
+
+
+def record_usage(entries):
+    """
+    Adds a batch of log entries to UsageRollup: one insert of the missing
+    keys, then the rows are locked in key order and merged, so concurrent
+    flushes of several workers add up instead of overwriting each other.
+    """
+    totals = aggregate_entries(entries)
+    if not totals:
+        return 0
+
+    UsageRollup = apps.get_model("core", "UsageRollup")
+    keys = sorted(totals, key=lambda key: (key[0], key[1], key[2], key[3]))
+
+    with transaction.atomic():
+        UsageRollup.objects.bulk_create(
+            [
+                UsageRollup(tenant_id=key[0], hour=key[1], request_path=key[2], status_class=key[3])
+                for key in keys
+            ],
+            ignore_conflicts=True,
+        )
+
+        rollups = (
+            UsageRollup.objects.select_for_update()
+            .filter(
+                hour__in={key[1] for key in keys},
+                tenant_id__in={key[0] for key in keys},
+                request_path__in={key[2] for key in keys},
+            )
+            .order_by("tenant_id", "hour", "request_path", "status_class")
+        )
+
+        changed = []
+        for rollup in rollups:
+            row = totals.get((rollup.tenant_id, hour_of(rollup.hour), rollup.request_path, rollup.status_class))
+            if row is None:
+                continue
+            rollup.requests += row["requests"]
+            rollup.timed_requests += row["timed"]
+            rollup.total_response_ms += row["total_ms"]
+            rollup.histogram = merge_sparse(rollup.histogram, to_sparse(row["histogram"]))
+            changed.append(rollup)
+
+        UsageRollup.objects.bulk_update(
+            changed, ["requests", "timed_requests", "total_response_ms", "histogram"]
+        )
+
+    return len(changed)
+
+#------------------------------------------ Incremental Rollup Ends ------------------------------------------
+
+
+#------------------------------------------ Reports Starts ------------------------------------------
+
+def parse_moment(value, end=False):
+    """ISO datetime, or a date meaning its start (or, for `end`, the next day)."""
+    # parse_datetime also accepts bare dates, so those are tried first
+    day = parse_date(value)
+    if day is not None:
+        if end:
+            day += timedelta(days=1)
+        moment = datetime.combine(day, time.min)
+    else:
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(f"Invalid date: {value}")
+
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment
+
+
+def report_range(params):
+    """(start, end, granularity) of a usage query; ValueError on bad input."""
+    end = parse_moment(params["to"], end=True) if params.get("to") else now()
+    start = (
+        parse_moment(params["from"]) if params.get("from")
+        else end - timedelta(days=DEFAULT_RANGE_DAYS)
+    )
+    granularity = params.get("granularity") or "day"
+
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if start >= end:
+        raise ValueError("from must be before to")
+    if end - start > timedelta(days=MAX_RANGE_DAYS):
+        raise ValueError(f"The range is limited to {MAX_RANGE_DAYS} days")
+
+    # whole hours: a partial first hour is reported in full
+    return hour_of(start), end, granularity
+
+
+def usage_report(user, start, end, granularity="day", request_path=None):
+    """
+    Calls, errors and latency of `user` in [start, end) per period and path,
+    read from UsageRollup only.
+    """
+    UsageRollup = apps.get_model("core", "UsageRollup")
+
+    rollups = UsageRollup.objects.filter(tenant=user, hour__gte=start, hour__lt=end)
+    if request_path:
+        rollups = rollups.filter(request_path=request_path)
+
+    groups = {}
+    for hour, path, status_class, requests, timed, total_ms, histogram in rollups.values_list(
+        "hour", "request_path", "status_class", "requests", "timed_requests", "total_response_ms", "histogram"
+    ).order_by():
+        hour = hour_of(hour)
+        period = hour if granularity == "hour" else hour.replace(hour=0)
+
+        group = groups.get((period, path))
+        if group is None:
+            group = groups[(period, path)] = {
+                "requests": 0, "client_errors": 0, "server_errors": 0,
+                "timed": 0, "total_ms": 0, "histogram": new_counts(),
+            }
+
+        group["requests"] += requests
+        if status_class == 4:
+            group["client_errors"] += requests
+        elif status_class >= 5:
+            group["server_errors"] += requests
+        group["timed"] += timed
+        group["total_ms"] += total_ms
+        add_sparse(group["histogram"], histogram)
+
+    results = []
+    for (period, path), group in sorted(groups.items()):
+        if not group["requests"]:
+            continue
+
+        p50, p95, p99 = percentiles(group["histogram"])
+        results.append({
+            "period": period.isoformat(),
+            "request_path": path,
+            "requests": group["requests"],
+            "client_errors": group["client_errors"],
+            "server_errors": group["server_errors"],
+            "error_rate": round((group["client_errors"] + group["server_errors"]) / group["requests"], 4),
+            "avg_ms": round(group["total_ms"] / group["timed"], 1) if group["timed"] else None,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        })
+    return results
+
+#------------------------------------------ Reports Ends ------------------------------------------
@@ -1,6 +1,9 @@
-from django.core.mail import send_mail
 from django.conf import settings
 from django.urls import reverse
+from django.utils.timezone import now
+from dateutil.relativedelta import relativedelta
+from core.usage import usage_counter
+from core.outbox import queue_email
 
 def get_user_plan(user):
     if not hasattr(user, "profile"):
@@ -27,6 +30,16 @@ def can_bulk(user):
     plan = get_user_plan(user)
     return bool(plan and plan.allow_bulk_operations)
 
+
+def can_filter(user):
+    plan = get_user_plan(user)
+    return bool(plan and plan.allow_filters)
+
+
+def can_sort(user):
+    plan = get_user_plan(user)
+    return bool(plan and plan.allow_sorting)
+
 def check_and_consume_api_call(profile):
     """
     Raises exception if limit exceeded.
@@ -37,12 +50,13 @@ def check_and_consume_api_call(profile):
     if now() >= profile.api_reset_at:
         profile.api_calls_used = 0
         profile.api_reset_at = now() + relativedelta(months=1)
+        profile.save(update_fields=["api_calls_used", "api_reset_at"])
+        usage_counter.reset(profile)
 
-    if profile.api_calls_used >= profile.plan.monthly_api_limit:
+    if not usage_counter.has_quota(profile, profile.plan.monthly_api_limit):
         return False
 
-    profile.api_calls_used += 1
-    profile.save(update_fields=["api_calls_used", "api_reset_at"])
+    usage_counter.increment(profile)
     return True
 
 def send_verification_email(user, token):
@@ -65,10 +79,24 @@ Please verify your email by clicking the link below:
 If you did not request this, you can ignore this email.
 """
 
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-    )
+    # delivered by `manage.py send_outbound_emails`
+    queue_email("verification", subject, message, [user.email])
+
+
+def send_password_reset_email(user, token):
+    reset_url = settings.SITE_URL + reverse("reset_password", args=[token])
+
+    subject = "Reset your password"
+    message = f"""
+Hello {user.email},
+
+We received a request to reset your password.
+
+Set a new password with the link below:
+
+{reset_url}
+
+If you did not request this, you can ignore this email.
+"""
+
+    queue_email("password_reset", subject, message, [user.email])
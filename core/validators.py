@@ -1,12 +1,21 @@
-from django.apps import apps
 from rest_framework import serializers
-from core.plan_limits import PLAN_RECORD_LIMITS, QUOTA_MODELS, QUOTA_MODEL_OWNERSHIP
+from core.metrics import Counter
+from core.plan_limits import PLAN_RECORD_LIMITS
 
 
-def enforce_record_quota(user, incoming_count=1):
+QUOTA_REJECTIONS = Counter(
+    "api_record_quota_rejections_total",
+    "Writes refused by enforce_record_quota, by plan.",
+    ["plan"],
+)
+
+
+def enforce_record_quota(user, incoming_count=1, for_update=False):
     """
     Enforces record creation limit based on user's plan.
-    Respects soft deletes automatically via SoftDeleteManager.
+    Respects soft deletes: records_used only counts alive rows.
+    With `for_update` the profile row stays locked until the caller's
+    transaction ends, reserving the quota for the rows it inserts.
     """
 
     profile = user.profile
@@ -21,29 +30,15 @@ def enforce_record_quota(user, incoming_count=1):
     if max_records is None:
         raise serializers.ValidationError("Invalid plan configuration.")
 
-    total_existing = 0
-
-    for model_path in QUOTA_MODELS:
-        try:
-            app_label, model_name = model_path.rsplit(".", 1)
-            model = apps.get_model(app_label, model_name)
-
-            owner_field = QUOTA_MODEL_OWNERSHIP.get(model_path)
-
-            if not owner_field:
-                continue  # Skip models without ownership definition
-
-            if not hasattr(model, owner_field):
-                continue  # Safety check
+    # records_used is maintained by RecordCountedMixin, one row read
+    profiles = type(profile).objects.filter(pk=profile.pk)
+    if for_update:
+        profiles = profiles.select_for_update()
 
-            total_records += model.objects.filter(
-                **{owner_field: user}
-            ).count()
-        except Exception as e:
-            print(f"[Quota Error] {model_path}: {e}")
-            continue
+    total_existing = profiles.values_list("records_used", flat=True).first() or 0
 
     if total_existing + incoming_count > max_records:
+        QUOTA_REJECTIONS.inc(plan=plan_name)
         raise serializers.ValidationError(
             {
                 "error_code": "RECORD_LIMIT_EXCEEDED",
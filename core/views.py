@@ -2,8 +2,8 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.models import User
 from django.contrib.auth import login
 from django.apps import apps
-from .models import CustomerProfile, ProductCatalog, OrderTransaction, SystemLog, FeatureUsageAnalytics, UserProfile, EmailVerificationToken, PasswordResetToken, CustomObject, CustomField, CustomFieldValue, CustomObjectRecord
-from .serializers import CustomerProfileSerializer, ProductCatalogSerializer, OrderTransactionSerializer, CustomObjectSerializer, CustomFieldSerializer
+from .models import CustomerProfile, ProductCatalog, OrderTransaction, SystemLog, FeatureUsageAnalytics, UserProfile, EmailVerificationToken, PasswordResetToken, CustomObject, CustomField, CustomObjectRecord
+from .serializers import CustomerProfileSerializer, ProductCatalogSerializer, OrderTransactionSerializer, CustomObjectSerializer, CustomFieldSerializer, ProductCatalogBulkSerializer, OrderTransactionBulkSerializer
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics
@@ -15,20 +15,38 @@ from .plans import Plan
 from core.decorators import plan_required, api_quota_required
 from core.querysets import owned_queryset
 from core.throttles import PlanBasedUserThrottle
-from .permissions import IsSuperUser, get_plan_limits, can_add_field_to_object, can_create_custom_object, IsEmailVerified
+from .permissions import IsSuperUser, get_plan_limits, can_add_field_to_object, can_create_custom_object, can_index_field, IsEmailVerified
 from .paginations import PlanBasedPagination
 from django.core.paginator import Paginator
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.tenancy import TenantJWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.exceptions import NotAuthenticated
+from rest_framework.exceptions import NotAuthenticated, NotFound
 from rest_framework.views import APIView
 from rest_framework import status
 from django.contrib import messages
-from core.utils import send_verification_email
-from core.plan_limits import PLAN_RECORD_LIMITS, QUOTA_MODELS
-from django.db import IntegrityError
+from core.utils import send_verification_email, send_password_reset_email, can_filter, can_sort, can_bulk, can_create, can_update, can_delete
+from core.plan_limits import PLAN_RECORD_LIMITS
+from django.db import IntegrityError, transaction
+from django.utils.timezone import now
+from datetime import timedelta
 from rest_framework.exceptions import ValidationError
-from .usage import increment_api_usage
+from .usage import increment_api_usage, usage_counter
+from .custom_records import create_record, validate_records, bulk_create_records, records_to_representation
+from .custom_schema import get_schema
+from .custom_query import RecordQuery
+from .bulk import BulkResource, get_bulk_limits, api_calls_for, validate_create_rows, bulk_create_rows, bulk_update_rows, validate_delete_keys, bulk_delete_rows
+from .parsers import NDJSONParser
+from .tenancy import get_tenant
+from .exports import StreamingExportMixin
+from .fast_serializers import FastListMixin
+from .data_versions import ConditionalListMixin, conditional_response, make_etag, set_validators
+from .response_cache import response_cache
+from .usage_rollups import report_range, usage_report
+from .latency import get_latency_config, route_latency
+from .metrics import get_metrics_config, metrics_registry
+from django.http import HttpResponse
+import hmac
+from rest_framework.parsers import JSONParser
 
 
 # Create your views here.
@@ -99,8 +117,10 @@ def signup_view(request):
             plan=free_plan,
         )
 
-        token = EmailVerificationToken.objects.create(user=user)
-        send_verification_email(user, token.token)
+        # token and outbox row commit together, SMTP is not in the request
+        with transaction.atomic():
+            token = EmailVerificationToken.objects.create(user=user)
+            send_verification_email(user, token.token)
 
         login(request, user)
         return redirect("home")
@@ -159,9 +179,9 @@ def resend_verification_email(request):
         messages.info(request, "Your email is already verified.")
         return redirect("/core/dashboard/")
 
-    token = EmailVerificationToken.objects.create(user=request.user)
-
-    send_verification_email(request.user, token.token)
+    with transaction.atomic():
+        token = EmailVerificationToken.objects.create(user=request.user)
+        send_verification_email(request.user, token.token)
 
     messages.success(
         request,
@@ -176,8 +196,10 @@ def forgot_password_view(request):
 
         try:
             user = User.objects.get(email=email)
-            token = PasswordResetToken.objects.create(user=user)
-            print(f"/reset-password/?token={token.token}")
+
+            with transaction.atomic():
+                token = PasswordResetToken.objects.create(user=user)
+                send_password_reset_email(user, token.token)
         except User.DoesNotExist:
             pass
 
@@ -283,7 +305,7 @@ class CustomerProfileAPIView(generics.ListAPIView):
     # queryset = ProductCatalog.objects.filter()
     serializer_class = CustomerProfileSerializer
     filter_backends = [DjangoFilterBackend]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [TenantJWTAuthentication]
     permission_classes = [IsAuthenticated, IsEmailVerified]
     throttle_classes = [PlanBasedUserThrottle]
     pagination_class = PlanBasedPagination
@@ -316,11 +338,16 @@ def customer_profile_detail_page(request, user_id):
     
 @login_required
 def customer_profile_list_page(request):
-    profiles = CustomerProfile.objects.all()
+    # the caller's profiles one page at a time, only the columns shown
+    profiles = owned_queryset(CustomerProfile.objects.all(), request.user).only(
+        "user_id", "full_name", "email", "is_email_verified", "role", "created_at"
+    ).order_by("-created_at")
+
+    page_obj = Paginator(profiles, 25).get_page(request.GET.get("page", 1))
     return render(
         request,
         "core/customer_profile_list.html",
-        {"profiles": profiles}
+        {"profiles": page_obj, "page_obj": page_obj}
     )
 
 # ----------------------------------- CustomerProfile Views Ends --------------------------------------
@@ -366,15 +393,16 @@ def product_catalog_get_all_products(request):
     )
 
 
-class ProductCatalogAPIView(generics.ListAPIView):
+class ProductCatalogAPIView(ConditionalListMixin, StreamingExportMixin, FastListMixin, generics.ListAPIView):
     # queryset = ProductCatalog.objects.filter()
     serializer_class = ProductCatalogSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = ProductCatalogFilter
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [TenantJWTAuthentication]
     permission_classes = [IsAuthenticated, IsEmailVerified]
     throttle_classes = [PlanBasedUserThrottle]
     pagination_class = PlanBasedPagination
+    export_filename = "product-catalog"
     
     def get(self, request, *args, **kwargs):
         if request.headers.get("X-Force-401") == "true":
@@ -396,14 +424,15 @@ class ProductCatalogAPIView(generics.ListAPIView):
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
 
-        if response.status_code == 200:
+        # exports are charged once by StreamingExportMixin; a 304 is still a call
+        if response.status_code in (200, 304) and not response.streaming:
             increment_api_usage(request.user)
 
         return response
     
 class ProductCatalogCreateAPIView(generics.CreateAPIView):
     serializer_class = ProductCatalogSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [TenantJWTAuthentication]
     permission_classes = [IsAuthenticated, IsEmailVerified]
     throttle_classes = [PlanBasedUserThrottle]
     
@@ -438,9 +467,7 @@ def create_product_view(request):
             product.created_by = request.user
             product.save()
             
-            profile = request.user.profile
-            profile.api_calls_used = F("api_calls_used") + 1
-            profile.save(update_fields=["api_calls_used"])
+            increment_api_usage(request.user)
 
             return redirect("get_all_products")
     else:
@@ -454,6 +481,129 @@ def create_product_view(request):
 
 # ----------------------------------- ProductCatalog Views Ends --------------------------------------
 
+
+# ----------------------------------- Bulk Views Start --------------------------------------
+
+class BulkRecordAPIView(APIView):
+    """
+    POST    create rows (JSON array or NDJSON, one object per line)
+    PATCH   partial update of rows addressed by the resource key
+    DELETE  soft-delete rows: an array of keys
+
+    Rows are validated in one pass and nothing is written unless every row
+    is valid; errors come back as [{"index": i, "errors": {...}}].
+    """
+    authentication_classes = [TenantJWTAuthentication]
+    permission_classes = [IsAuthenticated, IsEmailVerified]
+    throttle_classes = [PlanBasedUserThrottle]
+    parser_classes = [JSONParser, NDJSONParser]
+    resource = None
+
+    def get_rows(self, request):
+        return request.data if isinstance(request.data, list) else [request.data]
+
+    def check_request(self, request, rows, allowed):
+        """Plan gates, batch size and quota. Returns an error Response or None."""
+        tenant = get_tenant(request)
+
+        if not can_bulk(request.user) or not allowed(request.user):
+            return Response(
+                {"error_code": "BULK_NOT_ALLOWED", "message": "Upgrade your plan to use bulk operations."},
+                status=403,
+            )
+
+        limits = get_bulk_limits(tenant.plan)
+
+        if not rows:
+            return Response({"error": "No rows supplied"}, status=400)
+
+        if len(rows) > limits["max_rows"]:
+            return Response(
+                {
+                    "error_code": "BATCH_TOO_LARGE",
+                    "message": f"{tenant.plan_name} plan allows up to {limits['max_rows']} rows per bulk request.",
+                },
+                status=400,
+            )
+
+        calls = api_calls_for(limits, len(rows))
+        if not usage_counter.has_quota(tenant.profile, tenant.plan.monthly_api_limit, calls):
+            return Response(
+                {
+                    "detail": "API limit reached for your plan",
+                    "message": f"This request counts as {calls} API calls.",
+                },
+                status=429,
+            )
+
+        return None
+
+    def charge(self, request, rows):
+        limits = get_bulk_limits(get_tenant(request).plan)
+        increment_api_usage(request.user, api_calls_for(limits, rows))
+
+    def post(self, request):
+        rows = self.get_rows(request)
+        error = self.check_request(request, rows, can_create)
+        if error is not None:
+            return error
+
+        validated, errors = validate_create_rows(self.resource, request.user, rows)
+        if errors:
+            return Response({"errors": errors}, status=400)
+
+        objs = bulk_create_rows(self.resource, request.user, validated)
+        self.charge(request, len(rows))
+
+        return Response(
+            {
+                "created": len(objs),
+                "records": [
+                    {self.resource.key: getattr(obj, self.resource.key), "public_id": obj.public_id}
+                    for obj in objs
+                ],
+            },
+            status=201,
+        )
+
+    def patch(self, request):
+        rows = self.get_rows(request)
+        error = self.check_request(request, rows, can_update)
+        if error is not None:
+            return error
+
+        updated, errors = bulk_update_rows(self.resource, request.user, rows)
+        if errors:
+            return Response({"errors": errors}, status=400)
+
+        self.charge(request, len(rows))
+        return Response({"updated": len(updated)})
+
+    def delete(self, request):
+        rows = self.get_rows(request)
+        error = self.check_request(request, rows, can_delete)
+        if error is not None:
+            return error
+
+        keys, errors = validate_delete_keys(self.resource, rows)
+        if errors:
+            return Response({"errors": errors}, status=400)
+
+        deleted, missing = bulk_delete_rows(self.resource, request.user, keys)
+        self.charge(request, len(rows))
+
+        return Response({"deleted": deleted, "not_found": missing})
+
+
+class ProductCatalogBulkAPIView(BulkRecordAPIView):
+    resource = BulkResource(ProductCatalog, ProductCatalogBulkSerializer, key="product_id")
+
+
+class OrderTransactionBulkAPIView(BulkRecordAPIView):
+    resource = BulkResource(OrderTransaction, OrderTransactionBulkSerializer, key="order_id", global_key=True)
+
+# ----------------------------------- Bulk Views Ends --------------------------------------
+
 @login_required
 def account_detail_view(request):
     user = request.user
@@ -463,31 +613,11 @@ def account_detail_view(request):
     plan_name = plan.name.upper() if plan else "FREE"
     max_records = PLAN_RECORD_LIMITS.get(plan_name, 0)
 
-    # 🔑 Global record count (respects soft delete)
-    total_records = 0
-
-    for model_path in QUOTA_MODELS:
-        try:
-            app_label, model_name = model_path.rsplit(".", 1)
-            model = apps.get_model(app_label, model_name)
-
-            owner_field = QUOTA_MODEL_OWNERSHIP.get(model_path)
-
-            if not owner_field:
-                continue  # Skip models without ownership definition
-
-            if not hasattr(model, owner_field):
-                continue  # Safety check
-
-            total_records += model.objects.filter(
-                **{owner_field: user}
-            ).count()
-
-        except Exception as e:
-            print(f"[Quota Error] {model_path}: {e}")
-            continue
+    # 🔑 Global record count (respects soft delete), kept by RecordCountedMixin
+    total_records = profile.records_used
 
     records_remaining = max(max_records - total_records, 0)
+    api_used = usage_counter.used(profile)
 
     context = {
         "user": user,
@@ -496,10 +626,10 @@ def account_detail_view(request):
         "plan_name": plan_name,
 
         # API usage
-        "api_used": profile.api_calls_used,
+        "api_used": api_used,
         "api_limit": plan.monthly_api_limit if plan else 0,
         "api_remaining": (
-            plan.monthly_api_limit - profile.api_calls_used
+            plan.monthly_api_limit - api_used
             if plan else 0
         ),
         "api_reset_at": profile.api_reset_at,
@@ -518,14 +648,15 @@ def account_detail_view(request):
     
 
 
-class OrderTransactionAPIView(generics.ListAPIView):
+class OrderTransactionAPIView(ConditionalListMixin, StreamingExportMixin, FastListMixin, generics.ListAPIView):
     # queryset = ProductCatalog.objects.filter()
     serializer_class = OrderTransactionSerializer
     filter_backends = [DjangoFilterBackend]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [TenantJWTAuthentication]
     permission_classes = [IsAuthenticated, IsEmailVerified]
     throttle_classes = [PlanBasedUserThrottle]
     pagination_class = PlanBasedPagination
+    export_filename = "order-transactions"
     
     def get(self, request, *args, **kwargs):
         if request.headers.get("X-Force-401") == "true":
@@ -537,9 +668,9 @@ class OrderTransactionAPIView(generics.ListAPIView):
         user = self.request.user
 
         if user.is_superuser:
-            return ProductCatalog.all_objects.all()
+            return OrderTransaction.all_objects.all()
 
-        return ProductCatalog.objects.filter(
+        return OrderTransaction.objects.filter(
             created_by=user,
             is_deleted=False,
         )
@@ -617,6 +748,15 @@ class CustomFieldCreateAPIView(APIView):
         serializer = CustomFieldSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
+        if serializer.validated_data.get("is_indexed") and not can_index_field(request.user, custom_object):
+            return Response(
+                {
+                    "error_code": "INDEX_LIMIT_EXCEEDED",
+                    "message": "You have reached the maximum number of indexed fields allowed for this object.",
+                },
+                status=400,
+            )
+
         serializer.save(custom_object=custom_object)
 
         return Response(
@@ -638,14 +778,253 @@ class CustomObjectDetailAPIView(APIView):
         except CustomObject.DoesNotExist:
             return Response({"error": "Not found"}, status=404)
 
-        fields = CustomFieldSerializer(obj.fields.all(), many=True).data
+        # every CustomField change bumps schema_version
+        etag = make_etag(obj.pk, obj.schema_version)
+        not_modified = conditional_response(request, etag, obj.updated_at)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, obj.updated_at)
+
+        def describe():
+            fields = CustomFieldSerializer(obj.fields.all(), many=True).data
+
+            return Response(
+                {
+                    "object": obj.api_name,
+                    "fields": fields,
+                }
+            )
+
+        response = response_cache.get_or_compute(etag, describe)
+        return set_validators(response, etag, obj.updated_at)
+        
+
+class UsageAPIView(APIView):
+    """
+    GET /core/api/v1/usage/?from=&to=&granularity=hour|day&path=
+    Calls, error rates and latency of the caller, read from UsageRollup.
+    """
+    authentication_classes = [TenantJWTAuthentication]
+    permission_classes = [IsAuthenticated, IsEmailVerified]
+    throttle_classes = [PlanBasedUserThrottle]
+
+    def get(self, request):
+        try:
+            start, end, granularity = report_range(request.query_params)
+        except ValueError as e:
+            raise ValidationError({"detail": str(e)})
+
+        results = usage_report(
+            request.user,
+            start,
+            end,
+            granularity=granularity,
+            request_path=request.query_params.get("path"),
+        )
 
         return Response(
             {
-                "object": obj.api_name,
-                "fields": fields,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "granularity": granularity,
+                "results": results,
             }
         )
+
+
+class LatencyMetricsAPIView(APIView):
+    """
+    GET /core/api/v1/internal/latency/?minutes=60&route=
+    p50/p95/p99 per route from the merged latency histograms. Superusers only.
+    """
+    permission_classes = [IsAuthenticated, IsSuperUser]
+
+    MAX_MINUTES = 7 * 24 * 60
+
+    def get(self, request):
+        try:
+            minutes = int(request.query_params.get("minutes", 60))
+        except ValueError:
+            raise ValidationError({"minutes": "Must be an integer"})
+        if not 0 < minutes <= self.MAX_MINUTES:
+            raise ValidationError({"minutes": f"Must be between 1 and {self.MAX_MINUTES}"})
+
+        window = get_latency_config()["WINDOW_SECONDS"]
+        end = now()
+        # whole windows: the one holding `start` is included
+        start = end - timedelta(minutes=minutes)
+        start -= timedelta(seconds=start.timestamp() % window)
+
+        return Response(
+            {
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "window_seconds": window,
+                "results": route_latency(start, end, route=request.query_params.get("route")),
+            }
+        )
+
+
+def metrics_view(request):
+    """
+    GET /metrics in the Prometheus text format, for scrapers sending
+    METRICS["TOKEN"] and for superusers. Denied to everyone else, also
+    without a token configured: behind a reverse proxy every client looks
+    like loopback.
+    """
+    token = get_metrics_config()["TOKEN"]
+    sent = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    allowed = request.user.is_superuser or bool(
+        token and sent and hmac.compare_digest(sent.encode(), token.encode())
+    )
+
+    if not allowed:
+        return HttpResponse(status=403)
+
+    return HttpResponse(
+        metrics_registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+class CustomObjectRecordAPIView(APIView):
+    """
+    GET  /core/api/v1/objects/<api_name>/records/  paginated, pivoted records
+    POST /core/api/v1/objects/<api_name>/records/  one record or an array
+    """
+    permission_classes = [IsAuthenticated, IsEmailVerified]
+    throttle_classes = [PlanBasedUserThrottle]
+    pagination_class = PlanBasedPagination
+
+    def get_object(self, request, api_name):
+        try:
+            return CustomObject.objects.get(
+                tenant=request.user,
+                api_name=api_name,
+                is_active=True,
+                allow_api_access=True,
+            )
+        except CustomObject.DoesNotExist:
+            return None
+
+    def get_serializer(self, *args, **kwargs):
+        # per-object field description for OPTIONS / browsable API
+        obj = self.get_object(self.request, self.kwargs["api_name"])
+        if obj is None:
+            raise NotFound("Not found")
+        return get_schema(obj).serializer_class(*args, **kwargs)
+
+    def get(self, request, api_name):
+        obj = self.get_object(request, api_name)
+        if obj is None:
+            return Response({"error": "Not found"}, status=404)
+
+        schema = get_schema(obj)
+        fields = schema.fields
+        records = CustomObjectRecord.objects.filter(
+            tenant=request.user,
+            object_api_name=obj.api_name,
+        )
+
+        query = RecordQuery.from_params(obj, schema, request.query_params)
+        error = self.check_query(request, query, records)
+        if error is not None:
+            return error
+
+        records = query.apply(records)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(records, request, view=self)
+        data = records_to_representation(obj, fields, page)
+
+        increment_api_usage(request.user)
+        return paginator.get_paginated_response(data)
+
+    def check_query(self, request, query, records):
+        """Plan gates and the cost guard for ?filter[...] / ?sort=."""
+        if query.filters and not can_filter(request.user):
+            return Response(
+                {"error_code": "FILTERS_NOT_ALLOWED", "message": "Filtering is not available on your plan."},
+                status=403,
+            )
+
+        if query.sorts and not can_sort(request.user):
+            return Response(
+                {"error_code": "SORTING_NOT_ALLOWED", "message": "Sorting is not available on your plan."},
+                status=403,
+            )
+
+        if query.sorts and PlanBasedPagination.cursor_query_param in request.query_params:
+            return Response(
+                {"error_code": "INVALID_QUERY", "message": "Cursor pagination is ordered by created_at and cannot be combined with sort."},
+                status=400,
+            )
+
+        unindexed = query.unindexed_sorts
+        max_records = get_plan_limits(request.user).get("max_unindexed_sort_records")
+
+        # capped: only whether a row exists past max_records, not the full count
+        if unindexed and max_records is not None and records[max_records:max_records + 1].exists():
+            return Response(
+                {
+                    "error_code": "QUERY_TOO_EXPENSIVE",
+                    "message": (
+                        f"Sorting on unindexed fields ({', '.join(unindexed)}) is limited to "
+                        f"objects with up to {max_records} records on your plan. "
+                        f"Mark the fields as indexed or upgrade your plan."
+                    ),
+                },
+                status=400,
+            )
+
+        return None
+
+    def post(self, request, api_name):
+        obj = self.get_object(request, api_name)
+        if obj is None:
+            return Response({"error": "Not found"}, status=404)
+
+        payloads = request.data if isinstance(request.data, list) else [request.data]
+        if not payloads:
+            return Response({"error": "No records supplied"}, status=400)
+
+        max_records = get_plan_limits(request.user).get("max_records_per_object", 0)
+        existing = CustomObjectRecord.objects.filter(
+            tenant=request.user,
+            object_api_name=obj.api_name,
+        ).count()
+
+        if existing + len(payloads) > max_records:
+            return Response(
+                {
+                    "error_code": "RECORD_LIMIT_EXCEEDED",
+                    "message": (
+                        f"{obj.api_name} allows a maximum of {max_records} records "
+                        f"on your plan. You currently have {existing}."
+                    ),
+                },
+                status=400,
+            )
+
+        schema = get_schema(obj)
+        fields = schema.fields
+        values_list, errors = validate_records(obj, schema, payloads)
+
+        if errors:
+            return Response({"errors": errors}, status=400)
+
+        records = bulk_create_records(obj, fields, values_list, request.user)
+        data = records_to_representation(
+            obj,
+            fields,
+            records,
+            values={record.pk: values for record, values in zip(records, values_list)},
+        )
+
+        increment_api_usage(request.user)
+        return Response(
+            {"created": len(records), "records": data},
+            status=status.HTTP_201_CREATED,
+        )
         
 
 @login_required
@@ -660,11 +1039,16 @@ def create_custom_object_view(request):
 
         name = request.POST.get("name")
         api_name = request.POST.get("api_name")
+        storage_mode = request.POST.get("storage_mode", CustomObject.StorageMode.EAV)
+
+        if storage_mode not in CustomObject.StorageMode.values:
+            storage_mode = CustomObject.StorageMode.EAV
 
         CustomObject.objects.create(
             tenant=request.user,
             name=name,
             api_name=api_name,
+            storage_mode=storage_mode,
         )
 
         messages.success(request, "Custom Object created successfully.")
@@ -688,6 +1072,13 @@ def create_custom_field_view(request, object_id):
             )
             return redirect("custom_object_detail", object_id=object_id)
 
+        if "is_indexed" in request.POST and not can_index_field(request.user, custom_object):
+            messages.error(
+                request,
+                "You have reached the maximum number of indexed fields allowed for this object."
+            )
+            return redirect("custom_object_detail", object_id=object_id)
+
         CustomField.objects.create(
             custom_object=custom_object,
             name=request.POST["name"],
@@ -695,6 +1086,7 @@ def create_custom_field_view(request, object_id):
             data_type=request.POST["data_type"],
             is_required="is_required" in request.POST,
             is_unique="is_unique" in request.POST,
+            is_indexed="is_indexed" in request.POST,
         )
 
         messages.success(request, "Field added successfully.")
@@ -722,6 +1114,13 @@ def create_custom_field_view(request, object_id):
             )
             return redirect("custom_object_detail", object_id=object_id)
 
+        if "is_indexed" in request.POST and not can_index_field(request.user, custom_object):
+            messages.error(
+                request,
+                "You have reached the maximum number of indexed fields allowed for this object."
+            )
+            return redirect("custom_object_detail", object_id=object_id)
+
         CustomField.objects.create(
             custom_object=custom_object,
             name=request.POST["name"],
@@ -729,6 +1128,7 @@ def create_custom_field_view(request, object_id):
             data_type=request.POST["data_type"],
             is_required="is_required" in request.POST,
             is_unique="is_unique" in request.POST,
+            is_indexed="is_indexed" in request.POST,
         )
 
         messages.success(request, "Field added successfully.")
@@ -796,44 +1196,18 @@ def create_custom_record_view(request, object_id):
         tenant=request.user,
     )
 
-    fields = obj.fields.all()
+    schema = get_schema(obj)
+    fields = schema.fields
+    errors = {}
 
     if request.method == "POST":
-        record = CustomObjectRecord.objects.create(
-            tenant=request.user,
-            object_api_name=obj.api_name,
-        )
-
-        for field in fields:
-            raw_value = request.POST.get(field.api_name)
+        values, errors = schema.clean(request.POST)
 
-            if raw_value in ("", None):
-                continue
-
-            kwargs = {
-                "record": record,
-                "field_api_name": field.api_name,
-            }
+        if not errors:
+            create_record(obj, fields, values, request.user)
 
-            if field.data_type == "STRING":
-                kwargs["value_string"] = raw_value
-            elif field.data_type == "NUMBER":
-                kwargs["value_number"] = int(raw_value)
-            elif field.data_type == "DECIMAL":
-                kwargs["value_decimal"] = raw_value
-            elif field.data_type == "BOOLEAN":
-                kwargs["value_boolean"] = raw_value == "on"
-            elif field.data_type == "DATE":
-                kwargs["value_date"] = raw_value
-            elif field.data_type == "DATETIME":
-                kwargs["value_datetime"] = raw_value
-            elif field.data_type == "JSON":
-                kwargs["value_json"] = raw_value
-
-            CustomFieldValue.objects.create(**kwargs)
-
-        messages.success(request, "Record created successfully.")
-        return redirect("custom_object_detail", object_id=obj.id)
+            messages.success(request, "Record created successfully.")
+            return redirect("custom_object_detail", object_id=obj.id)
 
     return render(
         request,
@@ -841,6 +1215,7 @@ def create_custom_record_view(request, object_id):
         {
             "object": obj,
             "fields": fields,
+            "errors": errors,
         }
     )
     
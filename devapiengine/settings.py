@@ -54,10 +54,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 MIDDLEWARE = [
-    
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.QueryBudgetMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -173,7 +175,7 @@ REST_FRAMEWORK = {
     
     #Authentication Rest Framework
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.tenancy.TenantJWTAuthentication",
     ],
     
     #Excveption Handler Rest Framework
@@ -204,3 +206,146 @@ EMAIL_HOST_PASSWORD =  os.getenv("EMAIL_HOST_PASSWORD") # NOT gmail password
 
 DEFAULT_FROM_EMAIL = "kunalupwork0@gmail.com"
 SITE_URL = "https://theapiengine.com"
+
+# Runs the tests without the background flushers of the write-behind buffers
+TEST_RUNNER = "core.test_runner.CoreTestRunner"
+
+# Buffered SystemLog writes (core.log_buffer). Set ENABLED=False to write
+# synchronously, e.g. in tests that assert on SystemLog rows.
+API_LOG_BUFFER = {
+    "ENABLED": True,
+    "MAX_SIZE": 10000,         # entries kept in memory before dropping
+    "BATCH_SIZE": 500,         # rows per bulk_create
+    "FLUSH_INTERVAL_MS": 1000,
+}
+
+# API usage counting (core.usage). Calls are counted in memory and written
+# behind to UserProfile.api_calls_used. Use BACKEND "redis" with REDIS_URL
+# (or CLIENT_FACTORY) to share pending counts between workers.
+API_USAGE_COUNTER = {
+    "BACKEND": os.getenv("API_USAGE_BACKEND", "local"),
+    "REDIS_URL": os.getenv("REDIS_URL"),
+    "FLUSH_INTERVAL_MS": 5000,
+    # pending calls of a tenant before an early flush. With the local backend
+    # every worker keeps its own pending count, so a tenant can overshoot its
+    # monthly limit by up to SLACK x workers before the flushes catch up.
+    "SLACK": 50,
+}
+
+# Node component (0-99) of generated public ids (core.public_ids). Give each
+# host its own value when several hosts write; defaults to the worker pid.
+PUBLIC_ID_NODE = os.getenv("PUBLIC_ID_NODE")
+
+# Django cache used by core.response_cache. Local memory is per process;
+# point "default" at Redis or Memcached to share entries between workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api-engine",
+    }
+}
+
+# Cached GET responses of the list/detail APIs (core.response_cache), keyed
+# by their ETag so writes invalidate them through the data version.
+API_RESPONSE_CACHE = {
+    "ENABLED": True,
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": 300,
+    "LOCK_TIMEOUT": 10,        # seconds one request computes a missing entry
+    "WAIT_MS": 2000,           # identical requests wait this long for it
+}
+
+# WordPress feed of the blogs app (blogs.feed), served stale-while-revalidate
+# from the "default" cache.
+BLOG_FEED = {
+    "BASE_URL": os.getenv("WP_API_BASE", "https://kunalkejriwal.com/wp-json/wp/v2"),
+    "PER_PAGE": 10,
+    "TIMEOUT": 3,
+    "FRESH_FOR": 300,          # seconds before a background refresh
+    "STALE_FOR": 86400,        # seconds stale posts are served while the upstream fails
+    "RETRY_AFTER": 30,         # seconds a cold cache serves an empty feed when the upstream is down
+}
+
+# Verification / password reset emails are queued in OutboundEmail and sent
+# by `manage.py send_outbound_emails` (core.outbox).
+EMAIL_OUTBOX = {
+    "BATCH_SIZE": 50,
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF_SECONDS": 30,       # doubled per failed attempt
+    "MAX_BACKOFF_SECONDS": 3600,
+    "POLL_INTERVAL": 5,
+}
+
+# Background jobs (core.jobs) run by `manage.py run_jobs`. PERIODIC entries
+# are enqueued once per `every` seconds across all workers.
+JOB_QUEUE = {
+    "CONCURRENCY": int(os.getenv("JOB_CONCURRENCY", 4)),
+    "POLL_INTERVAL": 1,
+    "RETRY_BACKOFF_SECONDS": 10,
+    "MAX_BACKOFF_SECONDS": 3600,
+    "STALE_AFTER_SECONDS": 600,      # RUNNING jobs without a heartbeat this long are requeued
+    "HEARTBEAT_SECONDS": 60,
+    "KEEP_FINISHED_DAYS": 7,
+    "PERIODIC": {
+        "send-outbound-emails": {"job": "core.send_outbound_emails", "every": 30},
+        "reconcile-record-counts": {"job": "core.reconcile_record_counts", "every": 3600},
+        "purge-finished-jobs": {"job": "core.purge_finished_jobs", "every": 86400},
+        "ensure-system-log-partitions": {"job": "core.ensure_system_log_partitions", "every": 3600},
+        "compact-system-logs": {"job": "core.compact_system_logs", "every": 86400},
+        "purge-latency-windows": {"job": "core.purge_latency_windows", "every": 86400},
+    },
+}
+
+# Per-route latency histograms (core.latency). Every worker keeps log-linear
+# histograms in memory and merges them into one LatencyWindow row per route
+# and window; /core/api/v1/internal/latency/ reports p50/p95/p99 from them.
+LATENCY_HISTOGRAMS = {
+    "ENABLED": True,
+    "WINDOW_SECONDS": 300,
+    "FLUSH_INTERVAL_MS": 10000,
+    "KEEP_DAYS": 14,
+}
+
+# Prometheus metrics (core.metrics) served at /metrics. Under gunicorn set
+# METRICS_MULTIPROCESS_DIR to a directory shared by the workers (emptied on
+# deploy) so every scrape adds up all of them. Scrapers send the token as
+# "Authorization: Bearer <METRICS_TOKEN>"; without one only superusers
+# may read the endpoint.
+METRICS = {
+    "ENABLED": True,
+    "MULTIPROCESS_DIR": os.getenv("METRICS_MULTIPROCESS_DIR") or None,
+    "WRITE_INTERVAL_MS": 5000,
+    "TOKEN": os.getenv("METRICS_TOKEN") or None,
+}
+
+# Per-request query budgets (core.query_budget). Routes over their budget
+# and SQL shapes repeated N_PLUS_ONE_THRESHOLD times (suspected N+1) are
+# reported and counted in /metrics; with RAISE they fail the request, which
+# is meant for test runs. Superusers get a Server-Timing header. Plain
+# route entries budget reads (GET/HEAD/OPTIONS); writes need their own
+# "POST <route>" style entry.
+QUERY_BUDGETS = {
+    "ENABLED": True,
+    "N_PLUS_ONE_THRESHOLD": 5,
+    "DEFAULT_BUDGET": None,
+    "ROUTES": {
+        "core/api/v1/product-catalog/": 4,
+        "core/api/v1/order-transaction/": 4,
+        "core/api/v1/objects/<str:api_name>/": 3,
+        # +1 for the capped size check of ?sort= on unindexed fields
+        "core/api/v1/objects/<str:api_name>/records/": 6,
+        "POST core/api/v1/objects/<str:api_name>/records/": 10,
+        "core/api/v1/usage/": 2,
+    },
+    "RAISE": os.getenv("QUERY_BUDGETS_RAISE") == "1",
+}
+
+# SystemLog retention (core.log_partitions). On Postgres the table is range
+# partitioned by logged_at and expired partitions are rolled up into
+# SystemLogRollup and dropped; elsewhere expired rows are deleted in batches.
+SYSTEM_LOG_RETENTION = {
+    "PARTITION": "month",        # month | day; fixed once migration 0031 ran
+    "PARTITIONS_AHEAD": 2,
+    "RAW_DAYS": int(os.getenv("SYSTEM_LOG_RAW_DAYS", 30)),
+    "DELETE_BATCH_SIZE": 5000,
+}
@@ -17,6 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import metrics_view
+
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -26,6 +28,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('core/', include('core.urls')),
     path('api-auth/', include('rest_framework.urls')),
+    path('metrics', metrics_view, name="metrics"),
     path('blogs/', include('blogs.urls')),
     path('', include('core.homepage_urls')),
     path('auth/', include('core.api_urls')),